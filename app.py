@@ -1,346 +1,57 @@
 import base64
 import os
+import time
+import uuid
 
-import joblib
+import altair as alt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from cache import PredictionCache, model_fingerprint, pinned_fingerprint
+from explain import Explainer
+from features import (
+    add_engineered_features,
+    all_features_ordered,
+    base_academic_features,
+    compact_dtypes,
+    enrollment_financial_features,
+    external_features,
+    float_input_features,
+    input_features_ordered,
+    personal_background_features,
+)
+from ingest import file_format, read_csv_header, read_student_csv, read_student_file
+from instrumentation import Instrumentation
+from jobs import ACTIVE_STATUSES, DEFAULT_JOB_DIR, JobQueue, start_workers
+from labels import LABEL_MAPS, labels_to_codes_frame
+from registry import DEFAULT_CACHE_MAX_BYTES, ModelCache, ModelRegistry
+from results import (
+    DEFAULT_PAGE_SIZE,
+    ROW_ID_COLUMN,
+    STATUS_FILTERS,
+    build_result_table,
+    export_results,
+    filter_positions,
+    page_rows,
+)
+from scoring import DEFAULT_THRESHOLD, MODEL_DIR, MODEL_PATH, predict_frame
+from startup import ModelLoader, format_timings
+from whatif import simulate
+
 # Define constants
 TARGET_COLUMN_ORIGINAL = "Status"
 TARGET_COLUMN_BINARY = "Is_Dropout"
-MODEL_DIR = "models"
-MODEL_PATH = os.path.join(MODEL_DIR, "dropout_prediction_xgboost_pipeline.pkl")
-
-# Mapping Kode Numerik ke Label Teks untuk Fitur Kategorikal
-marital_status_map = {
-    1: "Single",
-    2: "Married",
-    3: "Widower",
-    4: "Divorced",
-    5: "Facto Union",
-    6: "Legally Separated",
-}
-
-application_mode_map = {
-    1: "1st Phase - General Contingent",
-    2: "Ordinance No. 612/93",
-    5: "1st Phase - Special Contingent (Azores Island)",
-    7: "Holders of Other Higher Courses",
-    10: "Ordinance No. 854-B/99",
-    15: "International Student (Bachelor)",
-    16: "1st Phase - Special Contingent (Madeira Island)",
-    17: "2nd Phase - General Contingent",
-    18: "3rd Phase - General Contingent",
-    26: "Ordinance No. 533-A/99, Item b2) (Different Plan)",
-    27: "Ordinance No. 533-A/99, Item b3 (Other Institution)",
-    39: "Over 23 Years Old",
-    42: "Transfer",
-    43: "Change of Course",
-    44: "Technological Specialization Diploma Holders",
-    51: "Change of Institution/Course",
-    53: "Short Cycle Diploma Holders",
-    57: "Change of Institution/Course (International)",
-}
-
-course_map = {
-    33: "Biofuel Production Technologies",
-    171: "Animation and Multimedia Design",
-    8014: "Social Service (Evening Attendance)",
-    9003: "Agronomy",
-    9070: "Communication Design",
-    9085: "Veterinary Nursing",
-    9119: "Informatics Engineering",
-    9130: "Equinculture",
-    9147: "Management",
-    9238: "Social Service",
-    9254: "Tourism",
-    9500: "Nursing",
-    9556: "Oral Hygiene",
-    9670: "Advertising and Marketing Management",
-    9773: "Journalism and Communication",
-    9853: "Basic Education",
-    9991: "Management (Evening Attendance)",
-}
-
-daytime_evening_attendance_map = {1: "Daytime", 0: "Evening"}
-
-previous_qualification_map = {
-    1: "Secondary Education",
-    2: "Higher Education - Bachelor's Degree",
-    3: "Higher Education - Degree",
-    4: "Higher Education - Master's",
-    5: "Higher Education - Doctorate",
-    6: "Frequency of Higher Education",
-    9: "12th Year of Schooling - Not Completed",
-    10: "11th Year of Schooling - Not Completed",
-    12: "Other - 11th Year of Schooling",
-    14: "10th Year of Schooling",
-    15: "10th Year of Schooling - Not Completed",
-    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
-    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
-    39: "Technological Specialization Course",
-    40: "Higher Education - Degree (1st Cycle)",
-    42: "Professional Higher Technical Course",
-    43: "Higher Education - Master (2nd Cycle)",
-}
-
-nationality_map = {
-    1: "Portuguese",
-    2: "German",
-    6: "Spanish",
-    11: "Italian",
-    13: "Dutch",
-    14: "English",
-    17: "Lithuanian",
-    21: "Angolan",
-    22: "Cape Verdean",
-    24: "Guinean",
-    25: "Mozambican",
-    26: "Santomean",
-    32: "Turkish",
-    41: "Brazilian",
-    62: "Romanian",
-    100: "Moldova (Republic of)",
-    101: "Mexican",
-    103: "Ukrainian",
-    105: "Russian",
-    108: "Cuban",
-    109: "Colombian",
-}
-
-mothers_qualification_map = {
-    1: "Secondary Education - 12th Year of Schooling or Eq.",
-    2: "Higher Education - Bachelor's Degree",
-    3: "Higher Education - Degree",
-    4: "Higher Education - Master's",
-    5: "Higher Education - Doctorate",
-    6: "Frequency of Higher Education",
-    9: "12th Year of Schooling - Not Completed",
-    10: "11th Year of Schooling - Not Completed",
-    11: "7th Year (Old)",
-    12: "Other - 11th Year of Schooling",
-    14: "10th Year of Schooling",
-    18: "General Commerce Course",
-    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
-    22: "Technical-Professional Course",
-    26: "7th Year of Schooling",
-    27: "2nd Cycle of the General High School Course",
-    29: "9th Year of Schooling - Not Completed",
-    30: "8th Year of Schooling",
-    34: "Unknown",
-    35: "Can't Read or Write",
-    36: "Can Read without Having a 4th Year of Schooling",
-    37: "Basic Education 1st Cycle (4th/5th Year) or Equiv.",
-    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
-    39: "Technological Specialization Course",
-    40: "Higher Education - Degree (1st Cycle)",
-    41: "Specialized Higher Studies Course",
-    42: "Professional Higher Technical Course",
-    43: "Higher Education - Master (2nd Cycle)",
-    44: "Higher Education - Doctorate (3rd Cycle)",
-}
-
-fathers_qualification_map = {
-    1: "Secondary Education - 12th Year of Schooling or Eq.",
-    2: "Higher Education - Bachelor's Degree",
-    3: "Higher Education - Degree",
-    4: "Higher Education - Master's",
-    5: "Higher Education - Doctorate",
-    6: "Frequency of Higher Education",
-    9: "12th Year of Schooling - Not Completed",
-    10: "11th Year of Schooling - Not Completed",
-    11: "7th Year (Old)",
-    12: "Other - 11th Year of Schooling",
-    13: "2nd Year Complementary High School Course",
-    14: "10th Year of Schooling",
-    18: "General Commerce Course",
-    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
-    20: "Complementary High School Course",
-    22: "Technical-Professional Course",
-    25: "Complementary High School Course - Not Concluded",
-    26: "7th Year of Schooling",
-    27: "2nd Cycle of the General High School Course",
-    29: "9th Year of Schooling - Not Completed",
-    30: "8th Year of Schooling",
-    31: "General Course of Administration and Commerce",
-    33: "Supplementary Accounting and Administration",
-    34: "Unknown",
-    35: "Can't Read or Write",
-    36: "Can Read without Having a 4th Year of Schooling",
-    37: "Basic Education 1st Cycle (4th/5th Year) or Equiv.",
-    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
-    39: "Technological Specialization Course",
-    40: "Higher Education - Degree (1st Cycle)",
-    41: "Specialized Higher Studies Course",
-    42: "Professional Higher Technical Course",
-    43: "Higher Education - Master (2nd Cycle)",
-    44: "Higher Education - Doctorate (3rd Cycle)",
-}
-
-mothers_occupation_map = {
-    0: "Student",
-    1: "Representatives of the Legislative Power and Executive Bodies, Directors, Directors and Executive Managers",
-    2: "Specialists in Intellectual and Scientific Activities",
-    3: "Intermediate Level Technicians and Professions",
-    4: "Administrative Staff",
-    5: "Personal Services, Security and Safety Workers and Sellers",
-    6: "Farmers and Skilled Workers in Agriculture, Fisheries and Forestry",
-    7: "Skilled Workers in Industry, Construction and Craftsmen",
-    8: "Installation and Machine Operators and Assembly Workers",
-    9: "Unskilled Workers",
-    10: "Armed Forces Professions",
-    90: "Other Situation",
-    99: "(blank)",
-    122: "Health Professionals",
-    123: "Teachers",
-    125: "Specialists in Information and Communication Technologies (ICT)",
-    131: "Intermediate Level Science and Engineering Technicians and Professions",
-    132: "Technicians and Professionals, of Intermediate Level of Health",
-    134: "Intermediate Level Technicians from Legal, Social, Sports, Cultural and Similar Services",
-    141: "Office Workers, Secretaries in General and Data Processing Operators",
-    143: "Data, Accounting, Statistical, Financial Services and Registry-Related Operators",
-    144: "Other Administrative Support Staff",
-    151: "Personal Service Workers",
-    152: "Sellers",
-    153: "Personal Care Workers and the Like",
-    171: "Skilled Construction Workers and the Like, Except Electricians",
-    173: "Skilled Workers in Printing, Precision Instrument Manufacturing, Jewelers, Artisans and the Like",
-    175: "Workers in Food Processing, Woodworking, Clothing and Other Industries and Crafts",
-    191: "Cleaning Workers",
-    192: "Unskilled Workers in Agriculture, Animal Production, Fisheries and Forestry",
-    193: "Unskilled Workers in Extractive Industry, Construction, Manufacturing and Transport",
-    194: "Meal Preparation Assistants",
-}
-
-fathers_occupation_map = {
-    0: "Student",
-    1: "Representatives of the Legislative Power and Executive Bodies, Directors, Directors and Executive Managers",
-    2: "Specialists in Intellectual and Scientific Activities",
-    3: "Intermediate Level Technicians and Professions",
-    4: "Administrative Staff",
-    5: "Personal Services, Security and Safety Workers and Sellers",
-    6: "Farmers and Skilled Workers in Agriculture, Fisheries and Forestry",
-    7: "Skilled Workers in Industry, Construction and Craftsmen",
-    8: "Installation and Machine Operators and Assembly Workers",
-    9: "Unskilled Workers",
-    10: "Armed Forces Professions",
-    90: "Other Situation",
-    99: "(blank)",
-    101: "Armed Forces Officers",
-    102: "Armed Forces Sergeants",
-    103: "Other Armed Forces Personnel",
-    112: "Directors of Administrative and Commercial Services",
-    114: "Hotel, Catering, Trade and Other Services Directors",
-    121: "Specialists in the Physical Sciences, Mathematics, Engineering and Related Techniques",
-    122: "Health Professionals",
-    123: "Teachers",
-    124: "Specialists in Finance, Accounting, Administrative Organization, Public and Commercial Relations",
-    131: "Intermediate Level Science and Engineering Technicians and Professions",
-    132: "Technicians and Professionals, of Intermediate Level of Health",
-    134: "Intermediate Level Technicians from Legal, Social, Sports, Cultural and Similar Services",
-    135: "Information and Communication Technology Technicians",
-    141: "Office Workers, Secretaries in General and Data Processing Operators",
-    143: "Data, Accounting, Statistical, Financial Services and Registry-Related Operators",
-    144: "Other Administrative Support Staff",
-    151: "Personal Service Workers",
-    152: "Sellers",
-    153: "Personal Care Workers and the Like",
-    154: "Protection and Security Services Personnel",
-    161: "Market-Oriented Farmers and Skilled Agricultural and Animal Production Workers",
-    163: "Farmers, Livestock Keepers, Fishermen, Hunters and Gatherers, Subsistence",
-    171: "Skilled Construction Workers and the Like, Except Electricians",
-    172: "Skilled Workers in Metallurgy, Metalworking and Similar",
-    174: "Skilled Workers in Electricity and Electronics",
-    175: "Workers in Food Processing, Woodworking, Clothing and Other Industries and Crafts",
-    181: "Fixed Plant and Machine Operators",
-    182: "Assembly Workers",
-    183: "Vehicle Drivers and Mobile Equipment Operators",
-    192: "Unskilled Workers in Agriculture, Animal Production, Fisheries and Forestry",
-    193: "Unskilled Workers in Extractive Industry, Construction, Manufacturing and Transport",
-    194: "Meal Preparation Assistants",
-    195: "Street Vendors (Except Food) and Street Service Providers",
-}
-
-displaced_map = {0: "No", 1: "Yes"}
-educational_special_needs_map = {0: "No", 1: "Yes"}
-debtor_map = {0: "No", 1: "Yes"}
-tuition_fees_uptodate_map = {0: "No", 1: "Yes"}
-gender_map = {0: "Female", 1: "Male"}
-scholarship_holder_map = {0: "No", 1: "Yes"}
-international_map = {0: "No", 1: "Yes"}
-
-
-# Mapping helper function to get key from value
-def get_key_from_value(mapping, value):
-    for k, v in mapping.items():
-        if v == value:
-            return k
-    return None
-
-
-# Define feature lists grouped by category for better UI organization
-base_academic_features = [
-    "Previous_qualification_grade",
-    "Admission_grade",
-    "Curricular_units_1st_sem_credited",
-    "Curricular_units_1st_sem_enrolled",
-    "Curricular_units_1st_sem_evaluations",
-    "Curricular_units_1st_sem_approved",
-    "Curricular_units_1st_sem_grade",
-    "Curricular_units_1st_sem_without_evaluations",
-    "Curricular_units_2nd_sem_credited",
-    "Curricular_units_2nd_sem_enrolled",
-    "Curricular_units_2nd_sem_evaluations",
-    "Curricular_units_2nd_sem_approved",
-    "Curricular_units_2nd_sem_grade",
-    "Curricular_units_2nd_sem_without_evaluations",
-]
-
-personal_background_features = [
-    "Age_at_enrollment",
-    "Marital_status",
-    "Nacionality",
-    "Mothers_qualification",
-    "Fathers_qualification",
-    "Mothers_occupation",
-    "Fathers_occupation",
-    "Gender",
-    "Displaced",
-]
-
-enrollment_financial_features = [
-    "Application_mode",
-    "Course",
-    "Daytime_evening_attendance",
-    "Previous_qualification",
-    "Debtor",
+# Uploads above this size are scored by the background job queue (jobs.py)
+LARGE_UPLOAD_BYTES = float(os.environ.get("LARGE_UPLOAD_MB", 20)) * 2**20
+JOB_POLL_SECONDS = 2
+# Features offered first in the what-if simulator, and how many can be varied
+WHAT_IF_DEFAULT_FEATURES = [
     "Tuition_fees_up_to_date",
     "Scholarship_holder",
-    "International",
-    "Educational_special_needs",
+    "Curricular_units_2nd_sem_approved",
 ]
-
-external_features = ["Unemployment_rate", "Inflation_rate", "GDP"]
-
-# Engineered features
-engineered_features_list = [
-    "Avg_Grade_Sem1",
-    "Avg_Grade_Sem2",
-    "Approved_Ratio_Sem1",
-    "Approved_Ratio_Sem2",
-    "Grade_Change_Sem1_to_2",
-    "Total_Approved_Units",
-    "Total_Enrolled_Units",
-]
-
-# all_features_ordered
-all_features_ordered = (
-    base_academic_features
-    + personal_background_features
-    + enrollment_financial_features
-    + external_features
-    + engineered_features_list
-)
+WHAT_IF_MAX_FEATURES = 3
 
 
 # --- Function to create a downloadable link for the template CSV ---
@@ -358,16 +69,34 @@ def get_binary_file_downloader_html(bin_file, file_label="File"):
 
 # --- Load the pipeline ---
 @st.cache_resource
-def load_pipeline(model_path):
-    """Loads the trained pipeline (which includes preprocessor and model)."""
-    try:
-        pipeline = joblib.load(model_path)
+def get_model_cache():
+    """Loaded models shared by all sessions, bounded by MODEL_CACHE_MAX_MB."""
+    max_mb = os.environ.get("MODEL_CACHE_MAX_MB")
+    max_bytes = int(float(max_mb) * 2**20) if max_mb else DEFAULT_CACHE_MAX_BYTES
+    return ModelCache(max_bytes)
+
+
+@st.cache_resource(max_entries=1)
+def get_model_loader(model_path, model_file_fingerprint=None):
+    """Starts importing, loading and warming up the pipeline in the background.
+
+    The page renders while the model loads; only the first prediction waits for
+    it. ``model_file_fingerprint`` is only part of the cache key, so a replaced
+    model file is loaded again instead of serving the stale pipeline. Loaded
+    pipelines live in the memory-bounded ``get_model_cache``, so switching back
+    to a recently used model does not load it again.
+    """
+    return ModelLoader(load_func=get_model_cache().get, model_path=model_path)
+
 
-        st.success("Pipeline model berhasil dimuat.")
+def load_pipeline(model_loader):
+    """Waits for the background loader and returns the pipeline (None on error)."""
+    try:
+        pipeline, _ = model_loader.result()
         return pipeline
     except FileNotFoundError:
         st.error(
-            f"Error: Model file tidak ditemukan. Pastikan direktori '{MODEL_DIR}' dengan file '{os.path.basename(model_path)}' ada."
+            f"Error: Model file tidak ditemukan. Pastikan direktori '{MODEL_DIR}' dengan file '{os.path.basename(selected_model_path)}' ada."
         )
         return None
     except Exception as e:
@@ -375,7 +104,393 @@ def load_pipeline(model_path):
         return None
 
 
-pipeline = load_pipeline(MODEL_PATH)
+@st.cache_resource(max_entries=4)
+def get_prediction_cache(model_path, model_file_fingerprint):
+    """Prediction cache shared by all sessions; set PREDICTION_CACHE_DB to persist it.
+
+    Keyed by the fingerprint pinned to the loaded pipeline, so its entries always
+    come from that model version. Other registry models get their own database
+    next to it, since a cache database only keeps the entries of one model.
+    """
+    db_path = os.environ.get("PREDICTION_CACHE_DB")
+    if db_path and os.path.abspath(model_path) != os.path.abspath(MODEL_PATH):
+        root, extension = os.path.splitext(db_path)
+        model_stem = os.path.splitext(os.path.basename(model_path))[0]
+        db_path = f"{root}-{model_stem}{extension}"
+    return PredictionCache(
+        model_path, db_path=db_path, fingerprint=model_file_fingerprint
+    )
+
+
+@st.cache_resource
+def get_job_queue():
+    """Job queue shared by all sessions; starts JOB_WORKERS (default 1) worker threads.
+
+    With JOB_WORKERS=0 the jobs are left to ``python jobs.py worker`` processes.
+    """
+    job_queue = JobQueue(os.environ.get("JOB_DIR", DEFAULT_JOB_DIR))
+    start_workers(job_queue, int(os.environ.get("JOB_WORKERS", 1)), get_model_cache().get)
+    return job_queue
+
+
+@st.cache_resource(max_entries=2)
+def load_job_result(result_path):
+    return pd.read_parquet(result_path)
+
+
+@st.cache_resource(max_entries=1)
+def get_explainer(model_path, model_file_fingerprint, _pipeline):
+    """Feature-contribution explainer of the selected pipeline."""
+    return Explainer(_pipeline)
+
+
+def show_results(result_df, id_name, export_format, exports, key="results"):
+    """Filter/sort controls, the current page of ``result_df`` and its download.
+
+    Only the visible page is sent to the browser. ``exports`` caches the
+    download bytes per format for this result; ``key`` keeps the widgets of
+    several result views apart.
+    """
+    filter_cols = st.columns([2, 1, 1])
+    with filter_cols[0]:
+        min_probability, max_probability = st.slider(
+            "Rentang probabilitas Dropout:",
+            min_value=0.0,
+            max_value=1.0,
+            value=(0.0, 1.0),
+            step=0.01,
+            key=f"{key}_probability",
+        )
+    with filter_cols[1]:
+        status_filter = st.selectbox("Status:", STATUS_FILTERS, key=f"{key}_status")
+    with filter_cols[2]:
+        page_size = st.selectbox(
+            "Baris per halaman:",
+            (25, DEFAULT_PAGE_SIZE, 100, 250),
+            index=1,
+            key=f"{key}_page_size",
+        )
+    sort_cols = st.columns([2, 1])
+    with sort_cols[0]:
+        sort_by = st.selectbox(
+            "Urutkan berdasarkan:",
+            ["Probability_Dropout", id_name],
+            key=f"{key}_sort_by",
+        )
+    with sort_cols[1]:
+        ascending = st.checkbox("Urutan naik", value=False, key=f"{key}_ascending")
+
+    with diagnostics.stage("filter_results"):
+        positions = filter_positions(
+            result_df, min_probability, max_probability, status_filter
+        )
+        n_matching = len(positions)
+        n_pages = max(1, -(-n_matching // page_size))
+        page = st.number_input(
+            "Halaman:",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            step=1,
+            key=f"{key}_page_{n_pages}",
+        )
+        page_df = page_rows(result_df, positions, sort_by, ascending, page, page_size)
+
+    st.write("Hasil prediksi:")
+    display_cols = [
+        id_name,
+        "Predicted_Status",
+        "Probability_Non_Dropout",
+        "Probability_Dropout",
+    ]
+    display_cols += [col for col in page_df.columns if col.startswith("Driver_")]
+    with diagnostics.stage("render_dataframe"):
+        st.dataframe(page_df[display_cols], hide_index=True)
+    st.caption(
+        f"{n_matching:,} dari {len(result_df):,} mahasiswa sesuai filter; halaman {page} dari {n_pages}."
+    )
+
+    # Opsi untuk download hasil prediksi (dibuat sekali per hasil dan format)
+    if export_format not in exports:
+        with diagnostics.stage(f"{export_format.lower()}_export"):
+            exports[export_format] = export_results(result_df, export_format)
+    if export_format == "Parquet":
+        st.download_button(
+            label="Download Hasil Prediksi sebagai Parquet",
+            data=exports[export_format],
+            file_name="prediksi_status_mahasiswa.parquet",
+            mime="application/vnd.apache.parquet",
+            key=f"{key}_download",
+        )
+    else:
+        st.download_button(
+            label="Download Hasil Prediksi sebagai CSV",
+            data=exports[export_format],
+            file_name="prediksi_status_mahasiswa.csv",
+            mime="text/csv",
+            key=f"{key}_download",
+        )
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_job(job_queue, job_id):
+    """Shows a running job's progress; reruns the page once it has finished."""
+    job = job_queue.get(job_id)
+    if job["status"] not in ACTIVE_STATUSES:
+        st.rerun()
+    if job["status"] == "queued":
+        st.info("Pekerjaan menunggu giliran di antrean...")
+    else:
+        total = job["n_rows_total"] or 0
+        done = job["n_rows_done"]
+        st.progress(
+            min(done / total, 1.0) if total else 0.0,
+            text=f"Diproses: {done:,} dari {total:,} baris",
+        )
+
+
+def show_jobs(job_queue):
+    """Status of the background jobs; the selected job is kept in the URL."""
+    jobs = job_queue.recent()
+    if not jobs:
+        return
+    st.subheader("Pekerjaan Latar Belakang")
+    job_ids = [job["job_id"] for job in jobs]
+    labels = {
+        job["job_id"]: f"{job['file_name']} ({job['status']}, {job['created_at'][:16].replace('T', ' ')})"
+        for job in jobs
+    }
+    selected = st.query_params.get("job")
+    job_id = st.selectbox(
+        "Pilih pekerjaan:",
+        job_ids,
+        index=job_ids.index(selected) if selected in job_ids else 0,
+        format_func=labels.get,
+        key="job_select",
+    )
+    st.query_params["job"] = job_id
+
+    job = job_queue.get(job_id)
+    if job["status"] in ACTIVE_STATUSES:
+        poll_job(job_queue, job_id)
+    elif job["status"] == "failed":
+        st.error(f"Pekerjaan gagal: {job['error']}")
+    else:
+        st.success(f"Pekerjaan selesai: {job['n_rows_done']:,} mahasiswa diprediksi.")
+        job_export_format = st.radio(
+            "Format file hasil prediksi:",
+            ("CSV", "Parquet"),
+            horizontal=True,
+            key="job_export_format",
+        )
+        exports = st.session_state.setdefault(f"job_exports_{job_id}", {})
+        show_results(
+            load_job_result(job_queue.result_path(job_id)),
+            ROW_ID_COLUMN,
+            job_export_format,
+            exports,
+            key=f"job_{job_id}",
+        )
+
+
+def what_if_values(feature, value, key):
+    """Widgets for the candidate values of one what-if feature; returns the values.
+
+    Categories are picked from their labels; numbers are a range around the
+    student's current ``value``.
+    """
+    label = feature.replace("_", " ")
+    if feature in LABEL_MAPS:
+        label_map = LABEL_MAPS[feature]
+        current = label_map.label(value)
+        if len(label_map.options) <= 4 or current is None:
+            default = list(label_map.options[:4])
+        else:
+            default = [current]
+        selected = st.multiselect(
+            f"{label}:", label_map.options, default=default, key=key
+        )
+        return [label_map.code(option) for option in selected]
+
+    value_cols = st.columns(3)
+    if feature in float_input_features:
+        value = float(value)
+        span = max(abs(value) * 0.1, 1.0)
+        with value_cols[0]:
+            low = st.number_input(
+                f"{label} dari:", value=max(value - span, 0.0), format="%.2f", key=f"{key}_low"
+            )
+        with value_cols[1]:
+            high = st.number_input(
+                "sampai:", value=value + span, format="%.2f", key=f"{key}_high"
+            )
+        with value_cols[2]:
+            n_steps = st.number_input(
+                "Jumlah titik:", min_value=2, max_value=50, value=5, key=f"{key}_steps"
+            )
+        return np.linspace(low, high, n_steps).round(4).tolist()
+
+    value = int(value)
+    with value_cols[0]:
+        low = st.number_input(f"{label} dari:", value=value, step=1, key=f"{key}_low")
+    with value_cols[1]:
+        high = st.number_input("sampai:", value=value + 2, step=1, key=f"{key}_high")
+    with value_cols[2]:
+        step = st.number_input(
+            "Langkah:", min_value=1, value=1, step=1, key=f"{key}_step"
+        )
+    return list(range(low, high + 1, step))
+
+
+def what_if_chart(scenario_df, features):
+    """Dropout probability surface: heatmap of the first two features, a line for one.
+
+    A third feature splits the heatmap into one panel per value.
+    """
+    if len(features) == 1:
+        return (
+            alt.Chart(scenario_df)
+            .mark_line(point=True)
+            .encode(
+                x=alt.X(f"{features[0]}:O", sort=None),
+                y=alt.Y("Probability_Dropout:Q", scale=alt.Scale(domain=[0, 1])),
+                tooltip=features + ["Probability_Dropout", "Probability_Change"],
+            )
+        )
+    chart = (
+        alt.Chart(scenario_df)
+        .mark_rect()
+        .encode(
+            x=alt.X(f"{features[0]}:O", sort=None),
+            y=alt.Y(f"{features[1]}:O", sort=None),
+            color=alt.Color(
+                "Probability_Dropout:Q",
+                scale=alt.Scale(domain=[0, 1], scheme="redyellowgreen", reverse=True),
+            ),
+            tooltip=features + ["Probability_Dropout", "Probability_Change"],
+        )
+    )
+    if len(features) == 3:
+        chart = chart.properties(width=180).facet(column=alt.Column(f"{features[2]}:O", sort=None))
+    return chart
+
+
+def show_what_if(student_df, student_name, threshold, signature):
+    """What-if simulator: scores a grid of changes to one student in one model call."""
+    features = st.multiselect(
+        f"Fitur yang diubah (maksimum {WHAT_IF_MAX_FEATURES}):",
+        input_features_ordered,
+        default=WHAT_IF_DEFAULT_FEATURES,
+        max_selections=WHAT_IF_MAX_FEATURES,
+        format_func=lambda feature: feature.replace("_", " "),
+        key="what_if_features",
+    )
+    if not features:
+        return
+    student = student_df.iloc[0]
+    axes = {
+        feature: what_if_values(feature, student[feature], key=f"what_if_{feature}")
+        for feature in features
+    }
+    n_scenarios = int(np.prod([len(values) for values in axes.values()]))
+    st.caption(f"{n_scenarios:,} skenario untuk {student_name}.")
+
+    what_if_signature = (
+        signature,
+        tuple((feature, tuple(values)) for feature, values in axes.items()),
+    )
+    if st.button("Jalankan Simulasi", disabled=n_scenarios == 0):
+        st.session_state.pop("what_if_results", None)
+        with diagnostics.stage("model_load_wait"):
+            pipeline = load_pipeline(model_loader)
+        try:
+            if pipeline is None:
+                raise RuntimeError("Pipeline model tidak berhasil dimuat.")
+            start = time.perf_counter()
+            with diagnostics.stage("what_if"):
+                scenario_df, baseline_probability = simulate(
+                    pipeline, student_df, axes, threshold
+                )
+            st.session_state["what_if_results"] = {
+                "signature": what_if_signature,
+                "scenario_df": scenario_df,
+                "baseline_probability": baseline_probability,
+                "seconds": time.perf_counter() - start,
+            }
+        except Exception as e:
+            st.error(f"Error selama simulasi: {e}")
+
+    what_if_results = st.session_state.get("what_if_results")
+    if not what_if_results or what_if_results["signature"] != what_if_signature:
+        return
+    # Codes are shown as their labels
+    scenario_df = what_if_results["scenario_df"].copy()
+    for feature in features:
+        if feature in LABEL_MAPS:
+            scenario_df[feature] = scenario_df[feature].map(LABEL_MAPS[feature].code_to_label)
+    st.metric(
+        "Probabilitas Dropout saat ini",
+        f"{what_if_results['baseline_probability']:.1%}",
+    )
+    st.caption(
+        f"{len(scenario_df):,} skenario diprediksi dalam {what_if_results['seconds'] * 1000:.0f} ms."
+    )
+    st.altair_chart(what_if_chart(scenario_df, features))
+    st.write("Skenario dengan probabilitas Dropout terendah:")
+    st.dataframe(
+        scenario_df.sort_values("Probability_Dropout", kind="stable").head(20),
+        hide_index=True,
+    )
+
+
+# --- Model selection from the registry (models/) ---
+model_entries = ModelRegistry(MODEL_DIR).list()
+selected_model_path = MODEL_PATH
+if model_entries:
+    model_paths = [entry.path for entry in model_entries]
+    model_labels = {}
+    for entry in model_entries:
+        cv_auc = entry.metadata.get("cv_roc_auc")
+        auc_label = f", ROC AUC CV {cv_auc:.4f}" if cv_auc is not None else ""
+        model_labels[entry.path] = f"{entry.spec} (dilatih {entry.trained_at[:10]}{auc_label})"
+    default_path = next(
+        (
+            path
+            for path in model_paths
+            if os.path.abspath(path) == os.path.abspath(MODEL_PATH)
+        ),
+        model_paths[0],
+    )
+    selected_model_path = st.sidebar.selectbox(
+        "Model:",
+        model_paths,
+        index=model_paths.index(default_path),
+        format_func=model_labels.get,
+    )
+
+try:
+    current_model_fingerprint = model_fingerprint(selected_model_path)
+except FileNotFoundError:
+    current_model_fingerprint = None
+    st.error(
+        f"Error: Model file tidak ditemukan. Pastikan direktori '{MODEL_DIR}' dengan file '{os.path.basename(selected_model_path)}' ada."
+    )
+
+model_loader = (
+    get_model_loader(selected_model_path, current_model_fingerprint)
+    if current_model_fingerprint
+    else None
+)
+
+# --- Opt-in diagnostics: set APP_DIAGNOSTICS_LOG to a log file path to enable ---
+diagnostics_log_path = os.environ.get("APP_DIAGNOSTICS_LOG")
+if "diagnostics_session_id" not in st.session_state:
+    st.session_state["diagnostics_session_id"] = uuid.uuid4().hex
+diagnostics = Instrumentation(
+    enabled=bool(diagnostics_log_path),
+    log_path=diagnostics_log_path,
+    session_id=st.session_state["diagnostics_session_id"],
+)
 
 
 # --- Streamlit App Title and Description ---
@@ -385,13 +500,26 @@ st.write(
 )
 st.markdown("---")
 
-if pipeline:
+if model_loader:
+    if model_loader.done():
+        pipeline = load_pipeline(model_loader)
+        if pipeline is not None:
+            _, startup_timings = model_loader.result()
+            st.success("Pipeline model berhasil dimuat.")
+            st.caption(f"Waktu startup model: {format_timings(startup_timings)}")
+    else:
+        st.info("Pipeline model sedang dimuat di latar belakang...")
+
     st.header("Metode Input Data")
     input_method = st.radio(
         "Pilih metode input data:", ("Input Manual", "Unggah File CSV")
     )
 
     input_df = None
+    # Optional student IDs of an upload; results are identified by row number otherwise
+    input_ids = None
+    id_name = ROW_ID_COLUMN
+    input_signature = None
 
     if input_method == "Input Manual":
         st.header("Masukkan Data Mahasiswa (Input Manual)")
@@ -457,92 +585,12 @@ if pipeline:
                             format="%d",
                         )
                     # --- MODIFIKASI UNTUK FITUR KATEGORIKAL ---
-                    elif feature == "Marital_status":
-                        mapping = marital_status_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Gender":
-                        mapping = gender_map
-                        display_options = list(mapping.values())
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Displaced":
-                        mapping = displaced_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Nacionality":
-                        mapping = nationality_map
-                        display_options = list(mapping.values())
-                        display_options.sort()  # Urutkan untuk kemudahan pengguna
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Mothers_qualification":
-                        mapping = mothers_qualification_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Fathers_qualification":
-                        mapping = fathers_qualification_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Mothers_occupation":
-                        mapping = mothers_occupation_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Fathers_occupation":
-                        mapping = fathers_occupation_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
+                    elif feature in LABEL_MAPS:
+                        label_map = LABEL_MAPS[feature]
                         selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
+                            f"{feature.replace('_', ' ')}:", options=label_map.options
                         )
+                        input_data[feature] = label_map.code(selected_label)
 
                 col_idx = (col_idx + 1) % 2
 
@@ -554,101 +602,12 @@ if pipeline:
             for feature in enrollment_financial_features:
                 with cols_enrollment[col_idx]:
                     # --- MODIFIKASI UNTUK FITUR KATEGORIKAL ---
-                    if feature == "Application_mode":
-                        mapping = application_mode_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Course":
-                        mapping = course_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Daytime_evening_attendance":
-                        mapping = daytime_evening_attendance_map
-                        display_options = list(mapping.values())
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Previous_qualification":
-                        mapping = previous_qualification_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Debtor":
-                        mapping = debtor_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Tuition_fees_up_to_date":
-                        mapping = tuition_fees_uptodate_map
-                        display_options = list(mapping.values())
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Scholarship_holder":
-                        mapping = scholarship_holder_map
-                        display_options = list(mapping.values())
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "International":
-                        mapping = international_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
-                        selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
-                        )
-
-                    elif feature == "Educational_special_needs":
-                        mapping = educational_special_needs_map
-                        display_options = list(mapping.values())
-                        display_options.sort()
+                    if feature in LABEL_MAPS:
+                        label_map = LABEL_MAPS[feature]
                         selected_label = st.selectbox(
-                            f"{feature.replace('_', ' ')}:", options=display_options
-                        )
-                        input_data[feature] = get_key_from_value(
-                            mapping, selected_label
+                            f"{feature.replace('_', ' ')}:", options=label_map.options
                         )
+                        input_data[feature] = label_map.code(selected_label)
 
                 col_idx = (col_idx + 1) % 2
 
@@ -665,95 +624,24 @@ if pipeline:
                         min_value=0.0,
                     )
 
-        input_df = pd.DataFrame([input_data])
-
-        if all(
-            col in input_df.columns
-            for col in [
-                "Curricular_units_1st_sem_grade",
-                "Curricular_units_2nd_sem_grade",
-            ]
-        ):
-            input_df["Avg_Grade_Sem1"] = input_df["Curricular_units_1st_sem_grade"]
-            input_df["Avg_Grade_Sem2"] = input_df["Curricular_units_2nd_sem_grade"]
-            input_df["Grade_Change_Sem1_to_2"] = (
-                input_df["Avg_Grade_Sem2"] - input_df["Avg_Grade_Sem1"]
-            )
-        else:
-            input_df["Avg_Grade_Sem1"] = pd.NA
-            input_df["Avg_Grade_Sem2"] = pd.NA
-            input_df["Grade_Change_Sem1_to_2"] = pd.NA
-
-        if all(
-            col in input_df.columns
-            for col in [
-                "Curricular_units_1st_sem_approved",
-                "Curricular_units_1st_sem_enrolled",
-            ]
-        ):
-            input_df["Approved_Ratio_Sem1"] = input_df[
-                "Curricular_units_1st_sem_approved"
-            ] / input_df["Curricular_units_1st_sem_enrolled"].replace(0, pd.NA)
-        else:
-            input_df["Approved_Ratio_Sem1"] = pd.NA
-
-        if all(
-            col in input_df.columns
-            for col in [
-                "Curricular_units_2nd_sem_approved",
-                "Curricular_units_2nd_sem_enrolled",
-            ]
-        ):
-            input_df["Approved_Ratio_Sem2"] = input_df[
-                "Curricular_units_2nd_sem_approved"
-            ] / input_df["Curricular_units_2nd_sem_enrolled"].replace(0, pd.NA)
-        else:
-            input_df["Approved_Ratio_Sem2"] = pd.NA
-
-        if all(
-            col in input_df.columns
-            for col in [
-                "Curricular_units_1st_sem_approved",
-                "Curricular_units_2nd_sem_approved",
-            ]
-        ):
-            input_df["Total_Approved_Units"] = (
-                input_df["Curricular_units_1st_sem_approved"]
-                + input_df["Curricular_units_2nd_sem_approved"]
-            )
-        else:
-            input_df["Total_Approved_Units"] = pd.NA
-
-        if all(
-            col in input_df.columns
-            for col in [
-                "Curricular_units_1st_sem_enrolled",
-                "Curricular_units_2nd_sem_enrolled",
-            ]
-        ):
-            input_df["Total_Enrolled_Units"] = (
-                input_df["Curricular_units_1st_sem_enrolled"]
-                + input_df["Curricular_units_2nd_sem_enrolled"]
-            )
-        else:
-            input_df["Total_Enrolled_Units"] = pd.NA
+        input_signature = ("manual", tuple(input_data.items()))
+        with diagnostics.stage("feature_engineering"):
+            input_df = compact_dtypes(pd.DataFrame([input_data]))
 
-        input_df[engineered_features_list] = input_df[engineered_features_list].fillna(
-            0
-        )
+            add_engineered_features(input_df)
 
-        try:
-            input_df = input_df[all_features_ordered]
-        except KeyError as e:
-            st.error(
-                f"Error: Kolom yang diharapkan oleh pipeline tidak cocok dengan kolom input yang dibuat. Pastikan 'all_features_ordered' sesuai dengan pipeline Anda. Missing column: {e}"
-            )
-            input_df = None
+            try:
+                input_df = input_df[all_features_ordered]
+            except KeyError as e:
+                st.error(
+                    f"Error: Kolom yang diharapkan oleh pipeline tidak cocok dengan kolom input yang dibuat. Pastikan 'all_features_ordered' sesuai dengan pipeline Anda. Missing column: {e}"
+                )
+                input_df = None
 
     elif input_method == "Unggah File CSV":
         st.header("Unggah File CSV")
         st.write(
-            "Unggah file CSV yang berisi data mahasiswa. **Pastikan kolom sesuai dengan template dan menggunakan KODE NUMERIK untuk fitur kategorikal.**"  # Ubah instruksi agar jelas menggunakan kode
+            "Unggah file CSV yang berisi data mahasiswa. **Pastikan kolom sesuai dengan template. Fitur kategorikal boleh berisi KODE NUMERIK atau label teks.**"
         )
 
         template_csv_string = create_template_csv(all_features_ordered)
@@ -768,23 +656,76 @@ if pipeline:
             1. Unduh template CSV di atas.
             2. Buka file CSV menggunakan spreadsheet editor (seperti Excel, Google Sheets, atau LibreOffice Calc).
             3. **Masukkan data mahasiswa Anda MULAI dari baris ke-2.** Setiap baris mewakili data satu mahasiswa.
-            4. **Untuk fitur kategorikal (seperti Marital Status, Course, Debtor, dll.), masukkan KODE NUMERIKNYA (misal: 0, 1, 2) BUKAN label teksnya.**
+            4. **Untuk fitur kategorikal (seperti Marital Status, Course, Debtor, dll.), masukkan KODE NUMERIKNYA (misal: 0, 1, 2) atau label teksnya persis seperti pada form Input Manual (misal: Single, Nursing, Yes).**
             5. Biarkan baris pertama (judul kolom) tidak berubah.
-            6. Simpan file dalam format CSV (Comma-Separated Values).
+            6. Simpan file dalam format CSV (pemisah `,` maupun `;` dikenali otomatis).
             7. Unggah file CSV yang sudah Anda isi di bawah ini.
 
             **Catatan:** Fitur-fitur yang direkayasa (engineered features) akan dihitung otomatis jika kolom dasarnya ada. Pastikan kolom dasar yang dibutuhkan tersedia.
         """)
 
-        uploaded_file = st.file_uploader("Pilih file CSV", type=["csv"])
-
-        if uploaded_file is not None:
-            try:
-                input_df = pd.read_csv(uploaded_file)
+        uploaded_file = st.file_uploader(
+            "Pilih file CSV (atau Parquet/Arrow)",
+            type=["csv", "parquet", "arrow", "feather"],
+        )
 
+        if uploaded_file is not None and uploaded_file.size > LARGE_UPLOAD_BYTES:
+            # Large files are scored by a background worker, so the session is not
+            # blocked and a browser refresh does not discard the work
+            st.info(
+                f"File berukuran {uploaded_file.size / 2**20:.0f} MB akan diproses di latar belakang. Status dapat dipantau di bawah, juga setelah halaman dimuat ulang."
+            )
+            missing_cols = []
+            if file_format(uploaded_file.name) == "csv":
+                _, header_columns = read_csv_header(uploaded_file)
                 missing_cols = [
-                    col for col in all_features_ordered if col not in input_df.columns
+                    col for col in input_features_ordered if col not in header_columns
                 ]
+            if missing_cols:
+                st.error(
+                    f"Error: File CSV yang diunggah tidak memiliki kolom yang dibutuhkan oleh pipeline: {missing_cols}. Harap gunakan template yang disediakan dan pastikan semua kolom ada."
+                )
+            else:
+                job_threshold = st.slider(
+                    "Ambang batas probabilitas Dropout:",
+                    min_value=0.0,
+                    max_value=1.0,
+                    value=DEFAULT_THRESHOLD,
+                    step=0.01,
+                    key="job_threshold",
+                )
+                if st.button("Proses di Latar Belakang"):
+                    uploaded_file.seek(0)
+                    job_id = get_job_queue().submit(
+                        uploaded_file,
+                        uploaded_file.name,
+                        selected_model_path,
+                        job_threshold,
+                    )
+                    st.query_params["job"] = job_id
+                    st.success("File masuk antrean.")
+
+        elif uploaded_file is not None:
+            try:
+                if file_format(uploaded_file.name) == "csv":
+                    # The header is checked before any row is parsed, so a file
+                    # with wrong columns is rejected without reading it
+                    sep, header_columns = read_csv_header(uploaded_file)
+                    missing_cols = [
+                        col
+                        for col in input_features_ordered
+                        if col not in header_columns
+                    ]
+                    if not missing_cols:
+                        with diagnostics.stage("upload_parse"):
+                            input_df = read_student_csv(uploaded_file, sep)
+                else:
+                    with diagnostics.stage("upload_parse"):
+                        input_df = read_student_file(uploaded_file, uploaded_file.name)
+                    missing_cols = [
+                        col for col in input_features_ordered if col not in input_df.columns
+                    ]
+
                 if missing_cols:
                     st.error(
                         f"Error: File CSV yang diunggah tidak memiliki kolom yang dibutuhkan oleh pipeline: {missing_cols}. Harap gunakan template yang disediakan dan pastikan semua kolom ada."
@@ -796,96 +737,38 @@ if pipeline:
                     )
                     input_df = None
                 else:
-                    if all(
-                        col in input_df.columns
-                        for col in [
-                            "Curricular_units_1st_sem_grade",
-                            "Curricular_units_2nd_sem_grade",
-                        ]
-                    ):
-                        input_df["Avg_Grade_Sem1"] = input_df[
-                            "Curricular_units_1st_sem_grade"
-                        ]
-                        input_df["Avg_Grade_Sem2"] = input_df[
-                            "Curricular_units_2nd_sem_grade"
-                        ]
-                        input_df["Grade_Change_Sem1_to_2"] = (
-                            input_df["Avg_Grade_Sem2"] - input_df["Avg_Grade_Sem1"]
-                        )
-                    else:
-                        input_df["Avg_Grade_Sem1"] = pd.NA
-                        input_df["Avg_Grade_Sem2"] = pd.NA
-                        input_df["Grade_Change_Sem1_to_2"] = pd.NA
-
-                    if all(
-                        col in input_df.columns
-                        for col in [
-                            "Curricular_units_1st_sem_approved",
-                            "Curricular_units_1st_sem_enrolled",
-                        ]
-                    ):
-                        input_df["Approved_Ratio_Sem1"] = input_df[
-                            "Curricular_units_1st_sem_approved"
-                        ] / input_df["Curricular_units_1st_sem_enrolled"].replace(
-                            0, pd.NA
-                        )
-                    else:
-                        input_df["Approved_Ratio_Sem1"] = pd.NA
-
-                    if all(
-                        col in input_df.columns
-                        for col in [
-                            "Curricular_units_2nd_sem_approved",
-                            "Curricular_units_2nd_sem_enrolled",
-                        ]
-                    ):
-                        input_df["Approved_Ratio_Sem2"] = input_df[
-                            "Curricular_units_2nd_sem_approved"
-                        ] / input_df["Curricular_units_2nd_sem_enrolled"].replace(
-                            0, pd.NA
-                        )
-                    else:
-                        input_df["Approved_Ratio_Sem2"] = pd.NA
-
-                    if all(
-                        col in input_df.columns
-                        for col in [
-                            "Curricular_units_1st_sem_approved",
-                            "Curricular_units_2nd_sem_approved",
-                        ]
-                    ):
-                        input_df["Total_Approved_Units"] = (
-                            input_df["Curricular_units_1st_sem_approved"]
-                            + input_df["Curricular_units_2nd_sem_approved"]
-                        )
-                    else:
-                        input_df["Total_Approved_Units"] = pd.NA
-
-                    if all(
-                        col in input_df.columns
-                        for col in [
-                            "Curricular_units_1st_sem_enrolled",
-                            "Curricular_units_2nd_sem_enrolled",
-                        ]
-                    ):
-                        input_df["Total_Enrolled_Units"] = (
-                            input_df["Curricular_units_1st_sem_enrolled"]
-                            + input_df["Curricular_units_2nd_sem_enrolled"]
-                        )
-                    else:
-                        input_df["Total_Enrolled_Units"] = pd.NA
-
-                    input_df[engineered_features_list] = input_df[
-                        engineered_features_list
-                    ].fillna(0)
-
-                    try:
-                        input_df = input_df[all_features_ordered]
-                    except KeyError as e:
-                        st.error(
-                            f"Error: Kolom yang diharapkan oleh pipeline tidak cocok dengan kolom input dari CSV. Pastikan 'all_features_ordered' sesuai dengan pipeline Anda dan CSV memiliki semua kolom tersebut. Missing column: {e}"
-                        )
-                        input_df = None
+                    with diagnostics.stage("label_conversion"):
+                        input_df, unknown_labels = labels_to_codes_frame(input_df)
+                        compact_dtypes(input_df)
+                    if unknown_labels:
+                        st.warning(
+                            f"Label kategori tidak dikenal (akan diisi nilai yang paling sering oleh pipeline): {unknown_labels}"
+                        )
+
+                    extra_columns = [
+                        col for col in input_df.columns if col not in all_features_ordered
+                    ]
+                    if extra_columns:
+                        id_choice = st.selectbox(
+                            "Kolom ID mahasiswa untuk hasil prediksi:",
+                            [ROW_ID_COLUMN] + extra_columns,
+                            help="Kolom di luar fitur model yang mengidentifikasi mahasiswa; bawaan nomor baris.",
+                        )
+                        if id_choice != ROW_ID_COLUMN:
+                            id_name = id_choice
+                            input_ids = input_df[id_choice].to_numpy()
+                    input_signature = ("upload", uploaded_file.file_id, id_name)
+
+                    with diagnostics.stage("feature_engineering"):
+                        add_engineered_features(input_df)
+
+                        try:
+                            input_df = input_df[all_features_ordered]
+                        except KeyError as e:
+                            st.error(
+                                f"Error: Kolom yang diharapkan oleh pipeline tidak cocok dengan kolom input dari CSV. Pastikan 'all_features_ordered' sesuai dengan pipeline Anda dan CSV memiliki semua kolom tersebut. Missing column: {e}"
+                            )
+                            input_df = None
 
                     if input_df is not None:
                         st.success("File CSV berhasil dimuat dan diproses.")
@@ -894,61 +777,157 @@ if pipeline:
 
             except Exception as e:
                 st.error(
-                    f"Error membaca file CSV: {e}. Pastikan format file benar dan menggunakan KODE NUMERIK untuk fitur kategorikal."
+                    f"Error membaca file CSV: {e}. Pastikan format file benar dan fitur kategorikal berisi kode numerik atau label yang valid."
                 )
                 input_df = None
 
+        show_jobs(get_job_queue())
+
     st.markdown("---")
 
     # Prediction Button
     if input_df is not None and not input_df.empty:
+        threshold = st.slider(
+            "Ambang batas probabilitas Dropout:",
+            min_value=0.0,
+            max_value=1.0,
+            value=DEFAULT_THRESHOLD,
+            step=0.01,
+            help="Mahasiswa dengan probabilitas dropout di atas nilai ini diprediksi sebagai Dropout.",
+        )
+        export_format = st.radio(
+            "Format file hasil prediksi:", ("CSV", "Parquet"), horizontal=True
+        )
+        show_drivers = st.checkbox(
+            "Tampilkan 3 faktor pendorong utama per mahasiswa",
+            help="Kontribusi fitur terhadap log-odds Dropout; nilai positif mendorong ke arah Dropout.",
+        )
+        # Results outlive the button's rerun (paging and filtering rerun the
+        # script) but are hidden once the input or any setting changes
+        result_signature = (
+            input_signature,
+            selected_model_path,
+            current_model_fingerprint,
+            threshold,
+            show_drivers,
+        )
         if st.button("Prediksi Status"):
+            st.session_state.pop("prediction_results", None)
+            with diagnostics.stage("model_load_wait"):
+                pipeline = load_pipeline(model_loader)
             try:
-                predictions = pipeline.predict(input_df)
-                prediction_prob = pipeline.predict_proba(input_df)
-
-                st.header("Hasil Prediksi")
-
-                result_df = input_df.copy()
-                result_df["Predicted_Is_Dropout"] = predictions
-
-                result_df["Probability_Non_Dropout"] = prediction_prob[:, 0]
-                result_df["Probability_Dropout"] = prediction_prob[:, 1]
-
-                result_df["Predicted_Status"] = result_df["Predicted_Is_Dropout"].apply(
-                    lambda x: "Dropout" if x == 1 else "Non-Dropout"
+                if pipeline is None:
+                    raise RuntimeError("Pipeline model tidak berhasil dimuat.")
+                prediction_cache = get_prediction_cache(
+                    selected_model_path, pinned_fingerprint(pipeline)
                 )
+                with diagnostics.stage("pipeline"):
+                    prediction_df = predict_frame(
+                        pipeline, input_df, threshold, prediction_cache
+                    )
 
-                st.write("Hasil prediksi:")
-                display_cols = [
-                    "Predicted_Status",
-                    "Probability_Non_Dropout",
-                    "Probability_Dropout",
-                ]
-                st.dataframe(result_df[display_cols])
-
-                # Opsi untuk download hasil prediksi
-                @st.cache_data
-                def convert_df_to_csv(df):
-                    return df.to_csv(index=False).encode("utf-8")
-
-                csv_output = convert_df_to_csv(result_df)
+                driver_error = None
+                if show_drivers:
+                    # The prediction stands on its own if the explanation fails
+                    # (e.g. a registry model that is not an XGBoost booster)
+                    try:
+                        with diagnostics.stage("explanation"):
+                            explainer = get_explainer(
+                                selected_model_path, current_model_fingerprint, pipeline
+                            )
+                            prediction_df = prediction_df.join(
+                                explainer.top_drivers(input_df, k=3)
+                            )
+                    except Exception as e:
+                        driver_error = str(e)
+
+                with diagnostics.stage("result_assembly"):
+                    # ID and prediction columns only; the input features are not copied
+                    result_df = build_result_table(prediction_df, input_ids, id_name)
+
+                st.session_state["prediction_results"] = {
+                    "signature": result_signature,
+                    "result_df": result_df,
+                    "cache_stats": prediction_cache.stats(),
+                    "driver_error": driver_error,
+                    "exports": {},
+                }
+            except Exception as e:
+                st.error(f"Error selama proses prediksi: {e}")
 
-                st.download_button(
-                    label="Download Hasil Prediksi sebagai CSV",
-                    data=csv_output,
-                    file_name="prediksi_status_mahasiswa.csv",
-                    mime="text/csv",
+        prediction_results = st.session_state.get("prediction_results")
+        if prediction_results and prediction_results["signature"] == result_signature:
+            st.header("Hasil Prediksi")
+            if prediction_results["driver_error"]:
+                st.warning(
+                    f"Faktor pendorong tidak dapat dihitung: {prediction_results['driver_error']}"
                 )
+            show_results(
+                prediction_results["result_df"],
+                id_name,
+                export_format,
+                prediction_results["exports"],
+            )
+            cache_stats = prediction_results["cache_stats"]
+            st.caption(
+                f"Cache prediksi: {cache_stats['hits']} hit, {cache_stats['misses']} miss (hit rate {cache_stats['hit_rate']:.0%})."
+            )
 
-            except Exception as e:
-                st.error(f"Error selama proses prediksi: {e}")
+        with st.expander("Simulasi What-If"):
+            st.write(
+                "Lihat perubahan probabilitas dropout seorang mahasiswa bila beberapa fitur diubah, misalnya uang kuliah dilunasi, mendapat beasiswa, atau lulus lebih banyak unit semester 2. Semua kombinasi nilai diprediksi sekaligus."
+            )
+            student_position = 0
+            student_name = "mahasiswa ini"
+            if len(input_df) > 1:
+                student_position = (
+                    st.number_input(
+                        "Nomor baris mahasiswa:",
+                        min_value=1,
+                        max_value=len(input_df),
+                        value=1,
+                        step=1,
+                    )
+                    - 1
+                )
+                student_name = f"baris {student_position + 1}"
+                if input_ids is not None:
+                    student_name += f" ({id_name} {input_ids[student_position]})"
+            show_what_if(
+                input_df.iloc[[student_position]],
+                student_name,
+                threshold,
+                (
+                    input_signature,
+                    student_position,
+                    selected_model_path,
+                    current_model_fingerprint,
+                    threshold,
+                ),
+            )
 
     else:
         st.info(
             "Masukkan data secara manual atau unggah file CSV (setelah mengisi data pada template) untuk memulai prediksi."
         )
 
+    if diagnostics.records:
+        with st.expander("Diagnostik performa"):
+            st.dataframe(
+                pd.DataFrame(diagnostics.records).rename(
+                    columns={
+                        "stage": "Tahap",
+                        "seconds": "Waktu (detik)",
+                        "peak_mb": "Puncak memori (MB)",
+                    }
+                ),
+                hide_index=True,
+            )
+        diagnostics.write_log(
+            model=os.path.basename(selected_model_path),
+            input_method=input_method,
+            n_rows=0 if input_df is None else len(input_df),
+        )
 
 else:
     st.warning(
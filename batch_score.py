@@ -0,0 +1,677 @@
+"""Headless batch scoring: streams a large file through the pipeline in chunks.
+
+CSV, Parquet and Arrow IPC inputs and outputs are supported (by extension).
+
+Contoh penggunaan:
+
+    python batch_score.py data/data.csv hasil_prediksi.csv --sep ";"
+    python batch_score.py kohort.parquet hasil_prediksi.parquet
+    python batch_score.py kohort.csv risiko_tertinggi.csv --rank-top-k 20
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache import (
+    DEFAULT_MAX_ENTRIES,
+    PredictionCache,
+    StalePipelineError,
+    hash_rows,
+    model_fingerprint,
+    pinned_fingerprint,
+)
+from drift import DEFAULT_REFERENCE_PATH, format_report, load_monitor
+from explain import Explainer
+from features import compact_dtypes, input_features_ordered
+from incremental import PredictionTable, normalize_student_ids
+from ingest import ResultWriter, file_format, iter_input_batches, read_csv_header
+from ranking import DEFAULT_RANK_GROUPS, TopKRanker
+from registry import resolve_model_path
+from scoring import (
+    DEFAULT_THRESHOLD,
+    MODEL_PATH,
+    load_pipeline,
+    predict_frame,
+    prepare_features,
+)
+from shadow import DEFAULT_SHADOW_DB, ShadowScorer, load_challengers
+
+DEFAULT_CHUNKSIZE = 50_000
+# Size of the byte range each worker parses in parallel mode
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def validate_columns(columns):
+    missing_cols = [col for col in input_features_ordered if col not in columns]
+    if missing_cols:
+        raise ValueError(
+            f"File input tidak memiliki kolom yang dibutuhkan oleh pipeline: {missing_cols}"
+        )
+
+
+def score_chunk(
+    pipeline,
+    chunk,
+    threshold=DEFAULT_THRESHOLD,
+    cache=None,
+    shadow=None,
+    explainer=None,
+    explain_top_k=None,
+    drift=None,
+):
+    """Returns ``chunk`` with its engineered features and prediction columns.
+
+    With a ``shadow.ShadowScorer`` the chunk is also queued for the challengers.
+    With an ``explain.Explainer`` the top ``explain_top_k`` drivers (or all
+    contributions) per student are added. A ``drift.DriftMonitor`` is updated
+    with the chunk's features.
+    """
+    features_df = prepare_features(compact_dtypes(chunk))
+    prediction_df = predict_frame(pipeline, features_df, threshold, cache)
+    if drift is not None:
+        drift.update(features_df)
+    if shadow is not None:
+        shadow.submit(features_df, prediction_df["Probability_Dropout"], block=True)
+    if explainer is not None:
+        prediction_df = prediction_df.join(explainer.explain(features_df, explain_top_k))
+    return chunk.join(prediction_df, rsuffix="_pred")
+
+
+def score_file(
+    pipeline,
+    input_path,
+    output_path,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sep=None,
+    threshold=DEFAULT_THRESHOLD,
+    cache=None,
+    shadow=None,
+    explainer=None,
+    explain_top_k=None,
+    drift=None,
+):
+    """Scores ``input_path`` chunk by chunk, appending results to ``output_path``.
+
+    Input and output may each be CSV, Parquet or Arrow IPC (by extension).
+    Only one chunk is held in memory at a time. Returns the number of scored rows.
+    """
+    n_rows = 0
+    with ResultWriter(output_path) as writer:
+        for chunk in iter_input_batches(input_path, chunksize, sep):
+            if n_rows == 0:
+                validate_columns(chunk.columns)
+
+            writer.write(
+                score_chunk(
+                    pipeline,
+                    chunk,
+                    threshold,
+                    cache,
+                    shadow,
+                    explainer,
+                    explain_top_k,
+                    drift,
+                )
+            )
+            n_rows += len(chunk)
+    return n_rows
+
+
+def score_file_ranked(
+    pipeline,
+    input_path,
+    output_path,
+    top_k,
+    group_columns=DEFAULT_RANK_GROUPS,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sep=None,
+    threshold=DEFAULT_THRESHOLD,
+    cache=None,
+    shadow=None,
+    explainer=None,
+    explain_top_k=None,
+    drift=None,
+):
+    """Writes only the ``top_k`` highest-risk students per group to ``output_path``.
+
+    Scored chunks are streamed into a ``ranking.TopKRanker``, so memory grows
+    with ``top_k`` times the number of groups, not with the input. The output
+    adds the rank and the input row number. Returns ``(n_rows, n_groups)``.
+    """
+    ranker = TopKRanker(top_k, group_columns)
+    n_rows = 0
+    for chunk in iter_input_batches(input_path, chunksize, sep):
+        if n_rows == 0:
+            validate_columns(chunk.columns)
+            missing_cols = [col for col in group_columns if col not in chunk.columns]
+            if missing_cols:
+                raise ValueError(f"Kolom grup peringkat tidak ada di file input: {missing_cols}")
+
+        result_df = score_chunk(
+            pipeline,
+            chunk,
+            threshold,
+            cache,
+            shadow,
+            explainer,
+            explain_top_k,
+            drift,
+        )
+        ranker.update(result_df, np.arange(n_rows + 1, n_rows + len(chunk) + 1))
+        n_rows += len(chunk)
+
+    with ResultWriter(output_path) as writer:
+        writer.write(ranker.result())
+    return n_rows, ranker.n_groups
+
+
+def score_file_incremental(
+    pipeline,
+    table,
+    input_path,
+    output_path,
+    id_column,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sep=None,
+    threshold=DEFAULT_THRESHOLD,
+    explainer=None,
+    explain_top_k=None,
+    drift=None,
+):
+    """Scores only new or changed students of a snapshot into ``table``.
+
+    Rows are matched to ``incremental.PredictionTable`` by ``id_column`` and a
+    hash of their input features; unchanged rows skip feature engineering and
+    the model. The scored change set is written to ``output_path`` (which is
+    not created when nothing changed). IDs must be present and unique across
+    the whole file. Returns ``(n_rows, n_scored)``.
+    """
+    if os.path.exists(output_path):
+        # A stale change set from an earlier run must not be mistaken for this one
+        os.remove(output_path)
+    n_rows = 0
+    seen_ids = set()
+    with ResultWriter(output_path) as writer:
+        for chunk in iter_input_batches(
+            input_path, chunksize, sep, text_columns=[id_column]
+        ):
+            if n_rows == 0:
+                validate_columns(chunk.columns)
+                if id_column not in chunk.columns:
+                    raise ValueError(f"Kolom ID '{id_column}' tidak ada di file input.")
+            n_rows += len(chunk)
+
+            student_ids = normalize_student_ids(chunk[id_column])
+            duplicated = student_ids.duplicated() | student_ids.isin(seen_ids)
+            if duplicated.any():
+                duplicates = student_ids[duplicated].unique()[:5].tolist()
+                raise ValueError(f"ID mahasiswa duplikat di file input: {duplicates}")
+            seen_ids.update(student_ids)
+            # The engineered features derive from the raw inputs, so those suffice
+            row_hashes = hash_rows(chunk, input_features_ordered)
+            changed = table.changed_mask(student_ids, row_hashes)
+            if not changed.any():
+                continue
+
+            result_df = score_chunk(
+                pipeline,
+                chunk[changed].copy(),
+                threshold,
+                explainer=explainer,
+                explain_top_k=explain_top_k,
+                drift=drift,
+            )
+            table.upsert(
+                student_ids[changed].tolist(),
+                row_hashes[changed],
+                result_df[["Probability_Non_Dropout", "Probability_Dropout"]].to_numpy(),
+            )
+            writer.write(result_df)
+    return n_rows, writer.n_rows
+
+
+def split_byte_ranges(input_path, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Splits the data rows of a CSV into line-aligned ``(start, end)`` byte ranges.
+
+    Assumes no quoted field spans several lines, which holds for the numeric
+    student exports this script is meant for.
+    """
+    file_size = os.path.getsize(input_path)
+    with open(input_path, "rb") as f:
+        header = f.readline()
+        boundaries = [f.tell()]
+        while boundaries[-1] < file_size:
+            f.seek(min(boundaries[-1] + chunk_bytes, file_size))
+            f.readline()
+            boundaries.append(min(f.tell(), file_size))
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+
+_worker_pipeline = None
+_worker_cache = None
+_worker_explainer = None
+
+
+def _init_worker(
+    model_path, fingerprint, n_threads, cache_db, cache_size, explain_exact
+):
+    global _worker_pipeline, _worker_cache, _worker_explainer
+    _worker_pipeline = load_pipeline(model_path)
+    # All workers must score with the model version the run started with
+    if pinned_fingerprint(_worker_pipeline) != fingerprint:
+        raise StalePipelineError(f"File model '{model_path}' berubah selama proses berjalan.")
+    if cache_db:
+        _worker_cache = PredictionCache(model_path, cache_size, cache_db, fingerprint)
+    if explain_exact is not None:
+        _worker_explainer = Explainer(_worker_pipeline, exact=explain_exact)
+    # Avoid each worker's booster spawning a thread per core
+    model = _worker_pipeline.steps[-1][1]
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+
+
+def _score_byte_range(
+    input_path, header, start, end, part_path, sep, threshold, explain_top_k
+):
+    with open(input_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(header + data), sep=sep)
+    stats_before = _worker_cache.stats() if _worker_cache else None
+    result_df = score_chunk(
+        _worker_pipeline,
+        chunk,
+        threshold,
+        _worker_cache,
+        explainer=_worker_explainer,
+        explain_top_k=explain_top_k,
+    )
+    result_df.to_csv(part_path, header=start == len(header), index=False)
+    if stats_before is None:
+        return len(chunk), 0, 0
+    stats = _worker_cache.stats()
+    return (
+        len(chunk),
+        stats["hits"] - stats_before["hits"],
+        stats["misses"] - stats_before["misses"],
+    )
+
+
+def score_csv_parallel(
+    model_path,
+    input_path,
+    output_path,
+    workers,
+    chunk_bytes=DEFAULT_CHUNK_BYTES,
+    sep=None,
+    threshold=DEFAULT_THRESHOLD,
+    cache_db=None,
+    cache_size=DEFAULT_MAX_ENTRIES,
+    explain=False,
+    explain_top_k=None,
+    explain_exact=False,
+):
+    """Scores ``input_path`` in a process pool, one byte range per task.
+
+    Each worker loads the pipeline once and writes its scored range to a part
+    file; parts are concatenated in input order, so the output rows keep the
+    original order. Workers share the SQLite prediction cache at ``cache_db``
+    if given. With ``explain`` each worker also adds feature contributions.
+    Returns ``(n_rows, cache_hits, cache_misses)``.
+    """
+    if sep is None:
+        with open(input_path, "rb") as f:
+            sep, _ = read_csv_header(f)
+    validate_columns(pd.read_csv(input_path, sep=sep, nrows=0).columns)
+    header, ranges = split_byte_ranges(input_path, chunk_bytes)
+    n_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    part_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                model_path,
+                model_fingerprint(model_path),
+                n_threads,
+                cache_db,
+                cache_size,
+                explain_exact if explain else None,
+            ),
+        ) as executor:
+            part_paths = [
+                os.path.join(part_dir, f"part-{i:06d}.csv") for i in range(len(ranges))
+            ]
+            futures = [
+                executor.submit(
+                    _score_byte_range,
+                    input_path,
+                    header,
+                    start,
+                    end,
+                    part_path,
+                    sep,
+                    threshold,
+                    explain_top_k,
+                )
+                for (start, end), part_path in zip(ranges, part_paths)
+            ]
+            counts = [future.result() for future in futures]
+        n_rows = sum(n for n, _, _ in counts)
+        hits = sum(h for _, h, _ in counts)
+        misses = sum(m for _, _, m in counts)
+
+        with open(output_path, "wb") as output_file:
+            for part_path in part_paths:
+                with open(part_path, "rb") as part_file:
+                    shutil.copyfileobj(part_file, output_file)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+    return n_rows, hits, misses
+
+
+def print_drift_summary(drift, state_path, n_features=5):
+    if drift is None:
+        return
+    report_df = drift.report()
+    print(format_report(report_df.head(n_features), drift.n_rows))
+    n_drifted = int((report_df["status"] != "stabil").sum())
+    print(
+        f"{n_drifted} fitur mengalami drift; laporan lengkap: python drift.py report {state_path}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prediksi status dropout mahasiswa secara batch dari file CSV, Parquet atau Arrow."
+    )
+    parser.add_argument("input", help="Path file input (.csv, .parquet, .arrow).")
+    parser.add_argument("output", help="Path file hasil prediksi (.csv, .parquet, .arrow).")
+    parser.add_argument(
+        "--model",
+        default=MODEL_PATH,
+        help="Path pipeline model, atau nama model di registry (mis. 'xgboost' atau 'xgboost:<versi>').",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Jumlah baris yang diproses per chunk.",
+    )
+    parser.add_argument(
+        "--sep",
+        default=None,
+        help="Pemisah kolom pada file CSV (bawaan: dideteksi dari baris header).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Ambang batas Probability_Dropout untuk label Dropout.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Jumlah proses paralel (0 = semua core CPU).",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help="Ukuran potongan file (byte) per tugas pada mode paralel.",
+    )
+    parser.add_argument(
+        "--cache-db",
+        default=None,
+        help="File SQLite cache prediksi; mahasiswa yang datanya tidak berubah tidak diprediksi ulang.",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Jumlah maksimum entri cache di memori.",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Tambahkan kontribusi fitur per mahasiswa (log-odds Dropout) ke hasil.",
+    )
+    parser.add_argument(
+        "--explain-top-k",
+        type=int,
+        default=None,
+        help="Dengan --explain: hanya k fitur pendorong terbesar per mahasiswa (bawaan: semua kolom).",
+    )
+    parser.add_argument(
+        "--explain-exact",
+        action="store_true",
+        help="Dengan --explain: gunakan TreeSHAP eksak (jauh lebih lambat) alih-alih aproksimasi.",
+    )
+    parser.add_argument(
+        "--prediction-table",
+        default=None,
+        help="File SQLite tabel prediksi per mahasiswa; hanya mahasiswa baru atau yang datanya berubah yang diprediksi (butuh --id-column).",
+    )
+    parser.add_argument(
+        "--id-column",
+        default=None,
+        help="Kolom ID mahasiswa untuk mode inkremental.",
+    )
+    parser.add_argument(
+        "--challenger",
+        action="append",
+        default=[],
+        help="Model challenger (path atau nama di registry) yang ikut memprediksi tiap chunk di latar belakang; dapat diulang.",
+    )
+    parser.add_argument(
+        "--shadow-db",
+        default=DEFAULT_SHADOW_DB,
+        help="File SQLite tempat distribusi probabilitas dan tingkat kesepakatan challenger disimpan.",
+    )
+    parser.add_argument(
+        "--drift-state",
+        default=None,
+        help="File JSON histogram drift fitur; diperbarui dengan setiap chunk dan dibandingkan dengan data pelatihan.",
+    )
+    parser.add_argument(
+        "--drift-reference",
+        default=DEFAULT_REFERENCE_PATH,
+        help="Profil referensi drift (dibuat dari data/data.csv bila belum ada).",
+    )
+    parser.add_argument(
+        "--rank-top-k",
+        type=int,
+        default=None,
+        help="Mode peringkat: hanya simpan k mahasiswa dengan Probability_Dropout tertinggi per grup.",
+    )
+    parser.add_argument(
+        "--rank-by",
+        nargs="+",
+        default=DEFAULT_RANK_GROUPS,
+        help="Kolom grup untuk mode peringkat (bawaan: Course Daytime_evening_attendance).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        args.model = resolve_model_path(args.model)
+    except KeyError:
+        print(f"Error: Model file '{args.model}' tidak ditemukan.", file=sys.stderr)
+        return 1
+
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    try:
+        formats = {file_format(args.input), file_format(args.output)}
+        if workers > 1 and formats != {"csv"}:
+            raise ValueError("Mode paralel (--workers) hanya mendukung input dan output CSV.")
+        if workers > 1 and args.challenger:
+            raise ValueError("Mode shadow (--challenger) tidak didukung pada mode paralel (--workers).")
+        if workers > 1 and args.drift_state:
+            raise ValueError("Pemantauan drift (--drift-state) tidak didukung pada mode paralel (--workers).")
+        if bool(args.prediction_table) != bool(args.id_column):
+            raise ValueError("Mode inkremental membutuhkan --prediction-table dan --id-column.")
+        if workers > 1 and args.prediction_table:
+            raise ValueError("Mode inkremental tidak didukung pada mode paralel (--workers).")
+        if args.prediction_table and args.challenger:
+            raise ValueError("Mode shadow (--challenger) tidak didukung pada mode inkremental (--prediction-table).")
+        if args.prediction_table and args.cache_db:
+            raise ValueError(
+                "Cache prediksi (--cache-db) tidak dipakai pada mode inkremental; tabel prediksi sudah melewati baris yang tidak berubah."
+            )
+        if args.rank_top_k is not None and (workers > 1 or args.prediction_table):
+            raise ValueError(
+                "Mode peringkat (--rank-top-k) tidak didukung pada mode paralel (--workers) atau inkremental."
+            )
+        if args.rank_top_k is not None and args.rank_top_k < 1:
+            raise ValueError("--rank-top-k harus bernilai minimal 1.")
+        if args.explain_top_k is not None and not args.explain:
+            raise ValueError("--explain-top-k membutuhkan --explain.")
+        if args.explain_top_k is not None and args.explain_top_k < 1:
+            raise ValueError("--explain-top-k harus bernilai minimal 1.")
+
+        pipeline = explainer = drift = None
+        if workers == 1:
+            pipeline = load_pipeline(args.model)
+            if args.explain:
+                explainer = Explainer(pipeline, exact=args.explain_exact)
+            if args.drift_state:
+                drift = load_monitor(args.drift_state, args.drift_reference)
+
+        if args.prediction_table:
+            table = PredictionTable(
+                args.prediction_table, args.model, pinned_fingerprint(pipeline)
+            )
+            try:
+                n_rows, n_scored = score_file_incremental(
+                    pipeline,
+                    table,
+                    args.input,
+                    args.output,
+                    args.id_column,
+                    chunksize=args.chunksize,
+                    sep=args.sep,
+                    threshold=args.threshold,
+                    explainer=explainer,
+                    explain_top_k=args.explain_top_k,
+                    drift=drift,
+                )
+            finally:
+                table.close()
+            hits, misses = 0, 0
+        elif workers > 1:
+            n_rows, hits, misses = score_csv_parallel(
+                args.model,
+                args.input,
+                args.output,
+                workers,
+                chunk_bytes=args.chunk_bytes,
+                sep=args.sep,
+                threshold=args.threshold,
+                cache_db=args.cache_db,
+                cache_size=args.cache_size,
+                explain=args.explain,
+                explain_top_k=args.explain_top_k,
+                explain_exact=args.explain_exact,
+            )
+        else:
+            cache = None
+            if args.cache_db:
+                cache = PredictionCache(
+                    args.model,
+                    args.cache_size,
+                    args.cache_db,
+                    fingerprint=pinned_fingerprint(pipeline),
+                )
+            shadow = None
+            if args.challenger:
+                shadow = ShadowScorer(
+                    os.path.basename(args.model),
+                    load_challengers(args.challenger),
+                    args.shadow_db,
+                    threshold=args.threshold,
+                )
+            try:
+                if args.rank_top_k is not None:
+                    n_rows, n_groups = score_file_ranked(
+                        pipeline,
+                        args.input,
+                        args.output,
+                        args.rank_top_k,
+                        args.rank_by,
+                        chunksize=args.chunksize,
+                        sep=args.sep,
+                        threshold=args.threshold,
+                        cache=cache,
+                        shadow=shadow,
+                        explainer=explainer,
+                        explain_top_k=args.explain_top_k,
+                        drift=drift,
+                    )
+                else:
+                    n_rows = score_file(
+                        pipeline,
+                        args.input,
+                        args.output,
+                        chunksize=args.chunksize,
+                        sep=args.sep,
+                        threshold=args.threshold,
+                        cache=cache,
+                        shadow=shadow,
+                        explainer=explainer,
+                        explain_top_k=args.explain_top_k,
+                        drift=drift,
+                    )
+            finally:
+                if shadow is not None:
+                    shadow.close()
+            hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+            if cache is not None and cache.is_stale():
+                print(
+                    f"Peringatan: file model '{args.model}' berubah selama proses; hasil dan cache berasal dari versi yang dimuat di awal.",
+                    file=sys.stderr,
+                )
+    except (ValueError, StalePipelineError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    if drift is not None:
+        drift.save(args.drift_state)
+
+    throughput = n_rows / elapsed if elapsed > 0 else float("inf")
+    if args.prediction_table:
+        print(
+            f"{n_scored} dari {n_rows} mahasiswa baru/berubah diprediksi dalam {elapsed:.2f} detik; tabel '{args.prediction_table}' diperbarui."
+        )
+        if n_scored:
+            print(f"Hasil perubahan disimpan di '{args.output}'.")
+        print_drift_summary(drift, args.drift_state)
+        return 0
+    print(
+        f"{n_rows} baris diprediksi dalam {elapsed:.2f} detik ({throughput:,.0f} baris/detik). Hasil disimpan di '{args.output}'."
+    )
+    if args.rank_top_k is not None:
+        print(
+            f"Hasil berisi {args.rank_top_k} mahasiswa berisiko tertinggi per grup untuk {n_groups} grup ({', '.join(args.rank_by)})."
+        )
+    if args.cache_db:
+        print(f"Cache prediksi: {hits} hit, {misses} miss.")
+    if args.challenger:
+        print(f"Perbandingan challenger disimpan di '{args.shadow_db}'.")
+    print_drift_summary(drift, args.drift_state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
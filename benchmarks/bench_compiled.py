@@ -0,0 +1,56 @@
+"""Benchmark: sklearn pipeline vs. compiled NumPy/booster inference latency.
+
+    python -m benchmarks.bench_compiled
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_cohort
+from compiled import CompiledPipeline
+from scoring import MODEL_PATH, load_pipeline, prepare_features
+
+DEFAULT_SIZES = [1, 10_000]
+
+
+def median_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.model)
+    compiled = CompiledPipeline.from_pipeline(pipeline)
+
+    print(f"{'baris':>8} {'pipeline (ms)':>14} {'compiled (ms)':>14} {'speedup':>8}")
+    for n_rows in args.sizes:
+        features_df = prepare_features(make_cohort(n_rows))
+        features_array = compiled.frame_to_array(features_df)
+        if not np.array_equal(
+            pipeline.predict_proba(features_df), compiled.predict_proba(features_array)
+        ):
+            raise AssertionError(f"Hasil berbeda pada {n_rows} baris.")
+
+        repeat = args.repeat if n_rows < 1_000 else max(3, args.repeat // 10)
+        pipeline_time = median_time(lambda: pipeline.predict_proba(features_df), repeat)
+        compiled_time = median_time(lambda: compiled.predict_proba(features_array), repeat)
+        print(
+            f"{n_rows:>8,} {pipeline_time * 1000:>14.2f} {compiled_time * 1000:>14.2f} {pipeline_time / compiled_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark: memory of the compact dtype schema vs. default int64/float64 columns.
+
+The compact frame is built the way the app and the batch scorer build it
+(``compact_dtypes`` on the raw input, then ``add_engineered_features``). Also
+checks that predictions are identical with and without the schema.
+
+    python -m benchmarks.bench_dtypes
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.synthetic import load_reference_data, make_cohort
+from features import (
+    add_engineered_features,
+    all_features_ordered,
+    compact_dtypes,
+    compute_engineered_features,
+    engineered_features_list,
+    input_features_ordered,
+)
+from scoring import MODEL_PATH, load_pipeline
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_CHECK_ROWS = 100_000
+
+
+def default_feature_frame(input_df):
+    """Raw and engineered features as parsed and computed, without the schema."""
+    default_df = input_df[input_features_ordered].copy()
+    default_df[engineered_features_list] = compute_engineered_features(default_df)
+    return default_df
+
+
+def frame_mb(df):
+    return df.memory_usage(index=False, deep=True).sum() / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--check-rows", type=int, default=DEFAULT_CHECK_ROWS)
+    args = parser.parse_args(argv)
+
+    reference_df = load_reference_data()
+    cohort = make_cohort(args.rows, reference_df)
+    default_df = default_feature_frame(cohort)
+    compact_df = add_engineered_features(
+        compact_dtypes(cohort[input_features_ordered].copy())
+    )
+
+    print(f"{'kolom':>24} {'default (MB)':>13} {'ringkas (MB)':>13} {'hemat':>7}")
+    for name, columns in (
+        ("input mentah", input_features_ordered),
+        ("semua fitur model", all_features_ordered),
+    ):
+        default_mb = frame_mb(default_df[columns])
+        compact_mb = frame_mb(compact_df[columns])
+        print(
+            f"{name:>24} {default_mb:>13.1f} {compact_mb:>13.1f} {1 - compact_mb / default_mb:>6.0%}"
+        )
+    print(f"({args.rows:,} mahasiswa)")
+
+    pipeline = load_pipeline(args.model)
+    for name, check_df in (
+        ("data.csv", reference_df),
+        (f"sintetis_{args.check_rows}", make_cohort(args.check_rows, reference_df)),
+    ):
+        expected = pipeline.predict_proba(
+            default_feature_frame(check_df)[all_features_ordered]
+        )
+        compact_features = add_engineered_features(compact_dtypes(check_df.copy()))
+        actual = pipeline.predict_proba(compact_features[all_features_ordered])
+        if not np.array_equal(expected, actual):
+            raise AssertionError(f"Prediksi berbeda pada {name}.")
+        print(f"Prediksi identik pada {name} ({len(check_df):,} baris).")
+
+
+if __name__ == "__main__":
+    main()
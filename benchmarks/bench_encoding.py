@@ -0,0 +1,92 @@
+"""Benchmark: memory and throughput of dense, sparse and native categorical encoding.
+
+Each encoding is trained on ``data/data.csv`` with the shipped model's
+hyperparameters, then scores a synthetic cohort batch by batch.
+
+    python -m benchmarks.bench_encoding --rows 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+from benchmarks.synthetic import load_reference_data, make_cohort
+from features import build_feature_frame
+from preprocessing import ENCODINGS, build_preprocessor, xgboost_encoding_params
+
+MODEL_PARAMS = {
+    "n_estimators": 400,
+    "max_depth": 7,
+    "learning_rate": 0.011,
+    "subsample": 0.76,
+    "colsample_bytree": 0.67,
+    "gamma": 0.11,
+    "eval_metric": "logloss",
+    "random_state": 42,
+}
+
+
+def matrix_nbytes(matrix):
+    if sparse.issparse(matrix):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def train(encoding, reference_df):
+    X = build_feature_frame(reference_df)
+    y = (reference_df["Status"] == "Dropout").astype(int)
+    pipeline = Pipeline(
+        steps=[
+            ("preprocessor", build_preprocessor(encoding)),
+            (
+                "classifier",
+                XGBClassifier(**MODEL_PARAMS, **xgboost_encoding_params(encoding)),
+            ),
+        ]
+    )
+    return pipeline.fit(X, y)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-rows", type=int, default=250_000)
+    parser.add_argument("--encodings", nargs="+", default=list(ENCODINGS))
+    args = parser.parse_args(argv)
+
+    reference_df = load_reference_data()
+    cohort = build_feature_frame(make_cohort(args.rows, reference_df))
+
+    print(
+        f"{'encoding':>9} {'kolom':>6} {'matriks/baris (B)':>18} {'puncak memori (MB)':>19} {'baris/detik':>12}"
+    )
+    for encoding in args.encodings:
+        pipeline = train(encoding, reference_df)
+        preprocessor = pipeline.named_steps["preprocessor"]
+
+        matrix_bytes = 0
+        n_columns = 0
+        tracemalloc.start()
+        start = time.perf_counter()
+        for batch_start in range(0, args.rows, args.batch_rows):
+            batch = cohort.iloc[batch_start : batch_start + args.batch_rows]
+            matrix = preprocessor.transform(batch)
+            matrix_bytes += matrix_nbytes(matrix)
+            n_columns = matrix.shape[1]
+            pipeline.named_steps["classifier"].predict_proba(matrix)
+            del matrix
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{encoding:>9} {n_columns:>6} {matrix_bytes / args.rows:>18.0f} {peak / 1e6:>19.0f} {args.rows / elapsed:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark: scaling efficiency of parallel batch scoring from 1 to N workers.
+
+    python -m benchmarks.bench_parallel --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from batch_score import score_csv_parallel
+from benchmarks.synthetic import make_cohort
+from scoring import MODEL_PATH
+
+
+def default_worker_counts():
+    n_cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= n_cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != n_cpus:
+        counts.append(n_cpus)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--chunk-bytes", type=int, default=8 * 1024 * 1024)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "cohort.csv")
+        output_path = os.path.join(tmp_dir, "hasil.csv")
+        make_cohort(args.rows).to_csv(input_path, sep=";", index=False)
+
+        print(f"{'workers':>8} {'waktu (s)':>10} {'baris/detik':>12} {'speedup':>8} {'efisiensi':>10}")
+        base_time = None
+        for workers in args.workers or default_worker_counts():
+            start = time.perf_counter()
+            n_rows, _, _ = score_csv_parallel(
+                args.model,
+                input_path,
+                output_path,
+                workers,
+                chunk_bytes=args.chunk_bytes,
+                sep=";",
+            )
+            elapsed = time.perf_counter() - start
+            base_time = base_time or elapsed
+            speedup = base_time / elapsed
+            print(
+                f"{workers:>8} {elapsed:>10.2f} {n_rows / elapsed:>12,.0f} {speedup:>7.2f}x {speedup / workers:>9.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
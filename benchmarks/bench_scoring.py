@@ -0,0 +1,57 @@
+"""Benchmark: ``predict`` + ``predict_proba`` vs. a single ``score`` pass.
+
+    python -m benchmarks.bench_scoring
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import load_reference_data, make_cohort
+from scoring import MODEL_PATH, load_pipeline, prepare_features, score
+
+DEFAULT_SIZES = [1, 1_000, 10_000, 100_000]
+
+
+def two_pass(pipeline, input_df):
+    return pipeline.predict(input_df), pipeline.predict_proba(input_df)
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.model)
+    reference_df = load_reference_data()
+    print(f"{'baris':>10} {'2 pass (s)':>11} {'1 pass (s)':>11} {'speedup':>8}")
+    for n_rows in args.sizes:
+        features_df = prepare_features(make_cohort(n_rows, reference_df))
+        old_time, (old_pred, old_prob) = best_time(
+            lambda: two_pass(pipeline, features_df), args.repeat
+        )
+        new_time, (new_pred, new_prob) = best_time(
+            lambda: score(pipeline, features_df), args.repeat
+        )
+        if not (np.array_equal(old_pred, new_pred) and np.array_equal(old_prob, new_prob)):
+            raise AssertionError(f"Hasil berbeda pada {n_rows} baris.")
+
+        print(
+            f"{n_rows:>10,} {old_time:>11.4f} {new_time:>11.4f} {old_time / new_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
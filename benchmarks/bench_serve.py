@@ -0,0 +1,67 @@
+"""Benchmark: requests/s of serve.py with and without micro-batching.
+
+    python -m benchmarks.bench_serve
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import make_cohort
+from features import input_features_ordered
+from scoring import MODEL_PATH, load_pipeline
+from serve import create_server
+
+
+def run_load(url, records, concurrency):
+    def post(record):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(record).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            response.read()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(post, records))
+    return len(records) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.model)
+    records = make_cohort(args.requests)[input_features_ordered].to_dict(orient="records")
+
+    print(f"{'max batch':>10} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rata2 batch':>12}")
+    for max_batch_size in args.batch_sizes:
+        server = create_server(pipeline, port=0, max_batch_size=max_batch_size)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/predict"
+        try:
+            throughput = run_load(url, records, args.concurrency)
+            with urllib.request.urlopen(url.replace("/predict", "/metrics")) as response:
+                metrics = json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        latency = metrics["latency_ms"]
+        print(
+            f"{max_batch_size:>10} {throughput:>10.0f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {metrics['mean_batch_size']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
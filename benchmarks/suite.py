@@ -0,0 +1,240 @@
+"""Benchmark suite: per-stage timings of the scoring path, stored per commit.
+
+Scores ``data/data.csv`` and synthetic cohorts (up to 10M rows) the way
+``batch_score.py`` does, in batches of ``--batch-rows``, and times each stage
+separately: CSV parsing, engineered features, ``ColumnTransformer`` transform,
+model predict, result assembly and CSV export. Results are written to
+``benchmarks/results/<commit>.json``; ``--compare`` prints the ratio of every
+stage against an earlier results file. Everything runs locally.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 100000 1000000 10000000
+    python -m benchmarks.suite --compare benchmarks/results/<commit lama>.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost
+
+from benchmarks.synthetic import DATA_PATH, load_reference_data, write_cohort_csv
+from cache import model_fingerprint
+from features import compact_dtypes
+from scoring import (
+    DEFAULT_THRESHOLD,
+    MODEL_PATH,
+    build_prediction_frame,
+    load_pipeline,
+    prepare_features,
+)
+
+STAGES = (
+    "csv_parse",
+    "features",
+    "transform",
+    "predict",
+    "result_assembly",
+    "csv_export",
+)
+DEFAULT_SIZES = [100_000, 1_000_000]
+DEFAULT_BATCH_ROWS = 100_000
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+
+def git_commit():
+    """Returns ``(commit, dirty)`` of the working tree, or ``("unknown", None)``."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", None
+    return commit, bool(status.strip())
+
+
+def run_stages(pipeline, csv_path, output_path, sep, batch_rows, threshold):
+    """Scores ``csv_path`` batch by batch; returns ``(n_rows, seconds per stage)``."""
+    preprocessor = pipeline.named_steps["preprocessor"]
+    model = pipeline.steps[-1][1]
+    timings = dict.fromkeys(STAGES, 0.0)
+    n_rows = 0
+    n_batches = 0
+
+    reader = pd.read_csv(csv_path, sep=sep, chunksize=batch_rows)
+    while True:
+        start = time.perf_counter()
+        try:
+            # Downcast as batch_score.score_chunk does, so later stages see the
+            # shipped dtypes
+            input_df = compact_dtypes(next(reader))
+        except StopIteration:
+            break
+        timings["csv_parse"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        features_df = prepare_features(input_df)
+        timings["features"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        transformed = preprocessor.transform(features_df)
+        timings["transform"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        prediction_prob = model.predict_proba(transformed)
+        timings["predict"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        predictions = (prediction_prob[:, 1] > threshold).astype(int)
+        result_df = features_df.join(
+            build_prediction_frame(features_df.index, predictions, prediction_prob)
+        )
+        timings["result_assembly"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        first = n_batches == 0
+        result_df.to_csv(
+            output_path, mode="w" if first else "a", header=first, index=False
+        )
+        timings["csv_export"] += time.perf_counter() - start
+
+        n_rows += len(input_df)
+        n_batches += 1
+    return n_rows, timings
+
+
+def benchmark(pipeline, csv_path, sep, batch_rows, repeat, threshold, work_dir):
+    """Best-of-``repeat`` seconds per stage for one input file."""
+    best = dict.fromkeys(STAGES, float("inf"))
+    output_path = os.path.join(work_dir, "hasil.csv")
+    for _ in range(repeat):
+        n_rows, timings = run_stages(
+            pipeline, csv_path, output_path, sep, batch_rows, threshold
+        )
+        best = {stage: min(best[stage], timings[stage]) for stage in STAGES}
+    total = sum(best.values())
+    return {
+        "rows": n_rows,
+        "seconds": best,
+        "total_seconds": total,
+        "rows_per_second": n_rows / total if total else None,
+    }
+
+
+def environment_info(model_path):
+    commit, dirty = git_commit()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+        "model_fingerprint": model_fingerprint(model_path),
+    }
+
+
+def print_results(results, baseline=None):
+    baseline_runs = {run["name"]: run for run in (baseline or {}).get("runs", [])}
+    header = f"{'input':>16} {'baris':>11} " + " ".join(f"{s:>15}" for s in STAGES)
+    print(header)
+    for run in results["runs"]:
+        cells = []
+        old = baseline_runs.get(run["name"])
+        for stage in STAGES:
+            seconds = run["seconds"][stage]
+            if old and old["seconds"][stage]:
+                ratio = seconds / old["seconds"][stage]
+                cells.append(f"{seconds:>8.3f} ({ratio:.2f}x)")
+            else:
+                cells.append(f"{seconds:>15.3f}")
+        row = " ".join(f"{cell:>15}" for cell in cells)
+        print(f"{run['name']:>16} {run['rows']:>11,} {row}")
+    if baseline:
+        baseline_commit = baseline["environment"]["commit"]
+        print(f"\n(x) = rasio terhadap commit {baseline_commit}; > 1 berarti lebih lambat.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=DEFAULT_SIZES,
+        help="Ukuran kohort sintetis (baris), selain data/data.csv.",
+    )
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="File JSON hasil sebelumnya.")
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.model)
+    reference_df = load_reference_data()
+    runs = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        inputs = [("data.csv", None)] + [(f"sintetis_{n}", n) for n in args.sizes]
+        for name, n_rows in inputs:
+            if n_rows is None:
+                csv_path, sep = DATA_PATH, ";"
+            else:
+                # Generated just before use so only one cohort is on disk at a time
+                csv_path, sep = os.path.join(work_dir, f"{name}.csv"), ","
+                write_cohort_csv(csv_path, n_rows, reference_df)
+
+            run = benchmark(
+                pipeline,
+                csv_path,
+                sep,
+                args.batch_rows,
+                args.repeat,
+                args.threshold,
+                work_dir,
+            )
+            runs.append({"name": name, "batch_rows": args.batch_rows, **run})
+            if n_rows is not None:
+                os.remove(csv_path)
+
+    results = {"environment": environment_info(args.model), "runs": runs}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    commit = results["environment"]["commit"]
+    if results["environment"]["dirty"]:
+        commit += "-dirty"
+    results_path = os.path.join(args.results_dir, f"{commit}.json")
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nHasil disimpan di '{results_path}'.")
+
+
+if __name__ == "__main__":
+    main()
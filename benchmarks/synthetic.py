@@ -0,0 +1,38 @@
+"""Synthetic student cohorts built by resampling ``data/data.csv``."""
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = "data/data.csv"
+RANDOM_STATE = 42
+
+
+def load_reference_data(path=DATA_PATH):
+    return pd.read_csv(path, sep=";")
+
+
+def make_cohort(n_rows, reference_df=None, random_state=RANDOM_STATE):
+    """Returns ``n_rows`` students sampled with replacement from the reference data."""
+    if reference_df is None:
+        reference_df = load_reference_data()
+    rng = np.random.default_rng(random_state)
+    rows = rng.integers(0, len(reference_df), size=n_rows)
+    return reference_df.iloc[rows].reset_index(drop=True)
+
+
+def write_cohort_csv(path, n_rows, reference_df=None, chunk_rows=1_000_000, sep=","):
+    """Writes an ``n_rows`` synthetic cohort to CSV in chunks of ``chunk_rows``.
+
+    Each chunk is sampled with its own seed, so memory stays bounded even for
+    cohorts of tens of millions of rows.
+    """
+    if reference_df is None:
+        reference_df = load_reference_data()
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = make_cohort(
+            min(chunk_rows, n_rows - start), reference_df, RANDOM_STATE + i
+        )
+        chunk.to_csv(
+            path, mode="w" if i == 0 else "a", header=i == 0, index=False, sep=sep
+        )
+    return path
@@ -0,0 +1,211 @@
+"""Prediction cache keyed by the student feature vector and the model fingerprint.
+
+Rows are identified by a hash of their ordered feature values, so a student whose
+data has not changed is never rescored while the model stays the same. The
+in-memory LRU can be backed by an SQLite file to survive restarts.
+
+A cache belongs to the model file version the pipeline was loaded from:
+``scoring.load_pipeline`` pins that file's fingerprint to the pipeline, and the
+cache refuses pipelines pinned to another one. Replacing the model file does not
+re-key a running cache (its predictions came from the old model); ``is_stale``
+reports it, and a cache opened for the new pipeline drops the old entries.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from features import all_features_ordered
+
+DEFAULT_MAX_ENTRIES = 100_000
+# Keeps each "IN (...)" lookup below SQLite's host-parameter limit
+SQLITE_BATCH_SIZE = 500
+
+_fingerprints = {}
+# Attribute holding the fingerprint of the file a pipeline was loaded from
+PINNED_FINGERPRINT_ATTRIBUTE = "model_fingerprint_"
+
+
+class StalePipelineError(RuntimeError):
+    """The pipeline was loaded from another version of the model file than the cache's."""
+
+
+def model_fingerprint(model_path):
+    """Returns the SHA-256 of the model file, re-hashing only when it changes on disk."""
+    stat = os.stat(model_path)
+    key = (os.path.abspath(model_path), stat.st_mtime_ns, stat.st_size)
+    if key not in _fingerprints:
+        digest = hashlib.sha256()
+        with open(model_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        _fingerprints[key] = digest.hexdigest()
+    return _fingerprints[key]
+
+
+def pin_fingerprint(pipeline, fingerprint):
+    setattr(pipeline, PINNED_FINGERPRINT_ATTRIBUTE, fingerprint)
+    return pipeline
+
+
+def pinned_fingerprint(pipeline):
+    """Fingerprint pinned by ``scoring.load_pipeline``, or None."""
+    return getattr(pipeline, PINNED_FINGERPRINT_ATTRIBUTE, None)
+
+
+def hash_rows(df, columns):
+    """Returns a stable 64-bit hash per row of ``df[columns]``.
+
+    Values are cast to float64 first so that e.g. ``1`` and ``1.0`` hash alike.
+    """
+    values = df[columns].astype(np.float64)
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    # SQLite integers are signed 64-bit
+    return hashes.view(np.int64)
+
+
+class PredictionCache:
+    """LRU of ``(Probability_Non_Dropout, Probability_Dropout)`` per student row.
+
+    ``fingerprint`` is the model file version the entries belong to, normally
+    ``pinned_fingerprint(pipeline)``; by default the file is hashed once here.
+    """
+
+    def __init__(
+        self, model_path, max_entries=DEFAULT_MAX_ENTRIES, db_path=None, fingerprint=None
+    ):
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._fingerprint = fingerprint or model_fingerprint(model_path)
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS predictions (
+                    model_fingerprint TEXT NOT NULL,
+                    row_hash INTEGER NOT NULL,
+                    probability_non_dropout REAL NOT NULL,
+                    probability_dropout REAL NOT NULL,
+                    PRIMARY KEY (model_fingerprint, row_hash)
+                )
+                """
+            )
+            self._purge_stale_rows()
+
+    def _purge_stale_rows(self):
+        with self._db:
+            self._db.execute(
+                "DELETE FROM predictions WHERE model_fingerprint != ?",
+                (self._fingerprint,),
+            )
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    def is_stale(self):
+        """True once the model file on disk is no longer the cache's version."""
+        try:
+            return model_fingerprint(self.model_path) != self._fingerprint
+        except FileNotFoundError:
+            return True
+
+    def _remember(self, row_hash, probs):
+        self._memory[row_hash] = probs
+        self._memory.move_to_end(row_hash)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup_db(self, row_hashes):
+        found = {}
+        for i in range(0, len(row_hashes), SQLITE_BATCH_SIZE):
+            batch = row_hashes[i : i + SQLITE_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"""
+                SELECT row_hash, probability_non_dropout, probability_dropout
+                FROM predictions
+                WHERE model_fingerprint = ? AND row_hash IN ({placeholders})
+                """,
+                [self._fingerprint, *batch],
+            )
+            for row_hash, prob_0, prob_1 in rows:
+                found[row_hash] = (prob_0, prob_1)
+        return found
+
+    def predict_proba(self, pipeline, features_df):
+        """``pipeline.predict_proba`` that only runs the model on uncached rows.
+
+        Raises ``StalePipelineError`` if ``pipeline`` is pinned to another model
+        file version than the cache.
+        """
+        pipeline_fingerprint = pinned_fingerprint(pipeline)
+        if pipeline_fingerprint is not None and pipeline_fingerprint != self._fingerprint:
+            raise StalePipelineError(
+                "Pipeline dimuat dari versi file model yang berbeda dengan cache prediksi; muat ulang model."
+            )
+        row_hashes = hash_rows(features_df, all_features_ordered).tolist()
+        prediction_prob = np.empty((len(row_hashes), 2))
+
+        with self._lock:
+            missing = {}
+            for i, row_hash in enumerate(row_hashes):
+                probs = self._memory.get(row_hash)
+                if probs is None:
+                    missing.setdefault(row_hash, []).append(i)
+                else:
+                    self._memory.move_to_end(row_hash)
+                    prediction_prob[i] = probs
+
+            if missing and self._db is not None:
+                for row_hash, probs in self._lookup_db(list(missing)).items():
+                    prediction_prob[missing.pop(row_hash)] = probs
+                    self._remember(row_hash, probs)
+
+            n_missing_rows = sum(len(rows) for rows in missing.values())
+            self.hits += len(row_hashes) - n_missing_rows
+            self.misses += n_missing_rows
+
+        if missing:
+            first_rows = [rows[0] for rows in missing.values()]
+            new_prob = pipeline.predict_proba(features_df.iloc[first_rows])
+            new_entries = []
+            with self._lock:
+                for (row_hash, rows), probs in zip(missing.items(), new_prob.tolist()):
+                    prediction_prob[rows] = probs
+                    self._remember(row_hash, tuple(probs))
+                    new_entries.append((self._fingerprint, row_hash, *probs))
+                if self._db is not None:
+                    with self._db:
+                        self._db.executemany(
+                            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                            new_entries,
+                        )
+        return prediction_prob
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,257 @@
+"""Compiled inference path for the fitted preprocessing + XGBoost pipeline.
+
+``export_compiled`` flattens the fitted ``ColumnTransformer`` (imputer medians and
+modes, scaler mean/scale, one-hot category tables) into plain NumPy arrays and
+saves the booster in XGBoost's own format; the arrays are stored as plain ``.npy``
+files so they can be memory-mapped on load. ``CompiledPipeline`` then scores a
+2-D float array with vectorized NumPy and ``Booster.inplace_predict``, skipping
+the per-call pandas column selection and sklearn dispatch.
+
+Contoh penggunaan:
+
+    python compiled.py export --output models/compiled
+    python compiled.py check --compiled models/compiled
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import xgboost as xgb
+
+# Saved as separate uncompressed .npy files so they can be memory-mapped on load
+ARRAY_NAMES = (
+    "num_medians",
+    "num_means",
+    "num_scales",
+    "cat_modes",
+    "cat_values",
+    "cat_offsets",
+)
+BOOSTER_FILE = "booster.ubj"
+METADATA_FILE = "metadata.json"
+
+
+class CompiledPipeline:
+    """Array-only equivalent of the fitted pipeline's ``predict_proba``.
+
+    Input columns are ``numerical_features + categorical_features`` (see
+    ``feature_names``), as float values with NaN for missing entries.
+    """
+
+    def __init__(
+        self,
+        numerical_features,
+        categorical_features,
+        arrays,
+        booster,
+        iteration_range=(0, 0),
+    ):
+        self.numerical_features = list(numerical_features)
+        self.categorical_features = list(categorical_features)
+        self.feature_names = self.numerical_features + self.categorical_features
+        self.booster = booster
+        self.iteration_range = tuple(iteration_range)
+
+        self.num_medians = arrays["num_medians"]
+        self.num_means = arrays["num_means"]
+        self.num_scales = arrays["num_scales"]
+        self.cat_modes = arrays["cat_modes"]
+        # All categories concatenated; cat_offsets[j]:cat_offsets[j + 1] belongs to
+        # categorical column j and doubles as its one-hot output slice.
+        self.cat_values = arrays["cat_values"]
+        self.cat_offsets = arrays["cat_offsets"]
+
+        self.n_numerical = len(self.numerical_features)
+        self.n_outputs = self.n_numerical + int(self.cat_offsets[-1])
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Extracts the arrays from a fitted preprocessor + ``XGBClassifier`` pipeline."""
+        preprocessor = pipeline.named_steps["preprocessor"]
+        model = pipeline.steps[-1][1]
+        if not isinstance(model, xgb.XGBClassifier):
+            raise ValueError(
+                f"Hanya pipeline XGBClassifier yang didukung, bukan {type(model).__name__}."
+            )
+
+        num_steps = preprocessor.named_transformers_["num"].named_steps
+        cat_steps = preprocessor.named_transformers_["cat"].named_steps
+        numerical_features = preprocessor.transformers_[0][2]
+        categorical_features = preprocessor.transformers_[1][2]
+        scaler = num_steps["scaler"]
+        onehot = cat_steps.get("onehot")
+        # A sparse-trained booster reads absent one-hot entries as missing, not 0
+        if onehot is None or onehot.sparse_output:
+            raise ValueError("Hanya pipeline dengan encoding 'dense' yang didukung.")
+        if onehot.drop_idx_ is not None or onehot.handle_unknown != "ignore":
+            raise ValueError(
+                "OneHotEncoder harus memakai drop=None dan handle_unknown='ignore'."
+            )
+
+        n_numerical = len(numerical_features)
+        arrays = {
+            "num_medians": num_steps["imputer"].statistics_.astype(np.float64),
+            "num_means": (
+                scaler.mean_ if scaler.with_mean else np.zeros(n_numerical)
+            ).astype(np.float64),
+            "num_scales": (
+                scaler.scale_ if scaler.with_std else np.ones(n_numerical)
+            ).astype(np.float64),
+            "cat_modes": cat_steps["imputer"].statistics_.astype(np.float64),
+            "cat_values": np.concatenate(onehot.categories_).astype(np.float64),
+            "cat_offsets": np.cumsum([0] + [len(c) for c in onehot.categories_]),
+        }
+
+        try:
+            iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            iteration_range = (0, 0)
+
+        return cls(
+            numerical_features,
+            categorical_features,
+            arrays,
+            model.get_booster(),
+            iteration_range,
+        )
+
+    def transform(self, X):
+        """Applies the imputers, scaler and one-hot encoding to a 2-D float array."""
+        X = np.asarray(X, dtype=np.float64)
+        n_rows = X.shape[0]
+        out = np.zeros((n_rows, self.n_outputs))
+
+        num = out[:, : self.n_numerical]
+        num[:] = X[:, : self.n_numerical]
+        missing = np.isnan(num)
+        if missing.any():
+            num[missing] = np.take(self.num_medians, np.nonzero(missing)[1])
+        num -= self.num_means
+        num /= self.num_scales
+
+        cat = X[:, self.n_numerical :]
+        missing = np.isnan(cat)
+        if missing.any():
+            cat = np.where(missing, self.cat_modes, cat)
+
+        rows = np.arange(n_rows)
+        for j in range(len(self.categorical_features)):
+            start, end = self.cat_offsets[j], self.cat_offsets[j + 1]
+            categories = self.cat_values[start:end]
+            idx = np.searchsorted(categories, cat[:, j])
+            np.minimum(idx, len(categories) - 1, out=idx)
+            # Unknown categories stay all-zero, as with handle_unknown="ignore"
+            known = categories[idx] == cat[:, j]
+            out[rows[known], self.n_numerical + start + idx[known]] = 1.0
+        return out
+
+    def predict_proba(self, X):
+        """Returns ``[[P(Non-Dropout), P(Dropout)], ...]`` for a 2-D float array.
+
+        A DataFrame is also accepted (columns are selected by name), so the
+        compiled pipeline can stand in for the sklearn one in ``scoring.score``.
+        """
+        if hasattr(X, "columns"):
+            X = self.frame_to_array(X)
+        class_one = self.booster.inplace_predict(
+            self.transform(X),
+            iteration_range=self.iteration_range,
+            validate_features=False,
+        )
+        return np.vstack((1.0 - class_one, class_one)).transpose()
+
+    def frame_to_array(self, features_df):
+        """Selects ``feature_names`` from a DataFrame as a float64 array."""
+        return features_df[self.feature_names].to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+
+    def save(self, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(output_dir, f"{name}.npy"), getattr(self, name))
+        self.booster.save_model(os.path.join(output_dir, BOOSTER_FILE))
+        with open(os.path.join(output_dir, METADATA_FILE), "w") as f:
+            json.dump(
+                {
+                    "numerical_features": self.numerical_features,
+                    "categorical_features": self.categorical_features,
+                    "iteration_range": list(self.iteration_range),
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, compiled_dir, mmap_mode=None):
+        """Loads an export; ``mmap_mode="r"`` memory-maps the preprocessing arrays."""
+        with open(os.path.join(compiled_dir, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(compiled_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAY_NAMES
+        }
+        booster = xgb.Booster(model_file=os.path.join(compiled_dir, BOOSTER_FILE))
+        return cls(
+            metadata["numerical_features"],
+            metadata["categorical_features"],
+            arrays,
+            booster,
+            metadata["iteration_range"],
+        )
+
+
+def export_compiled(pipeline, output_dir):
+    """Compiles a fitted pipeline and saves it to ``output_dir``."""
+    compiled = CompiledPipeline.from_pipeline(pipeline)
+    compiled.save(output_dir)
+    return compiled
+
+
+def check_parity(pipeline, compiled, features_df):
+    """Returns the max absolute probability difference vs. ``pipeline.predict_proba``."""
+    expected = pipeline.predict_proba(features_df)
+    actual = compiled.predict_proba(compiled.frame_to_array(features_df))
+    return float(np.max(np.abs(expected - actual))) if len(features_df) else 0.0
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from scoring import MODEL_PATH, load_pipeline, prepare_features
+
+    parser = argparse.ArgumentParser(
+        description="Ekspor pipeline model ke jalur inferensi berbasis array NumPy."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Ekspor pipeline.")
+    export_parser.add_argument("--model", default=MODEL_PATH)
+    export_parser.add_argument("--output", default=os.path.join("models", "compiled"))
+    check_parser = subparsers.add_parser(
+        "check", help="Bandingkan hasil compiled dengan pipeline asli."
+    )
+    check_parser.add_argument("--model", default=MODEL_PATH)
+    check_parser.add_argument("--compiled", default=os.path.join("models", "compiled"))
+    check_parser.add_argument("--data", default="data/data.csv")
+    check_parser.add_argument("--sep", default=";")
+    check_parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args(argv)
+
+    pipeline = load_pipeline(args.model)
+    if args.command == "export":
+        export_compiled(pipeline, args.output)
+        print(f"Pipeline compiled disimpan di '{args.output}'.")
+        return 0
+
+    compiled = CompiledPipeline.load(args.compiled)
+    features_df = prepare_features(pd.read_csv(args.data, sep=args.sep))
+    max_diff = check_parity(pipeline, compiled, features_df)
+    print(f"Selisih probabilitas maksimum: {max_diff:.3g} ({len(features_df)} baris)")
+    return 0 if max_diff <= args.tolerance else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
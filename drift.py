@@ -0,0 +1,307 @@
+"""Feature drift of scored cohorts against the training distribution.
+
+The reference profile is computed once from the training data (``data/data.csv``)
+and stored as JSON: for every numerical model feature the edges of
+``NUMERIC_BINS`` quantile bins and the training counts per bin, for every
+categorical feature the training count per code. ``DriftMonitor`` keeps the
+same fixed-bin histograms and count tables for the rows scored since it was
+started, so its memory does not depend on how many rows it has seen. An update
+costs one ``searchsorted`` and ``bincount`` per column of the batch.
+
+``report()`` gives the population stability index (PSI) per feature and, for
+numerical features, the Kolmogorov-Smirnov distance between the binned
+distributions. Codes that do not occur in the training data (e.g. a new
+``Course``, which the one-hot encoder silently ignores) are counted separately
+and reported as ``unknown_share``:
+
+    python drift.py reference
+    python batch_score.py semester.csv hasil.csv --drift-state logs/drift_state.json
+    python drift.py report logs/drift_state.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from features import (
+    categorical_features_model,
+    compact_dtypes,
+    numerical_features_model,
+)
+
+DEFAULT_REFERENCE_PATH = os.path.join("models", "drift_reference.json")
+DEFAULT_DRIFT_STATE = os.path.join("logs", "drift_state.json")
+TRAINING_DATA_PATH = os.path.join("data", "data.csv")
+NUMERIC_BINS = 10
+# Shares are floored at this value, so empty bins do not make the PSI infinite
+PSI_EPSILON = 1e-4
+# Common PSI rule of thumb: below 0.1 stable, 0.1-0.25 moderate, above significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def _bin_numeric(values, edges):
+    """Bin index per value; missing values go to the extra last slot."""
+    index = np.searchsorted(edges, values, side="right")
+    index[np.isnan(values)] = len(edges) + 1
+    return index
+
+
+def _bin_categorical(values, codes):
+    """Position of each value in the sorted ``codes``; unknown and missing values
+    go to the extra last slot."""
+    index = np.searchsorted(codes, values)
+    index = np.minimum(index, len(codes) - 1)
+    index[codes[index] != values] = len(codes)
+    return index
+
+
+def build_reference(features_df, n_bins=NUMERIC_BINS, source=None):
+    """Reference profile of ``features_df`` (the model features of the training rows)."""
+    numerical = {}
+    for col in numerical_features_model:
+        values = features_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = values[~np.isnan(values)]
+        # Interior quantile edges; duplicates (e.g. many zeros) are merged
+        edges = np.unique(np.quantile(finite, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(_bin_numeric(values, edges), minlength=len(edges) + 2)
+        numerical[col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+
+    categorical = {}
+    for col in categorical_features_model:
+        values = features_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        codes, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        n_missing = int(np.isnan(values).sum())
+        categorical[col] = {
+            "codes": codes.tolist(),
+            "counts": counts.tolist() + [n_missing],
+        }
+
+    return {
+        "source": source,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_rows": len(features_df),
+        "numerical": numerical,
+        "categorical": categorical,
+    }
+
+
+def build_reference_from_csv(data_path=TRAINING_DATA_PATH, n_bins=NUMERIC_BINS):
+    from scoring import prepare_features
+
+    train_df = compact_dtypes(pd.read_csv(data_path, sep=";"))
+    return build_reference(prepare_features(train_df), n_bins, source=data_path)
+
+
+def save_json(payload, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_reference(path=DEFAULT_REFERENCE_PATH):
+    """Loads the reference profile, building it from the training data if missing."""
+    if not os.path.exists(path):
+        reference = build_reference_from_csv()
+        save_json(reference, path)
+        return reference
+    with open(path) as f:
+        return json.load(f)
+
+
+def psi(expected_counts, actual_counts):
+    """Population stability index between two count vectors over the same bins.
+
+    NaN while ``actual_counts`` is empty.
+    """
+    if not actual_counts.sum():
+        return np.nan
+    expected = np.maximum(expected_counts / max(expected_counts.sum(), 1), PSI_EPSILON)
+    actual = np.maximum(actual_counts / max(actual_counts.sum(), 1), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected_counts, actual_counts):
+    """Largest difference of the two cumulative distributions at the bin edges."""
+    if not actual_counts.sum():
+        return np.nan
+    expected_cdf = np.cumsum(expected_counts) / max(expected_counts.sum(), 1)
+    actual_cdf = np.cumsum(actual_counts) / max(actual_counts.sum(), 1)
+    return float(np.max(np.abs(expected_cdf - actual_cdf)))
+
+
+def drift_status(value):
+    if np.isnan(value):
+        return "tanpa data"
+    if value >= PSI_SIGNIFICANT:
+        return "signifikan"
+    if value >= PSI_MODERATE:
+        return "sedang"
+    return "stabil"
+
+
+class DriftMonitor:
+    """Streaming histograms of scored batches, compared against a reference profile.
+
+    Thread-safe, so the serving thread can update it while a request reads the
+    report. ``state()`` and ``from_state()`` carry the counts across runs.
+    """
+
+    def __init__(self, reference):
+        self.reference = reference
+        self._lock = threading.Lock()
+        self._edges = {
+            col: np.asarray(spec["edges"], dtype=np.float64)
+            for col, spec in reference["numerical"].items()
+        }
+        self._codes = {
+            col: np.asarray(spec["codes"], dtype=np.float64)
+            for col, spec in reference["categorical"].items()
+        }
+        # One extra slot per feature for missing values, or missing and unknown codes
+        self.n_rows = 0
+        self.counts = {
+            col: np.zeros(len(edges) + 2, dtype=np.int64)
+            for col, edges in self._edges.items()
+        }
+        self.counts.update(
+            {
+                col: np.zeros(len(codes) + 1, dtype=np.int64)
+                for col, codes in self._codes.items()
+            }
+        )
+
+    def update(self, features_df):
+        """Adds one scored batch (the model feature frame) to the histograms."""
+        batch_counts = {}
+        for col, edges in self._edges.items():
+            values = features_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            batch_counts[col] = np.bincount(
+                _bin_numeric(values, edges), minlength=len(edges) + 2
+            )
+        for col, codes in self._codes.items():
+            values = features_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            batch_counts[col] = np.bincount(
+                _bin_categorical(values, codes), minlength=len(codes) + 1
+            )
+        with self._lock:
+            self.n_rows += len(features_df)
+            for col, counts in batch_counts.items():
+                self.counts[col] += counts
+
+    def report(self):
+        """PSI, KS distance and share of unknown codes per feature, worst first."""
+        with self._lock:
+            counts = {col: values.copy() for col, values in self.counts.items()}
+        rows = []
+        for col in self._edges:
+            expected = np.asarray(self.reference["numerical"][col]["counts"])
+            actual = counts[col]
+            rows.append(
+                {
+                    "feature": col,
+                    "type": "numerik",
+                    "psi": psi(expected, actual),
+                    # KS over the value bins only, without the missing slot
+                    "ks": binned_ks(expected[:-1], actual[:-1]),
+                    "unknown_share": np.nan,
+                }
+            )
+        for col, codes in self._codes.items():
+            reference_counts = np.asarray(self.reference["categorical"][col]["counts"])
+            actual = counts[col]
+            # The reference's last slot holds its missing values only
+            rows.append(
+                {
+                    "feature": col,
+                    "type": "kategorikal",
+                    "psi": psi(reference_counts, actual),
+                    "ks": np.nan,
+                    "unknown_share": actual[-1] / max(actual.sum(), 1),
+                }
+            )
+        report_df = pd.DataFrame(rows).set_index("feature")
+        report_df["status"] = report_df["psi"].map(drift_status)
+        return report_df.sort_values("psi", ascending=False)
+
+    def state(self):
+        with self._lock:
+            return {
+                "reference_created_at": self.reference["created_at"],
+                "n_rows": self.n_rows,
+                "counts": {col: values.tolist() for col, values in self.counts.items()},
+            }
+
+    @classmethod
+    def from_state(cls, reference, state):
+        """Monitor continuing from ``state()``; the reference must be the same."""
+        if state["reference_created_at"] != reference["created_at"]:
+            raise ValueError(
+                "State drift dibuat dengan profil referensi lain; hapus file state atau gunakan referensi yang sama."
+            )
+        monitor = cls(reference)
+        monitor.n_rows = state["n_rows"]
+        for col, values in state["counts"].items():
+            monitor.counts[col] = np.asarray(values, dtype=np.int64)
+        return monitor
+
+    def save(self, path=DEFAULT_DRIFT_STATE):
+        save_json(self.state(), path)
+
+
+def load_monitor(state_path=DEFAULT_DRIFT_STATE, reference_path=DEFAULT_REFERENCE_PATH):
+    """Monitor continuing from ``state_path`` if it exists, otherwise a fresh one."""
+    reference = load_reference(reference_path)
+    if not os.path.exists(state_path):
+        return DriftMonitor(reference)
+    with open(state_path) as f:
+        return DriftMonitor.from_state(reference, json.load(f))
+
+
+def format_report(report_df, n_rows):
+    lines = [f"Drift fitur terhadap data pelatihan ({n_rows:,} baris diprediksi):"]
+    lines.append(report_df.to_string(float_format="{:.4f}".format))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pemantauan drift fitur terhadap distribusi data pelatihan."
+    )
+    parser.add_argument("--reference", default=DEFAULT_REFERENCE_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    reference_parser = subparsers.add_parser(
+        "reference", help="Hitung profil referensi dari data pelatihan."
+    )
+    reference_parser.add_argument("--data", default=TRAINING_DATA_PATH)
+    reference_parser.add_argument("--bins", type=int, default=NUMERIC_BINS)
+    report_parser = subparsers.add_parser(
+        "report", help="Tampilkan PSI/KS per fitur dari file state."
+    )
+    report_parser.add_argument("state_path", nargs="?", default=DEFAULT_DRIFT_STATE)
+    args = parser.parse_args(argv)
+
+    if args.command == "reference":
+        reference = build_reference_from_csv(args.data, args.bins)
+        save_json(reference, args.reference)
+        print(
+            f"Profil referensi dari {reference['n_rows']:,} baris disimpan di '{args.reference}'."
+        )
+        return 0
+
+    if not os.path.exists(args.state_path):
+        print(f"Error: File state '{args.state_path}' tidak ditemukan.", file=sys.stderr)
+        return 1
+    monitor = load_monitor(args.state_path, args.reference)
+    print(format_report(monitor.report(), monitor.n_rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import numpy as np
+
+# Define feature lists grouped by category for better UI organization
+base_academic_features = [
+    "Previous_qualification_grade",
+    "Admission_grade",
+    "Curricular_units_1st_sem_credited",
+    "Curricular_units_1st_sem_enrolled",
+    "Curricular_units_1st_sem_evaluations",
+    "Curricular_units_1st_sem_approved",
+    "Curricular_units_1st_sem_grade",
+    "Curricular_units_1st_sem_without_evaluations",
+    "Curricular_units_2nd_sem_credited",
+    "Curricular_units_2nd_sem_enrolled",
+    "Curricular_units_2nd_sem_evaluations",
+    "Curricular_units_2nd_sem_approved",
+    "Curricular_units_2nd_sem_grade",
+    "Curricular_units_2nd_sem_without_evaluations",
+]
+
+personal_background_features = [
+    "Age_at_enrollment",
+    "Marital_status",
+    "Nacionality",
+    "Mothers_qualification",
+    "Fathers_qualification",
+    "Mothers_occupation",
+    "Fathers_occupation",
+    "Gender",
+    "Displaced",
+]
+
+enrollment_financial_features = [
+    "Application_mode",
+    "Course",
+    "Daytime_evening_attendance",
+    "Previous_qualification",
+    "Debtor",
+    "Tuition_fees_up_to_date",
+    "Scholarship_holder",
+    "International",
+    "Educational_special_needs",
+]
+
+external_features = ["Unemployment_rate", "Inflation_rate", "GDP"]
+
+# Engineered features
+engineered_features_list = [
+    "Avg_Grade_Sem1",
+    "Avg_Grade_Sem2",
+    "Approved_Ratio_Sem1",
+    "Approved_Ratio_Sem2",
+    "Grade_Change_Sem1_to_2",
+    "Total_Approved_Units",
+    "Total_Enrolled_Units",
+]
+
+# Raw columns a scoring input must provide (engineered features are derived)
+input_features_ordered = (
+    base_academic_features
+    + personal_background_features
+    + enrollment_financial_features
+    + external_features
+)
+
+# all_features_ordered
+all_features_ordered = input_features_ordered + engineered_features_list
+
+# Numerically coded columns the model treats as categories (list_kolom_kategorikal_numeric
+# in the notebook); everything else is numerical. Order matches the fitted preprocessor.
+categorical_features_model = [
+    "Marital_status",
+    "Application_mode",
+    "Course",
+    "Daytime_evening_attendance",
+    "Previous_qualification",
+    "Nacionality",
+    "Mothers_qualification",
+    "Fathers_qualification",
+    "Mothers_occupation",
+    "Fathers_occupation",
+    "Educational_special_needs",
+    "Debtor",
+    "Tuition_fees_up_to_date",
+    "Gender",
+    "Scholarship_holder",
+    "International",
+    "Displaced",
+]
+
+numerical_features_model = [
+    "Previous_qualification_grade",
+    "Admission_grade",
+    "Age_at_enrollment",
+    "Curricular_units_1st_sem_credited",
+    "Curricular_units_1st_sem_enrolled",
+    "Curricular_units_1st_sem_evaluations",
+    "Curricular_units_1st_sem_approved",
+    "Curricular_units_1st_sem_grade",
+    "Curricular_units_1st_sem_without_evaluations",
+    "Curricular_units_2nd_sem_credited",
+    "Curricular_units_2nd_sem_enrolled",
+    "Curricular_units_2nd_sem_evaluations",
+    "Curricular_units_2nd_sem_approved",
+    "Curricular_units_2nd_sem_grade",
+    "Curricular_units_2nd_sem_without_evaluations",
+] + external_features + engineered_features_list
+
+# Compact dtypes of the raw columns: codes and counts fit in int8/int16. Grades and
+# rates stay float64, since rounding them to float32 moves values across the
+# model's split points and changes predictions.
+float_input_features = [
+    "Previous_qualification_grade",
+    "Admission_grade",
+    "Curricular_units_1st_sem_grade",
+    "Curricular_units_2nd_sem_grade",
+] + external_features
+input_feature_dtypes = {
+    col: "float64" if col in float_input_features else "int8"
+    for col in input_features_ordered
+}
+input_feature_dtypes.update(
+    {"Course": "int16", "Mothers_occupation": "int16", "Fathers_occupation": "int16"}
+)
+# Declared dtype of every column in all_features_ordered. Ratios and averages stay
+# float64 for the same reason as the grades; unit totals are whole numbers.
+feature_dtypes = {
+    **input_feature_dtypes,
+    **dict.fromkeys(engineered_features_list, "float64"),
+    "Total_Approved_Units": "int16",
+    "Total_Enrolled_Units": "int16",
+}
+
+
+def _column_as_float(input_df, col):
+    if col not in input_df.columns:
+        return None
+    return input_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def compute_engineered_features(input_df):
+    """Computes the engineered features as a float64 array.
+
+    Columns follow ``engineered_features_list``. Missing source columns, missing
+    values and ratios over zero enrolled units all yield 0, matching the
+    original ``replace(0, pd.NA)`` / ``fillna(0)`` logic without its object-dtype
+    intermediates.
+    """
+    grade_1 = _column_as_float(input_df, "Curricular_units_1st_sem_grade")
+    grade_2 = _column_as_float(input_df, "Curricular_units_2nd_sem_grade")
+    approved_1 = _column_as_float(input_df, "Curricular_units_1st_sem_approved")
+    approved_2 = _column_as_float(input_df, "Curricular_units_2nd_sem_approved")
+    enrolled_1 = _column_as_float(input_df, "Curricular_units_1st_sem_enrolled")
+    enrolled_2 = _column_as_float(input_df, "Curricular_units_2nd_sem_enrolled")
+
+    engineered = np.zeros((len(input_df), len(engineered_features_list)))
+    if grade_1 is not None and grade_2 is not None:
+        engineered[:, 0] = grade_1
+        engineered[:, 1] = grade_2
+        np.subtract(grade_2, grade_1, out=engineered[:, 4])
+    if approved_1 is not None and enrolled_1 is not None:
+        np.divide(approved_1, enrolled_1, out=engineered[:, 2], where=enrolled_1 != 0)
+    if approved_2 is not None and enrolled_2 is not None:
+        np.divide(approved_2, enrolled_2, out=engineered[:, 3], where=enrolled_2 != 0)
+    if approved_1 is not None and approved_2 is not None:
+        np.add(approved_1, approved_2, out=engineered[:, 5])
+    if enrolled_1 is not None and enrolled_2 is not None:
+        np.add(enrolled_1, enrolled_2, out=engineered[:, 6])
+
+    engineered[np.isnan(engineered)] = 0
+    return engineered
+
+
+def add_engineered_features(input_df):
+    """Adds the engineered features to ``input_df`` (in place) and returns it.
+
+    The features get their ``feature_dtypes`` (the unit totals become int16).
+    """
+    engineered = compute_engineered_features(input_df)
+    for i, col in enumerate(engineered_features_list):
+        input_df[col] = engineered[:, i]
+    return compact_dtypes(input_df, engineered_features_list)
+
+
+def compact_dtypes(input_df, columns=None):
+    """Downcasts integer-coded columns to ``feature_dtypes`` (in place).
+
+    Only ``columns`` are considered if given. A column is left as-is if it has
+    missing, fractional or out-of-range values, so malformed input still reaches
+    the pipeline's imputers unchanged.
+    """
+    for col, dtype in feature_dtypes.items():
+        if columns is not None and col not in columns:
+            continue
+        if col not in input_df.columns or dtype == "float64":
+            continue
+        if input_df[col].dtype == dtype or input_df[col].dtype.kind not in "iuf":
+            continue
+        values = input_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        limits = np.iinfo(dtype)
+        if (
+            np.isfinite(values).all()
+            and (values == np.round(values)).all()
+            and (values >= limits.min).all()
+            and (values <= limits.max).all()
+        ):
+            input_df[col] = values.astype(dtype)
+    return input_df
+
+
+def build_feature_frame(input_df):
+    """Returns a new frame with the raw and engineered features in pipeline order."""
+    missing_cols = [col for col in input_features_ordered if col not in input_df.columns]
+    if missing_cols:
+        raise KeyError(f"Missing columns: {missing_cols}")
+
+    feature_df = input_df.reindex(columns=all_features_ordered)
+    feature_df[engineered_features_list] = compute_engineered_features(input_df)
+    return compact_dtypes(feature_df, engineered_features_list)
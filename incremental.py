@@ -0,0 +1,160 @@
+"""Persisted prediction table for incremental re-scoring by student ID.
+
+Each student's row in an input snapshot is identified by its ID column and a
+64-bit hash of its raw input features. ``PredictionTable`` stores the last hash,
+model fingerprint and probabilities per student in SQLite, so a new snapshot
+only needs feature engineering and the model for students that are new, whose
+data changed, or that were scored by another model file:
+
+    python batch_score.py semester.csv perubahan.csv --id-column Student_ID \\
+        --prediction-table models/prediction_table.db
+    python incremental.py export models/prediction_table.db semua_prediksi.parquet
+
+Students missing from a later snapshot keep their last prediction.
+"""
+
+import argparse
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from cache import SQLITE_BATCH_SIZE, model_fingerprint
+from scoring import DEFAULT_THRESHOLD, build_prediction_frame
+
+DEFAULT_EXPORT_CHUNKSIZE = 100_000
+
+
+def normalize_student_ids(values):
+    """Student IDs as text, independent of how the column was parsed.
+
+    Whole-number floats (an integer column with a gap becomes float64) lose
+    their ``.0``, so ``123`` and ``123.0`` are the same student. Missing or
+    blank IDs raise ``ValueError``.
+    """
+    if values.dtype.kind == "f":
+        whole = values.notna() & (values == np.round(values))
+        if whole.all():
+            values = values.astype("Int64")
+    ids = values.astype("string").str.strip()
+    missing = ids.isna() | (ids == "")
+    if missing.any():
+        raise ValueError(
+            f"ID mahasiswa kosong pada {int(missing.sum())} baris; setiap baris membutuhkan ID."
+        )
+    return ids.astype(object)
+
+
+class PredictionTable:
+    """Latest probabilities per student ID, with the hash of the scored row."""
+
+    def __init__(self, db_path, model_path=None, fingerprint=None):
+        self.db_path = db_path
+        # Prefer the fingerprint pinned to the loaded pipeline over re-hashing the file
+        if fingerprint is None and model_path:
+            fingerprint = model_fingerprint(model_path)
+        self.fingerprint = fingerprint
+        self._db = sqlite3.connect(db_path, timeout=30)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS student_predictions (
+                student_id TEXT PRIMARY KEY,
+                row_hash INTEGER NOT NULL,
+                model_fingerprint TEXT NOT NULL,
+                probability_non_dropout REAL NOT NULL,
+                probability_dropout REAL NOT NULL,
+                scored_at TEXT NOT NULL
+            )
+            """
+        )
+
+    def changed_mask(self, student_ids, row_hashes):
+        """True for rows that are new, changed, or scored by another model."""
+        stored = {}
+        student_ids = list(student_ids)
+        for i in range(0, len(student_ids), SQLITE_BATCH_SIZE):
+            batch = student_ids[i : i + SQLITE_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"""
+                SELECT student_id, row_hash FROM student_predictions
+                WHERE model_fingerprint = ? AND student_id IN ({placeholders})
+                """,
+                [self.fingerprint, *batch],
+            )
+            stored.update(rows)
+        return np.fromiter(
+            (
+                stored.get(student_id) != row_hash
+                for student_id, row_hash in zip(student_ids, row_hashes.tolist())
+            ),
+            dtype=bool,
+            count=len(student_ids),
+        )
+
+    def upsert(self, student_ids, row_hashes, prediction_prob):
+        scored_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO student_predictions VALUES (?, ?, ?, ?, ?, ?)",
+                zip(
+                    student_ids,
+                    row_hashes.tolist(),
+                    [self.fingerprint] * len(row_hashes),
+                    prediction_prob[:, 0].tolist(),
+                    prediction_prob[:, 1].tolist(),
+                    [scored_at] * len(row_hashes),
+                ),
+            )
+
+    def iter_frames(self, chunksize=DEFAULT_EXPORT_CHUNKSIZE, threshold=DEFAULT_THRESHOLD):
+        """Yields the table as DataFrames of ``student_id`` plus prediction columns."""
+        for table_df in pd.read_sql_query(
+            """
+            SELECT student_id, probability_non_dropout, probability_dropout, scored_at
+            FROM student_predictions ORDER BY student_id
+            """,
+            self._db,
+            chunksize=chunksize,
+        ):
+            prediction_prob = table_df[
+                ["probability_non_dropout", "probability_dropout"]
+            ].to_numpy()
+            predictions = (prediction_prob[:, 1] > threshold).astype(int)
+            yield table_df[["student_id"]].join(
+                build_prediction_frame(table_df.index, predictions, prediction_prob)
+            ).assign(scored_at=table_df["scored_at"])
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM student_predictions").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+def main(argv=None):
+    from ingest import ResultWriter
+
+    parser = argparse.ArgumentParser(description="Tabel prediksi per ID mahasiswa.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Tulis seluruh tabel prediksi ke CSV, Parquet atau Arrow."
+    )
+    export_parser.add_argument("table_path")
+    export_parser.add_argument("output")
+    export_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    table = PredictionTable(args.table_path)
+    with ResultWriter(args.output) as writer:
+        for frame in table.iter_frames(threshold=args.threshold):
+            writer.write(frame)
+    table.close()
+    print(f"{writer.n_rows} prediksi ditulis ke '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
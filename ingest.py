@@ -0,0 +1,233 @@
+"""Reading and writing student files: CSV, Parquet and Arrow IPC.
+
+For CSVs the header is read and validated from the first line before any data
+is parsed, the delimiter is sniffed from it (source-system exports use ``;`` like
+``data/data.csv``), and the rows are parsed in chunks that are each downcast to
+the compact dtypes of ``features.input_feature_dtypes``. Parquet and Arrow IPC
+files are read and written as record batches with their typed columns, without
+a text round-trip.
+"""
+
+import csv
+import os
+
+import pandas as pd
+
+from features import compact_dtypes
+
+DELIMITERS = (",", ";", "\t", "|")
+DEFAULT_PARSE_CHUNKSIZE = 100_000
+
+
+def sniff_delimiter(header_line):
+    """Returns the candidate delimiter occurring most often in the header line."""
+    best = max(DELIMITERS, key=header_line.count)
+    return best if header_line.count(best) else ","
+
+
+def read_csv_header(file):
+    """Returns ``(sep, columns)`` from the first line of a binary file object.
+
+    The file position is restored afterwards, so the same object can be parsed.
+    """
+    start = file.tell()
+    header_line = file.readline()
+    file.seek(start)
+    if isinstance(header_line, bytes):
+        header_line = header_line.decode("utf-8-sig", errors="replace")
+    header_line = header_line.rstrip("\r\n")
+    sep = sniff_delimiter(header_line)
+    columns = next(csv.reader([header_line], delimiter=sep), [])
+    return sep, columns
+
+
+def read_student_csv(file, sep=None, chunksize=DEFAULT_PARSE_CHUNKSIZE):
+    """Parses a student CSV in chunks of ``chunksize`` rows into compact dtypes.
+
+    Only one chunk exists at parser width (int64/float64) at a time. Letting the
+    parser infer and downcasting afterwards is faster than passing the narrow
+    dtypes to ``pd.read_csv``, and still accepts missing values.
+    """
+    detected_sep, columns = read_csv_header(file)
+    reader = pd.read_csv(file, sep=sep or detected_sep, chunksize=chunksize)
+    chunks = [compact_dtypes(chunk) for chunk in reader]
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
+
+
+# --- Columnar formats (pyarrow is imported only when one is used) ---
+
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def file_format(path):
+    """Returns ``"csv"``, ``"parquet"`` or ``"arrow"`` (IPC) from the file extension."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError(
+            f"Format file '{extension}' tidak didukung, gunakan salah satu dari {sorted(FILE_FORMATS)}."
+        )
+    return FILE_FORMATS[extension]
+
+
+def _iter_arrow_batches(source):
+    """Record batches of an Arrow IPC file, or of an IPC stream as a fallback."""
+    import pyarrow as pa
+
+    try:
+        reader = pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        yield from pa.ipc.open_stream(source)
+        return
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
+
+def count_input_rows(path):
+    """Number of data rows of an input file, without parsing it.
+
+    For CSVs this counts line breaks, so it assumes no quoted field spans lines.
+    """
+    fmt = file_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            return sum(batch.num_rows for batch in _iter_arrow_batches(source))
+    n_lines = 0
+    last_block = b""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            n_lines += block.count(b"\n")
+            last_block = block
+    if last_block and not last_block.endswith(b"\n"):
+        n_lines += 1
+    return max(n_lines - 1, 0)
+
+
+def iter_input_batches(path, chunksize, sep=None, text_columns=()):
+    """Yields the rows of a CSV, Parquet or Arrow IPC file as DataFrames.
+
+    Columnar inputs keep their stored types (no text round-trip) and are read
+    one record batch at a time. CSV ``text_columns`` are read as strings, so
+    e.g. IDs keep leading zeros and do not turn into floats.
+    """
+    fmt = file_format(path)
+    if fmt == "csv":
+        if sep is None:
+            with open(path, "rb") as f:
+                sep, _ = read_csv_header(f)
+        yield from pd.read_csv(
+            path,
+            sep=sep,
+            chunksize=chunksize,
+            dtype=dict.fromkeys(text_columns, str) or None,
+        )
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            for batch in _iter_arrow_batches(source):
+                yield batch.to_pandas()
+
+
+def read_student_file(file, name):
+    """Reads an uploaded CSV, Parquet or Arrow file (``name`` gives the format)."""
+    fmt = file_format(name)
+    if fmt == "csv":
+        return read_student_csv(file)
+    if fmt == "parquet":
+        input_df = pd.read_parquet(file)
+    else:
+        import pyarrow as pa
+
+        input_df = pa.Table.from_batches(list(_iter_arrow_batches(file))).to_pandas()
+    return compact_dtypes(input_df)
+
+
+class ResultWriter:
+    """Appends scored DataFrames to a CSV, Parquet or Arrow IPC file.
+
+    Columnar outputs are written as a stream of record batches (one Parquet row
+    group / IPC batch per ``write``), so the full result never sits in memory.
+    The first batch fixes the schema; later batches are cast to it.
+    """
+
+    def __init__(self, path, sep=","):
+        self.path = path
+        self.sep = sep
+        self.format = file_format(path)
+        self.n_rows = 0
+        self._schema = None
+        self._writer = None
+        self._sink = None
+
+    def write(self, result_df):
+        if self.format == "csv":
+            result_df.to_csv(
+                self.path,
+                mode="w" if self.n_rows == 0 else "a",
+                header=self.n_rows == 0,
+                index=False,
+                sep=self.sep,
+            )
+        else:
+            self._write_batch(result_df)
+        self.n_rows += len(result_df)
+
+    def _write_batch(self, result_df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._schema is None:
+            batch = pa.RecordBatch.from_pandas(result_df, preserve_index=False)
+            self._schema = batch.schema
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._sink = pa.OSFile(self.path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            try:
+                batch = pa.RecordBatch.from_pandas(
+                    result_df, schema=self._schema, preserve_index=False
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Tipe kolom berubah antar chunk: {e}") from e
+        if self.format == "parquet":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
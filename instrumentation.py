@@ -0,0 +1,111 @@
+"""Opt-in per-stage timing and memory instrumentation for the Streamlit app.
+
+``Instrumentation.stage(name)`` records the wall time and peak traced memory
+(``tracemalloc``, which also sees NumPy/pandas buffers) of one block. When
+disabled it is a no-op, so the app can wrap its stages unconditionally. Records
+are appended as JSON lines, one per stage, so logs of many sessions can be
+aggregated:
+
+    python instrumentation.py summarize logs/app_diagnostics.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class Instrumentation:
+    """Collects ``{"stage", "seconds", "peak_mb"}`` records for one app rerun."""
+
+    def __init__(self, enabled=False, log_path=None, session_id=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.session_id = session_id
+        self.records = []
+        # Tracing stays on for the process once enabled; peaks are process-wide,
+        # so concurrent sessions can inflate each other's numbers
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            _, peak_memory = tracemalloc.get_traced_memory()
+            self.records.append(
+                {
+                    "stage": name,
+                    "seconds": seconds,
+                    "peak_mb": max(0, peak_memory - start_memory) / 2**20,
+                }
+            )
+
+    def write_log(self, **context):
+        """Appends this rerun's records to ``log_path`` as JSON lines."""
+        if not (self.enabled and self.log_path and self.records):
+            return
+        log_dir = os.path.dirname(self.log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        with open(self.log_path, "a") as f:
+            for record in self.records:
+                entry = {
+                    "timestamp": timestamp,
+                    "session_id": self.session_id,
+                    **context,
+                    **record,
+                }
+                f.write(json.dumps(entry) + "\n")
+
+
+def summarize_log(log_path):
+    """Returns per-stage count, mean/p50/p95 seconds and max peak memory."""
+    import pandas as pd
+
+    log_df = pd.read_json(log_path, lines=True)
+    if log_df.empty:
+        return log_df
+    grouped = log_df.groupby("stage")
+    summary = grouped["seconds"].agg(
+        count="count",
+        mean_s="mean",
+        p50_s="median",
+        p95_s=lambda s: s.quantile(0.95),
+        total_s="sum",
+    )
+    summary["max_peak_mb"] = grouped["peak_mb"].max()
+    return summary.sort_values("total_s", ascending=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ringkasan log diagnostik performa aplikasi Streamlit."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summarize_parser = subparsers.add_parser(
+        "summarize", help="Agregasi waktu dan memori per tahap."
+    )
+    summarize_parser.add_argument("log_path")
+    args = parser.parse_args(argv)
+
+    print(summarize_log(args.log_path).to_string(float_format="{:.4f}".format))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
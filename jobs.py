@@ -0,0 +1,333 @@
+"""Persistent background job queue for scoring large uploads.
+
+Jobs are rows of an SQLite table, so they survive browser refreshes and app
+restarts; the uploaded file and the result of each job are stored under
+``jobs/<job_id>/``. Workers claim the oldest queued job, score it chunk by chunk
+(like ``batch_score.py``) and record the progress after every chunk. A job
+whose worker stopped sending progress for ``STALE_SECONDS`` is claimed again.
+Every claim increments the job's ``attempt``; progress and the final status are
+only recorded for the current attempt, so a worker that was merely slow notices
+that it lost the job (``JobLostError``) and stops, and each attempt writes its
+own partial result file.
+
+The Streamlit app starts ``JOB_WORKERS`` worker threads itself; workers can also
+run as a separate process, so big jobs do not compete with interactive sessions:
+
+    JOB_WORKERS=0 streamlit run app.py
+    python jobs.py worker --workers 2
+    python jobs.py list
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from features import compact_dtypes, input_features_ordered
+from ingest import ResultWriter, count_input_rows, file_format, iter_input_batches
+from labels import labels_to_codes_frame
+from results import build_result_table
+from scoring import DEFAULT_THRESHOLD, MODEL_PATH, predict_frame, prepare_features
+
+DEFAULT_JOB_DIR = "jobs"
+DEFAULT_JOB_CHUNKSIZE = 50_000
+POLL_SECONDS = 1.0
+STALE_SECONDS = 300
+RESULT_FILE = "hasil.parquet"
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobLostError(RuntimeError):
+    """The job was claimed again by another worker after this attempt went stale."""
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class JobQueue:
+    """SQLite job table plus the job files under ``job_dir``.
+
+    Every call opens its own connection, so one queue can be shared by the
+    app's script threads and the worker threads.
+    """
+
+    def __init__(self, job_dir=DEFAULT_JOB_DIR):
+        self.job_dir = job_dir
+        self.db_path = os.path.join(job_dir, "jobs.db")
+        os.makedirs(job_dir, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    file_name TEXT NOT NULL,
+                    input_path TEXT NOT NULL,
+                    model_path TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    n_rows_total INTEGER,
+                    n_rows_done INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    heartbeat REAL,
+                    finished_at TEXT,
+                    attempt INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+            if "attempt" not in columns:
+                # Queues created before claims were numbered
+                db.execute(
+                    "ALTER TABLE jobs ADD COLUMN attempt INTEGER NOT NULL DEFAULT 0"
+                )
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit; claim() opens its own write transaction
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def submit(
+        self, file, file_name, model_path=MODEL_PATH, threshold=DEFAULT_THRESHOLD
+    ):
+        """Stores the uploaded binary ``file`` and queues it; returns the job ID."""
+        extension = os.path.splitext(file_name)[1].lower()
+        file_format(file_name)
+        job_id = uuid.uuid4().hex[:12]
+        os.makedirs(os.path.join(self.job_dir, job_id))
+        input_path = os.path.join(self.job_dir, job_id, f"input{extension}")
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(file, f)
+
+        with self._connect() as db:
+            db.execute(
+                """
+                INSERT INTO jobs (job_id, file_name, input_path, model_path,
+                                  threshold, status, created_at)
+                VALUES (?, ?, ?, ?, ?, 'queued', ?)
+                """,
+                (job_id, file_name, input_path, model_path, threshold, _now()),
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, limit=20):
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self):
+        """Marks the oldest queued (or stale running) job as running and returns it.
+
+        The returned job's ``attempt`` identifies this claim in
+        ``update_progress`` and ``finish``.
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                """
+                SELECT * FROM jobs
+                WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?)
+                ORDER BY created_at, rowid LIMIT 1
+                """,
+                (time.time() - STALE_SECONDS,),
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    """
+                    UPDATE jobs SET status = 'running', started_at = ?,
+                                    heartbeat = ?, n_rows_done = 0,
+                                    attempt = attempt + 1
+                    WHERE job_id = ?
+                    """,
+                    (_now(), time.time(), row["job_id"]),
+                )
+            db.execute("COMMIT")
+        if row is None:
+            return None
+        return {**dict(row), "status": "running", "attempt": row["attempt"] + 1}
+
+    def update_progress(self, job, n_rows_done, n_rows_total=None):
+        """Records the progress of the claimed ``job``.
+
+        Raises ``JobLostError`` if the job has been claimed again since.
+        """
+        with self._connect() as db:
+            cursor = db.execute(
+                """
+                UPDATE jobs SET n_rows_done = ?, heartbeat = ?,
+                                n_rows_total = COALESCE(?, n_rows_total)
+                WHERE job_id = ? AND attempt = ? AND status = 'running'
+                """,
+                (n_rows_done, time.time(), n_rows_total, job["job_id"], job["attempt"]),
+            )
+        if cursor.rowcount == 0:
+            raise JobLostError(
+                f"Pekerjaan {job['job_id']} sudah diambil alih oleh worker lain."
+            )
+
+    def finish(self, job, error=None):
+        """Records the outcome of the claimed ``job``; returns False (and changes
+        nothing) if the job has been claimed again since."""
+        with self._connect() as db:
+            cursor = db.execute(
+                """
+                UPDATE jobs SET status = ?, error = ?, finished_at = ?
+                WHERE job_id = ? AND attempt = ? AND status = 'running'
+                """,
+                (
+                    "failed" if error else "done",
+                    error,
+                    _now(),
+                    job["job_id"],
+                    job["attempt"],
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def result_path(self, job_id):
+        return os.path.join(self.job_dir, job_id, RESULT_FILE)
+
+
+def run_job(job_queue, job, pipeline, chunksize=DEFAULT_JOB_CHUNKSIZE):
+    """Scores one job's input into ``jobs/<job_id>/hasil.parquet``.
+
+    Like the app, categorical labels are converted to codes, and the result holds
+    the row number and the prediction columns only. Raises ``JobLostError`` as
+    soon as another worker has claimed the job.
+    """
+    input_path = job["input_path"]
+    job_queue.update_progress(job, 0, count_input_rows(input_path))
+    result_path = job_queue.result_path(job["job_id"])
+    # Renamed when complete, so a result file is never read half-written; one
+    # per attempt, so a stale attempt cannot write into its successor's file
+    partial_path = (
+        os.path.splitext(result_path)[0] + f".{job['attempt']}.partial.parquet"
+    )
+    try:
+        n_rows = _score_job_input(job_queue, job, pipeline, partial_path, chunksize)
+        # Last ownership check before the result becomes visible
+        job_queue.update_progress(job, n_rows)
+        os.replace(partial_path, result_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return n_rows
+
+
+def _score_job_input(job_queue, job, pipeline, partial_path, chunksize):
+    n_rows = 0
+    with ResultWriter(partial_path) as writer:
+        for chunk in iter_input_batches(job["input_path"], chunksize):
+            if n_rows == 0:
+                missing_cols = [
+                    col for col in input_features_ordered if col not in chunk.columns
+                ]
+                if missing_cols:
+                    raise ValueError(
+                        f"File tidak memiliki kolom yang dibutuhkan oleh pipeline: {missing_cols}"
+                    )
+            chunk, _ = labels_to_codes_frame(chunk)
+            features_df = prepare_features(compact_dtypes(chunk))
+            prediction_df = predict_frame(pipeline, features_df, job["threshold"])
+            row_numbers = np.arange(n_rows + 1, n_rows + len(chunk) + 1)
+            writer.write(build_result_table(prediction_df, row_numbers))
+            n_rows += len(chunk)
+            job_queue.update_progress(job, n_rows)
+    return n_rows
+
+
+class JobWorker(threading.Thread):
+    """Daemon thread that claims and runs jobs until the process exits.
+
+    ``load_func(model_path)`` returns ``(pipeline, timings)``, e.g.
+    ``registry.ModelCache.get``.
+    """
+
+    def __init__(self, job_queue, load_func, chunksize=DEFAULT_JOB_CHUNKSIZE):
+        super().__init__(daemon=True)
+        self.job_queue = job_queue
+        self.load_func = load_func
+        self.chunksize = chunksize
+
+    def run(self):
+        while True:
+            job = self.job_queue.claim()
+            if job is None:
+                time.sleep(POLL_SECONDS)
+                continue
+            try:
+                pipeline, _ = self.load_func(job["model_path"])
+                run_job(self.job_queue, job, pipeline, self.chunksize)
+            except JobLostError as e:
+                print(f"{e} Percobaan {job['attempt']} dihentikan.", file=sys.stderr)
+            except Exception as e:
+                print(f"Pekerjaan {job['job_id']} gagal: {e}", file=sys.stderr)
+                self.job_queue.finish(job, error=str(e))
+            else:
+                self.job_queue.finish(job)
+
+
+def start_workers(job_queue, n_workers, load_func, chunksize=DEFAULT_JOB_CHUNKSIZE):
+    workers = [JobWorker(job_queue, load_func, chunksize) for _ in range(n_workers)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Antrean pekerjaan prediksi di latar belakang.")
+    parser.add_argument("--job-dir", default=DEFAULT_JOB_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    worker_parser = subparsers.add_parser("worker", help="Jalankan worker antrean.")
+    worker_parser.add_argument("--workers", type=int, default=1)
+    worker_parser.add_argument("--chunksize", type=int, default=DEFAULT_JOB_CHUNKSIZE)
+    subparsers.add_parser("list", help="Tampilkan pekerjaan terbaru.")
+    args = parser.parse_args(argv)
+
+    job_queue = JobQueue(args.job_dir)
+    if args.command == "list":
+        for job in job_queue.recent():
+            total = job["n_rows_total"] or "?"
+            print(
+                f"{job['job_id']}  {job['status']:<8} {job['n_rows_done']}/{total} baris  {job['file_name']}  ({job['created_at']})"
+            )
+        return 0
+
+    from registry import ModelCache
+
+    workers = start_workers(
+        job_queue, args.workers, ModelCache().get, chunksize=args.chunksize
+    )
+    print(f"{len(workers)} worker berjalan untuk antrean '{job_queue.db_path}'.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""Code <-> label registry for the numerically coded categorical columns.
+
+``LABEL_MAPS`` is built once at import: each ``LabelMap`` offers O(1) lookups in
+both directions, a pre-sorted option list for the form widgets, and a vectorized
+label-to-code conversion (via pandas categorical codes) for uploaded columns
+that use the text labels instead of the codes.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Mapping Kode Numerik ke Label Teks untuk Fitur Kategorikal
+marital_status_map = {
+    1: "Single",
+    2: "Married",
+    3: "Widower",
+    4: "Divorced",
+    5: "Facto Union",
+    6: "Legally Separated",
+}
+
+application_mode_map = {
+    1: "1st Phase - General Contingent",
+    2: "Ordinance No. 612/93",
+    5: "1st Phase - Special Contingent (Azores Island)",
+    7: "Holders of Other Higher Courses",
+    10: "Ordinance No. 854-B/99",
+    15: "International Student (Bachelor)",
+    16: "1st Phase - Special Contingent (Madeira Island)",
+    17: "2nd Phase - General Contingent",
+    18: "3rd Phase - General Contingent",
+    26: "Ordinance No. 533-A/99, Item b2) (Different Plan)",
+    27: "Ordinance No. 533-A/99, Item b3 (Other Institution)",
+    39: "Over 23 Years Old",
+    42: "Transfer",
+    43: "Change of Course",
+    44: "Technological Specialization Diploma Holders",
+    51: "Change of Institution/Course",
+    53: "Short Cycle Diploma Holders",
+    57: "Change of Institution/Course (International)",
+}
+
+course_map = {
+    33: "Biofuel Production Technologies",
+    171: "Animation and Multimedia Design",
+    8014: "Social Service (Evening Attendance)",
+    9003: "Agronomy",
+    9070: "Communication Design",
+    9085: "Veterinary Nursing",
+    9119: "Informatics Engineering",
+    9130: "Equinculture",
+    9147: "Management",
+    9238: "Social Service",
+    9254: "Tourism",
+    9500: "Nursing",
+    9556: "Oral Hygiene",
+    9670: "Advertising and Marketing Management",
+    9773: "Journalism and Communication",
+    9853: "Basic Education",
+    9991: "Management (Evening Attendance)",
+}
+
+daytime_evening_attendance_map = {1: "Daytime", 0: "Evening"}
+
+previous_qualification_map = {
+    1: "Secondary Education",
+    2: "Higher Education - Bachelor's Degree",
+    3: "Higher Education - Degree",
+    4: "Higher Education - Master's",
+    5: "Higher Education - Doctorate",
+    6: "Frequency of Higher Education",
+    9: "12th Year of Schooling - Not Completed",
+    10: "11th Year of Schooling - Not Completed",
+    12: "Other - 11th Year of Schooling",
+    14: "10th Year of Schooling",
+    15: "10th Year of Schooling - Not Completed",
+    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
+    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
+    39: "Technological Specialization Course",
+    40: "Higher Education - Degree (1st Cycle)",
+    42: "Professional Higher Technical Course",
+    43: "Higher Education - Master (2nd Cycle)",
+}
+
+nationality_map = {
+    1: "Portuguese",
+    2: "German",
+    6: "Spanish",
+    11: "Italian",
+    13: "Dutch",
+    14: "English",
+    17: "Lithuanian",
+    21: "Angolan",
+    22: "Cape Verdean",
+    24: "Guinean",
+    25: "Mozambican",
+    26: "Santomean",
+    32: "Turkish",
+    41: "Brazilian",
+    62: "Romanian",
+    100: "Moldova (Republic of)",
+    101: "Mexican",
+    103: "Ukrainian",
+    105: "Russian",
+    108: "Cuban",
+    109: "Colombian",
+}
+
+mothers_qualification_map = {
+    1: "Secondary Education - 12th Year of Schooling or Eq.",
+    2: "Higher Education - Bachelor's Degree",
+    3: "Higher Education - Degree",
+    4: "Higher Education - Master's",
+    5: "Higher Education - Doctorate",
+    6: "Frequency of Higher Education",
+    9: "12th Year of Schooling - Not Completed",
+    10: "11th Year of Schooling - Not Completed",
+    11: "7th Year (Old)",
+    12: "Other - 11th Year of Schooling",
+    14: "10th Year of Schooling",
+    18: "General Commerce Course",
+    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
+    22: "Technical-Professional Course",
+    26: "7th Year of Schooling",
+    27: "2nd Cycle of the General High School Course",
+    29: "9th Year of Schooling - Not Completed",
+    30: "8th Year of Schooling",
+    34: "Unknown",
+    35: "Can't Read or Write",
+    36: "Can Read without Having a 4th Year of Schooling",
+    37: "Basic Education 1st Cycle (4th/5th Year) or Equiv.",
+    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
+    39: "Technological Specialization Course",
+    40: "Higher Education - Degree (1st Cycle)",
+    41: "Specialized Higher Studies Course",
+    42: "Professional Higher Technical Course",
+    43: "Higher Education - Master (2nd Cycle)",
+    44: "Higher Education - Doctorate (3rd Cycle)",
+}
+
+fathers_qualification_map = {
+    1: "Secondary Education - 12th Year of Schooling or Eq.",
+    2: "Higher Education - Bachelor's Degree",
+    3: "Higher Education - Degree",
+    4: "Higher Education - Master's",
+    5: "Higher Education - Doctorate",
+    6: "Frequency of Higher Education",
+    9: "12th Year of Schooling - Not Completed",
+    10: "11th Year of Schooling - Not Completed",
+    11: "7th Year (Old)",
+    12: "Other - 11th Year of Schooling",
+    13: "2nd Year Complementary High School Course",
+    14: "10th Year of Schooling",
+    18: "General Commerce Course",
+    19: "Basic Education 3rd Cycle (9th/10th/11th Year) or Equiv.",
+    20: "Complementary High School Course",
+    22: "Technical-Professional Course",
+    25: "Complementary High School Course - Not Concluded",
+    26: "7th Year of Schooling",
+    27: "2nd Cycle of the General High School Course",
+    29: "9th Year of Schooling - Not Completed",
+    30: "8th Year of Schooling",
+    31: "General Course of Administration and Commerce",
+    33: "Supplementary Accounting and Administration",
+    34: "Unknown",
+    35: "Can't Read or Write",
+    36: "Can Read without Having a 4th Year of Schooling",
+    37: "Basic Education 1st Cycle (4th/5th Year) or Equiv.",
+    38: "Basic Education 2nd Cycle (6th/7th/8th Year) or Equiv.",
+    39: "Technological Specialization Course",
+    40: "Higher Education - Degree (1st Cycle)",
+    41: "Specialized Higher Studies Course",
+    42: "Professional Higher Technical Course",
+    43: "Higher Education - Master (2nd Cycle)",
+    44: "Higher Education - Doctorate (3rd Cycle)",
+}
+
+mothers_occupation_map = {
+    0: "Student",
+    1: "Representatives of the Legislative Power and Executive Bodies, Directors, Directors and Executive Managers",
+    2: "Specialists in Intellectual and Scientific Activities",
+    3: "Intermediate Level Technicians and Professions",
+    4: "Administrative Staff",
+    5: "Personal Services, Security and Safety Workers and Sellers",
+    6: "Farmers and Skilled Workers in Agriculture, Fisheries and Forestry",
+    7: "Skilled Workers in Industry, Construction and Craftsmen",
+    8: "Installation and Machine Operators and Assembly Workers",
+    9: "Unskilled Workers",
+    10: "Armed Forces Professions",
+    90: "Other Situation",
+    99: "(blank)",
+    122: "Health Professionals",
+    123: "Teachers",
+    125: "Specialists in Information and Communication Technologies (ICT)",
+    131: "Intermediate Level Science and Engineering Technicians and Professions",
+    132: "Technicians and Professionals, of Intermediate Level of Health",
+    134: "Intermediate Level Technicians from Legal, Social, Sports, Cultural and Similar Services",
+    141: "Office Workers, Secretaries in General and Data Processing Operators",
+    143: "Data, Accounting, Statistical, Financial Services and Registry-Related Operators",
+    144: "Other Administrative Support Staff",
+    151: "Personal Service Workers",
+    152: "Sellers",
+    153: "Personal Care Workers and the Like",
+    171: "Skilled Construction Workers and the Like, Except Electricians",
+    173: "Skilled Workers in Printing, Precision Instrument Manufacturing, Jewelers, Artisans and the Like",
+    175: "Workers in Food Processing, Woodworking, Clothing and Other Industries and Crafts",
+    191: "Cleaning Workers",
+    192: "Unskilled Workers in Agriculture, Animal Production, Fisheries and Forestry",
+    193: "Unskilled Workers in Extractive Industry, Construction, Manufacturing and Transport",
+    194: "Meal Preparation Assistants",
+}
+
+fathers_occupation_map = {
+    0: "Student",
+    1: "Representatives of the Legislative Power and Executive Bodies, Directors, Directors and Executive Managers",
+    2: "Specialists in Intellectual and Scientific Activities",
+    3: "Intermediate Level Technicians and Professions",
+    4: "Administrative Staff",
+    5: "Personal Services, Security and Safety Workers and Sellers",
+    6: "Farmers and Skilled Workers in Agriculture, Fisheries and Forestry",
+    7: "Skilled Workers in Industry, Construction and Craftsmen",
+    8: "Installation and Machine Operators and Assembly Workers",
+    9: "Unskilled Workers",
+    10: "Armed Forces Professions",
+    90: "Other Situation",
+    99: "(blank)",
+    101: "Armed Forces Officers",
+    102: "Armed Forces Sergeants",
+    103: "Other Armed Forces Personnel",
+    112: "Directors of Administrative and Commercial Services",
+    114: "Hotel, Catering, Trade and Other Services Directors",
+    121: "Specialists in the Physical Sciences, Mathematics, Engineering and Related Techniques",
+    122: "Health Professionals",
+    123: "Teachers",
+    124: "Specialists in Finance, Accounting, Administrative Organization, Public and Commercial Relations",
+    131: "Intermediate Level Science and Engineering Technicians and Professions",
+    132: "Technicians and Professionals, of Intermediate Level of Health",
+    134: "Intermediate Level Technicians from Legal, Social, Sports, Cultural and Similar Services",
+    135: "Information and Communication Technology Technicians",
+    141: "Office Workers, Secretaries in General and Data Processing Operators",
+    143: "Data, Accounting, Statistical, Financial Services and Registry-Related Operators",
+    144: "Other Administrative Support Staff",
+    151: "Personal Service Workers",
+    152: "Sellers",
+    153: "Personal Care Workers and the Like",
+    154: "Protection and Security Services Personnel",
+    161: "Market-Oriented Farmers and Skilled Agricultural and Animal Production Workers",
+    163: "Farmers, Livestock Keepers, Fishermen, Hunters and Gatherers, Subsistence",
+    171: "Skilled Construction Workers and the Like, Except Electricians",
+    172: "Skilled Workers in Metallurgy, Metalworking and Similar",
+    174: "Skilled Workers in Electricity and Electronics",
+    175: "Workers in Food Processing, Woodworking, Clothing and Other Industries and Crafts",
+    181: "Fixed Plant and Machine Operators",
+    182: "Assembly Workers",
+    183: "Vehicle Drivers and Mobile Equipment Operators",
+    192: "Unskilled Workers in Agriculture, Animal Production, Fisheries and Forestry",
+    193: "Unskilled Workers in Extractive Industry, Construction, Manufacturing and Transport",
+    194: "Meal Preparation Assistants",
+    195: "Street Vendors (Except Food) and Street Service Providers",
+}
+
+displaced_map = {0: "No", 1: "Yes"}
+educational_special_needs_map = {0: "No", 1: "Yes"}
+debtor_map = {0: "No", 1: "Yes"}
+tuition_fees_uptodate_map = {0: "No", 1: "Yes"}
+gender_map = {0: "Female", 1: "Male"}
+scholarship_holder_map = {0: "No", 1: "Yes"}
+international_map = {0: "No", 1: "Yes"}
+
+
+class LabelMap:
+    """Bidirectional lookup between the codes and labels of one column."""
+
+    def __init__(self, code_to_label, sort_options=True):
+        self.code_to_label = dict(code_to_label)
+        self.label_to_code = {label: code for code, label in self.code_to_label.items()}
+        labels = list(self.code_to_label.values())
+        self.options = tuple(sorted(labels) if sort_options else labels)
+        self._labels = pd.Index(labels)
+        self._codes = np.fromiter(self.code_to_label, dtype=np.float64)
+
+    def code(self, label):
+        return self.label_to_code.get(label)
+
+    def label(self, code):
+        return self.code_to_label.get(code)
+
+    def labels_to_codes(self, values):
+        """Converts a column of labels and/or codes to numeric codes.
+
+        Returns ``(codes, unknown)``: a float Series (NaN where the value is
+        missing or unrecognised) and the unrecognised non-missing values.
+        """
+        if values.dtype.kind in "iuf":
+            return values, []
+
+        stripped = values.astype("string").str.strip()
+        positions = pd.Categorical(stripped, categories=self._labels).codes
+        codes = np.full(len(values), np.nan)
+        matched = positions >= 0
+        codes[matched] = self._codes[positions[matched]]
+
+        # Codes written as text (e.g. "1" in a mixed column) are kept as codes
+        numeric = pd.to_numeric(stripped[~matched], errors="coerce")
+        codes[~matched] = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+
+        unknown = stripped[~matched][numeric.isna() & stripped[~matched].notna()]
+        return pd.Series(codes, index=values.index, name=values.name), (
+            unknown.unique().tolist()
+        )
+
+
+LABEL_MAPS = {
+    "Marital_status": LabelMap(marital_status_map),
+    "Application_mode": LabelMap(application_mode_map),
+    "Course": LabelMap(course_map),
+    "Daytime_evening_attendance": LabelMap(
+        daytime_evening_attendance_map, sort_options=False
+    ),
+    "Previous_qualification": LabelMap(previous_qualification_map),
+    "Nacionality": LabelMap(nationality_map),
+    "Mothers_qualification": LabelMap(mothers_qualification_map),
+    "Fathers_qualification": LabelMap(fathers_qualification_map),
+    "Mothers_occupation": LabelMap(mothers_occupation_map),
+    "Fathers_occupation": LabelMap(fathers_occupation_map),
+    "Displaced": LabelMap(displaced_map),
+    "Educational_special_needs": LabelMap(educational_special_needs_map),
+    "Debtor": LabelMap(debtor_map),
+    "Tuition_fees_up_to_date": LabelMap(tuition_fees_uptodate_map, sort_options=False),
+    "Gender": LabelMap(gender_map, sort_options=False),
+    "Scholarship_holder": LabelMap(scholarship_holder_map, sort_options=False),
+    "International": LabelMap(international_map),
+}
+
+
+def labels_to_codes_frame(input_df):
+    """Converts label-valued categorical columns of ``input_df`` to codes (in place).
+
+    Returns ``(input_df, unknown)`` where ``unknown`` maps each column to the
+    values that are neither a known label nor a number.
+    """
+    unknown = {}
+    for col, label_map in LABEL_MAPS.items():
+        if col not in input_df.columns or input_df[col].dtype.kind in "iuf":
+            continue
+        input_df[col], unknown_values = label_map.labels_to_codes(input_df[col])
+        if unknown_values:
+            unknown[col] = unknown_values
+    return input_df, unknown
@@ -0,0 +1,99 @@
+"""Preprocessor and XGBoost settings for the supported categorical encodings.
+
+- ``dense``: one-hot columns materialised as a dense float matrix (the original
+  notebook setup and the shipped model).
+- ``sparse``: the same one-hot columns kept as a CSR matrix end-to-end into
+  XGBoost. XGBoost treats entries absent from a sparse matrix as missing, so a
+  sparse model must be trained in sparse mode; it cannot reuse a dense booster.
+- ``native``: one ordinal code per categorical column, split on natively by
+  XGBoost (``enable_categorical``), with no one-hot expansion at all.
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from features import (
+    all_features_ordered,
+    build_feature_frame,
+    categorical_features_model,
+    numerical_features_model,
+)
+
+ENCODINGS = ("dense", "sparse", "native")
+
+
+def build_preprocessor(
+    encoding="dense",
+    numerical_features=numerical_features_model,
+    categorical_features=categorical_features_model,
+):
+    """Returns the unfitted ``ColumnTransformer`` for ``encoding``."""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Encoding '{encoding}' tidak dikenal, pilih dari {ENCODINGS}.")
+
+    numeric_transformer = Pipeline(
+        steps=[
+            ("imputer", SimpleImputer(strategy="median")),
+            ("scaler", StandardScaler()),
+        ]
+    )
+    if encoding == "native":
+        # Unknown codes become NaN, which XGBoost routes as missing
+        encoder = (
+            "ordinal",
+            OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=np.nan),
+        )
+    else:
+        encoder = (
+            "onehot",
+            OneHotEncoder(handle_unknown="ignore", sparse_output=encoding == "sparse"),
+        )
+    categorical_transformer = Pipeline(
+        steps=[("imputer", SimpleImputer(strategy="most_frequent")), encoder]
+    )
+
+    return ColumnTransformer(
+        transformers=[
+            ("num", numeric_transformer, list(numerical_features)),
+            ("cat", categorical_transformer, list(categorical_features)),
+        ],
+        remainder="passthrough",
+        sparse_threshold=1.0 if encoding == "sparse" else 0.0,
+    )
+
+
+def xgboost_encoding_params(
+    encoding="dense",
+    numerical_features=numerical_features_model,
+    categorical_features=categorical_features_model,
+):
+    """Extra ``XGBClassifier`` parameters needed by ``encoding``."""
+    if encoding != "native":
+        return {}
+    return {
+        "enable_categorical": True,
+        "tree_method": "hist",
+        "feature_types": ["q"] * len(numerical_features)
+        + ["c"] * len(categorical_features),
+    }
+
+
+class EngineeredFeatures(TransformerMixin, BaseEstimator):
+    """scikit-learn step that derives the engineered features from raw columns.
+
+    Stateless; the output is a DataFrame ordered as ``all_features_ordered``, so
+    it can be placed in front of the fitted ``preprocessor``.
+    """
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return build_feature_frame(X)
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(all_features_ordered, dtype=object)
@@ -0,0 +1,90 @@
+"""Streaming top-k risk ranking per group of students.
+
+``TopKRanker`` keeps a bounded min-heap of the ``k`` highest
+``Probability_Dropout`` rows per group (by default per ``Course`` and
+``Daytime_evening_attendance``), so ranking a cohort of any size needs memory
+for ``k`` rows per group only. Each scored chunk is first narrowed down to at
+most ``k`` candidates per group with one vectorized sort; only those candidates
+touch the heaps.
+
+Ties are broken deterministically: of two students with the same probability,
+the one earlier in the input ranks higher.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from results import ROW_ID_COLUMN
+
+DEFAULT_RANK_GROUPS = ["Course", "Daytime_evening_attendance"]
+RANK_COLUMN = "Rank"
+
+
+def _group_key(values):
+    # NaN != NaN, so missing group values share the key None
+    return tuple(None if pd.isna(value) else value for value in values)
+
+
+def _sort_key(group_key):
+    return tuple((value is None, value) for value in group_key)
+
+
+class TopKRanker:
+    """The ``k`` highest-``score_column`` rows per combination of ``group_columns``."""
+
+    def __init__(
+        self, k, group_columns=DEFAULT_RANK_GROUPS, score_column="Probability_Dropout"
+    ):
+        if k < 1:
+            raise ValueError("Jumlah peringkat (k) harus bernilai minimal 1.")
+        self.k = k
+        self.group_columns = list(group_columns)
+        self.score_column = score_column
+        self.columns = None
+        # group key -> min-heap of (score, -row number, row number, row values)
+        self._heaps = {}
+
+    @property
+    def n_groups(self):
+        return len(self._heaps)
+
+    def update(self, scored_df, row_numbers):
+        """Adds one scored chunk; ``row_numbers`` identify its rows in the input."""
+        if self.columns is None:
+            self.columns = list(scored_df.columns)
+        scores = scored_df[self.score_column].to_numpy(dtype=np.float64)
+        row_numbers = np.asarray(row_numbers)
+        # Highest score first, earlier row first among equal scores
+        order = np.lexsort((row_numbers, -scores))
+        ranked_df = scored_df.iloc[order]
+        rank_in_group = (
+            ranked_df.groupby(self.group_columns, dropna=False, sort=False)
+            .cumcount()
+            .to_numpy()
+        )
+        keep = rank_in_group < self.k
+        candidates_df = ranked_df[keep]
+
+        group_values = candidates_df[self.group_columns].itertuples(index=False, name=None)
+        rows = candidates_df.itertuples(index=False, name=None)
+        for group_values, row, score, row_number in zip(
+            group_values, rows, scores[order][keep], row_numbers[order][keep]
+        ):
+            heap = self._heaps.setdefault(_group_key(group_values), [])
+            item = (score, -row_number, row_number, row)
+            if len(heap) < self.k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+    def result(self):
+        """Ranked rows, ordered by group and then by rank (1 = highest risk)."""
+        columns = [RANK_COLUMN, ROW_ID_COLUMN] + (self.columns or [])
+        records = []
+        for group_key in sorted(self._heaps, key=_sort_key):
+            ranked = sorted(self._heaps[group_key], reverse=True)
+            for rank, (_, _, row_number, row) in enumerate(ranked, start=1):
+                records.append((rank, row_number) + row)
+        return pd.DataFrame.from_records(records, columns=columns)
@@ -0,0 +1,233 @@
+"""Model registry over ``models/`` and a memory-bounded cache of loaded models.
+
+Artefacts follow the notebook's naming, optionally with a version suffix:
+
+    models/dropout_prediction_<name>_pipeline.pkl             (versi "default")
+    models/dropout_prediction_<name>_pipeline_<version>.pkl
+
+Each may have a sidecar ``.json`` with metadata written by ``train.py``
+(``trained_at``, ``cv_roc_auc``, ``test_roc_auc``, ``params``, ...). A model is
+selected with ``"<name>"`` (newest version) or ``"<name>:<version>"``.
+
+``ModelCache`` keeps loaded pipelines in an LRU bounded by ``max_bytes``; the
+size of a pipeline is estimated by its artefact's file size.
+
+    python registry.py list
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from scoring import MODEL_DIR
+
+DEFAULT_VERSION = "default"
+DEFAULT_CACHE_MAX_BYTES = 1024 * 2**20
+ARTEFACT_PATTERN = re.compile(
+    r"^dropout_prediction_(?P<name>[a-z0-9]+)_pipeline(?:_(?P<version>[\w.-]+))?\.pkl$"
+)
+
+
+@dataclass
+class ModelEntry:
+    name: str
+    version: str
+    path: str
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def spec(self):
+        return f"{self.name}:{self.version}"
+
+    @property
+    def trained_at(self):
+        """Training time from the metadata, else the file's modification time."""
+        if "trained_at" in self.metadata:
+            return self.metadata["trained_at"]
+        mtime = os.path.getmtime(self.path)
+        return datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec="seconds")
+
+
+def metadata_path(model_path):
+    return os.path.splitext(model_path)[0] + ".json"
+
+
+class ModelRegistry:
+    """Lists and resolves the pipeline artefacts in ``model_dir``."""
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+
+    def list(self):
+        """All entries, grouped by name and newest first within a name."""
+        entries = []
+        if not os.path.isdir(self.model_dir):
+            return entries
+        for filename in os.listdir(self.model_dir):
+            match = ARTEFACT_PATTERN.match(filename)
+            if not match:
+                continue
+            path = os.path.join(self.model_dir, filename)
+            metadata = {}
+            if os.path.exists(metadata_path(path)):
+                with open(metadata_path(path)) as f:
+                    metadata = json.load(f)
+            entries.append(
+                ModelEntry(
+                    match["name"],
+                    match["version"] or DEFAULT_VERSION,
+                    path,
+                    metadata,
+                )
+            )
+        entries.sort(key=lambda entry: entry.trained_at, reverse=True)
+        entries.sort(key=lambda entry: entry.name)
+        return entries
+
+    def get(self, name, version=None):
+        """The entry for ``name`` and ``version`` (newest version if None)."""
+        candidates = [entry for entry in self.list() if entry.name == name]
+        if version is not None:
+            candidates = [entry for entry in candidates if entry.version == version]
+        if not candidates:
+            label = name if version is None else f"{name}:{version}"
+            raise KeyError(f"Model '{label}' tidak ditemukan di '{self.model_dir}'.")
+        return candidates[0]
+
+    def resolve(self, spec):
+        """Returns the entry for ``"<name>"`` or ``"<name>:<version>"``."""
+        name, _, version = spec.partition(":")
+        return self.get(name.lower(), version or None)
+
+    def register(self, pipeline, name, metadata, version=None):
+        """Saves ``pipeline`` as a new versioned artefact with its metadata."""
+        version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(
+            self.model_dir, f"dropout_prediction_{name.lower()}_pipeline_{version}.pkl"
+        )
+        os.makedirs(self.model_dir, exist_ok=True)
+        dump_pipeline(pipeline, path)
+        metadata = {"name": name.lower(), "version": version, **metadata}
+        write_metadata(path, metadata)
+        return ModelEntry(name.lower(), version, path, metadata)
+
+
+def dump_pipeline(pipeline, path):
+    """Pickles ``pipeline`` to ``path`` atomically.
+
+    The pickle is written to a temporary file next to ``path`` and moved into
+    place, so a process loading ``path`` meanwhile sees the old or the new
+    artefact, never a half-written one.
+    """
+    import joblib
+
+    partial_path = f"{path}.{os.getpid()}.partial"
+    try:
+        joblib.dump(pipeline, partial_path)
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def write_metadata(model_path, metadata):
+    with open(metadata_path(model_path), "w") as f:
+        json.dump(metadata, f, indent=2, default=str)
+
+
+def resolve_model_path(model, model_dir=MODEL_DIR):
+    """Accepts a file path or a registry spec and returns the artefact path."""
+    if os.path.exists(model):
+        return model
+    return ModelRegistry(model_dir).resolve(model).path
+
+
+class ModelCache:
+    """Thread-safe LRU of loaded pipelines bounded by ``max_bytes``.
+
+    Keys include the file's mtime and size, so a replaced artefact is reloaded.
+    Concurrent misses for the same key wait for a single load. A model's memory
+    is approximated by its (uncompressed) pickle's file size, which the loaded
+    arrays and booster bytes roughly match. The most recently loaded model is
+    always kept, even if it alone exceeds the cap.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MAX_BYTES, load_func=None):
+        self.max_bytes = max_bytes
+        self._load_func = load_func
+        self._lock = threading.Lock()
+        self._models = OrderedDict()
+        self._sizes = {}
+        # key -> Future of the load in progress
+        self._loading = {}
+
+    def _load(self, model_path):
+        if self._load_func is not None:
+            return self._load_func(model_path)
+        from startup import load_model
+
+        return load_model(model_path)
+
+    def get(self, model_path):
+        """Returns ``(pipeline, timings)`` for ``model_path``, loading on a miss."""
+        stat = os.stat(model_path)
+        key = (os.path.abspath(model_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            future = self._loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = self._loading[key] = Future()
+        if not is_loader:
+            return future.result()
+
+        try:
+            loaded = self._load(model_path)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[key]
+            self._models[key] = loaded
+            self._sizes[key] = stat.st_size
+            self._models.move_to_end(key)
+            while len(self._models) > 1 and self.memory_bytes() > self.max_bytes:
+                evicted, _ = self._models.popitem(last=False)
+                del self._sizes[evicted]
+        future.set_result(loaded)
+        return loaded
+
+    def memory_bytes(self):
+        return sum(self._sizes.values())
+
+    def __len__(self):
+        return len(self._models)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daftar model di registry.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="Tampilkan semua model.")
+    list_parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args(argv)
+
+    for entry in ModelRegistry(args.model_dir).list():
+        cv_auc = entry.metadata.get("cv_roc_auc")
+        cv_auc = f"{cv_auc:.4f}" if cv_auc is not None else "-"
+        print(f"{entry.spec:<40} dilatih {entry.trained_at}  ROC AUC CV {cv_auc}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Server-side filtering, sorting, paging and export of prediction results.
+
+The app keeps one compact result table per prediction run: an ID column plus
+the prediction (and optional driver) columns, without a copy of the 40+ input
+features. Only the requested page is sent to the browser. The download is built
+from that table as one complete file in memory, since ``st.download_button``
+needs the whole payload up front.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+ROW_ID_COLUMN = "Baris"
+STATUS_FILTERS = ("Semua", "Dropout", "Non-Dropout")
+DEFAULT_PAGE_SIZE = 50
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def build_result_table(prediction_df, ids=None, id_name=ROW_ID_COLUMN):
+    """``id_name`` followed by the columns of ``prediction_df``.
+
+    Without ``ids`` the 1-based row number of the input is used as ID.
+    """
+    if ids is None:
+        ids = np.arange(1, len(prediction_df) + 1)
+    else:
+        ids = np.asarray(ids)
+    result_df = prediction_df.reset_index(drop=True)
+    result_df.insert(0, id_name, ids)
+    return result_df
+
+
+def filter_positions(result_df, min_probability=0.0, max_probability=1.0, status="Semua"):
+    """Row positions whose dropout probability and status match the filter."""
+    probability = result_df["Probability_Dropout"].to_numpy()
+    mask = (probability >= min_probability) & (probability <= max_probability)
+    if status != "Semua":
+        mask &= result_df["Predicted_Status"].to_numpy() == status
+    return np.flatnonzero(mask)
+
+
+def page_rows(
+    result_df,
+    positions,
+    sort_by="Probability_Dropout",
+    ascending=False,
+    page=1,
+    page_size=DEFAULT_PAGE_SIZE,
+):
+    """One page of ``positions`` sorted by ``sort_by``; ties keep input order.
+
+    Sorting works on positions, so only the rows of the returned page are copied.
+    """
+    keys = pd.Series(result_df[sort_by].to_numpy()[positions])
+    order = keys.sort_values(ascending=ascending, kind="stable").index.to_numpy()
+    start = (max(page, 1) - 1) * page_size
+    return result_df.iloc[positions[order[start : start + page_size]]]
+
+
+def export_results(result_df, export_format="CSV"):
+    """Returns the whole result table as CSV or Parquet bytes.
+
+    Parquet is converted ``EXPORT_CHUNK_ROWS`` rows at a time (one row group
+    each), so no full-size Arrow copy of the table exists next to the bytes.
+    """
+    buffer = io.BytesIO()
+    if export_format == "Parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for start in range(0, max(len(result_df), 1), EXPORT_CHUNK_ROWS):
+            chunk = result_df.iloc[start : start + EXPORT_CHUNK_ROWS]
+            table = pa.Table.from_pandas(
+                chunk, schema=writer and writer.schema, preserve_index=False
+            )
+            if writer is None:
+                # The first chunk fixes the schema, as in ingest.ResultWriter
+                writer = pq.ParquetWriter(buffer, table.schema)
+            writer.write_table(table)
+        writer.close()
+    else:
+        result_df.to_csv(buffer, index=False, chunksize=EXPORT_CHUNK_ROWS)
+    return buffer.getvalue()
@@ -0,0 +1,84 @@
+import os
+
+import pandas as pd
+
+from features import add_engineered_features, all_features_ordered
+
+MODEL_DIR = "models"
+MODEL_PATH = os.path.join(MODEL_DIR, "dropout_prediction_xgboost_pipeline.pkl")
+
+# Attempts to load a model file that is replaced while it is being read
+LOAD_ATTEMPTS = 3
+
+# Probability_Dropout above this value is labelled Dropout (the model's own default)
+DEFAULT_THRESHOLD = 0.5
+
+PREDICTION_COLUMNS = [
+    "Predicted_Is_Dropout",
+    "Probability_Non_Dropout",
+    "Probability_Dropout",
+    "Predicted_Status",
+]
+
+
+def load_pipeline(model_path=MODEL_PATH):
+    """Loads the trained pipeline (which includes preprocessor and model).
+
+    The pickle is read fully into memory: joblib maps none of its arrays, and the
+    booster is stored as raw bytes (``compiled.py`` exports can be memory-mapped
+    instead). The SHA-256 of the file that was loaded
+    is pinned to the pipeline (``cache.pinned_fingerprint``), so caches can tell
+    which model version produced its predictions.
+    """
+    # Deferred: joblib (and the sklearn/xgboost imports unpickling triggers) is
+    # only needed once a model is actually loaded
+    import joblib
+
+    from cache import model_fingerprint, pin_fingerprint
+
+    for _ in range(LOAD_ATTEMPTS):
+        fingerprint = model_fingerprint(model_path)
+        pipeline = joblib.load(model_path)
+        # A file replaced during the load must not be pinned with the old hash
+        if model_fingerprint(model_path) == fingerprint:
+            return pin_fingerprint(pipeline, fingerprint)
+    raise RuntimeError(f"File model '{model_path}' berubah selama dimuat; coba lagi.")
+
+
+def prepare_features(input_df):
+    """Computes the engineered features and orders columns as the pipeline expects."""
+    return add_engineered_features(input_df)[all_features_ordered]
+
+
+def score(pipeline, input_df, threshold=DEFAULT_THRESHOLD, cache=None):
+    """Returns ``(predictions, prediction_prob)`` from a single model pass.
+
+    ``pipeline.predict`` would run the preprocessor and the model a second time
+    only to compare the same probabilities against 0.5, so the labels are
+    derived from ``predict_proba`` with a configurable ``threshold`` instead.
+    With a ``cache.PredictionCache`` only previously unseen rows are scored.
+    """
+    if cache is not None:
+        prediction_prob = cache.predict_proba(pipeline, input_df)
+    else:
+        prediction_prob = pipeline.predict_proba(input_df)
+    predictions = (prediction_prob[:, 1] > threshold).astype(int)
+    return predictions, prediction_prob
+
+
+def build_prediction_frame(index, predictions, prediction_prob):
+    """Assembles the prediction columns from ``score``'s output."""
+    result_df = pd.DataFrame(index=index)
+    result_df["Predicted_Is_Dropout"] = predictions
+    result_df["Probability_Non_Dropout"] = prediction_prob[:, 0]
+    result_df["Probability_Dropout"] = prediction_prob[:, 1]
+    result_df["Predicted_Status"] = result_df["Predicted_Is_Dropout"].map(
+        {1: "Dropout", 0: "Non-Dropout"}
+    )
+    return result_df
+
+
+def predict_frame(pipeline, input_df, threshold=DEFAULT_THRESHOLD, cache=None):
+    """Scores ``input_df`` and returns a frame with the prediction columns."""
+    predictions, prediction_prob = score(pipeline, input_df, threshold, cache)
+    return build_prediction_frame(input_df.index, predictions, prediction_prob)
@@ -0,0 +1,426 @@
+"""Local HTTP prediction service with micro-batching.
+
+Concurrent single-student requests are collected into small batches (bounded by
+``--max-batch-size`` and ``--max-wait-ms``) so the pipeline runs once per batch
+instead of once per request.
+
+Contoh penggunaan:
+
+    python serve.py --port 8000
+    curl -X POST localhost:8000/predict -d @mahasiswa.json
+
+Endpoint:
+
+- ``POST /predict``: satu record JSON (objek) atau daftar record. Kolom mengikuti
+  ``input_features_ordered``; fitur rekayasa dihitung ulang oleh server.
+- ``GET /metrics``: latensi p50/p95/p99 dan histogram ukuran batch.
+- ``GET /health``: status dan durasi fase startup (import, load, warm-up).
+- ``GET /drift``: PSI/KS per fitur terhadap data pelatihan (dengan ``--drift-state``).
+
+Dengan ``--challenger`` setiap batch juga diprediksi oleh model challenger di
+latar belakang (lihat ``shadow.py``); respons tetap berasal dari model utama.
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from drift import DEFAULT_REFERENCE_PATH, load_monitor
+from features import build_feature_frame, input_features_ordered
+from registry import resolve_model_path
+from scoring import DEFAULT_THRESHOLD, MODEL_PATH, predict_frame
+from shadow import DEFAULT_SHADOW_DB, ShadowScorer, load_challengers
+from startup import format_timings, load_model
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+LATENCY_WINDOW = 10_000
+
+
+def _json_default(value):
+    # NumPy scalars coming out of the prediction frame
+    return value.item()
+
+
+def coerce_record(record):
+    """Returns the record's input features as floats (None -> NaN).
+
+    Raises ``ValueError`` naming the columns that are missing or not finite
+    numbers (``"inf"`` and ``"nan"`` strings included), so a bad record is
+    rejected before it can share a batch with other clients.
+    """
+    missing_cols = [col for col in input_features_ordered if col not in record]
+    if missing_cols:
+        raise ValueError(f"Kolom yang dibutuhkan tidak ada: {missing_cols}")
+    coerced = {}
+    invalid_cols = []
+    for col in input_features_ordered:
+        value = record[col]
+        if value is None:
+            coerced[col] = np.nan
+            continue
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = float(value)
+            if not math.isfinite(value):
+                raise ValueError
+            coerced[col] = value
+        except (TypeError, ValueError):
+            invalid_cols.append(col)
+    if invalid_cols:
+        raise ValueError(f"Kolom berikut harus berupa angka: {invalid_cols}")
+    return coerced
+
+
+class ServiceMetrics:
+    """Thread-safe request latency window and batch-size histogram."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies_ms = deque(maxlen=window)
+        self._batch_sizes = Counter()
+        self._n_requests = 0
+
+    def record_latency(self, latency_ms):
+        with self._lock:
+            self._latencies_ms.append(latency_ms)
+            self._n_requests += 1
+
+    def record_batch(self, batch_size):
+        with self._lock:
+            self._batch_sizes[batch_size] += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.fromiter(self._latencies_ms, dtype=np.float64)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            n_requests = self._n_requests
+
+        latency = {"p50": None, "p95": None, "p99": None}
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            latency = {"p50": p50, "p95": p95, "p99": p99}
+        n_batches = sum(batch_sizes.values())
+        return {
+            "requests": n_requests,
+            "batches": n_batches,
+            "mean_batch_size": (
+                sum(size * count for size, count in batch_sizes.items()) / n_batches
+                if n_batches
+                else None
+            ),
+            "latency_ms": latency,
+            "batch_size_histogram": {str(k): v for k, v in batch_sizes.items()},
+        }
+
+
+class MicroBatcher:
+    """Groups concurrently submitted records into batches for one model pass."""
+
+    def __init__(
+        self,
+        pipeline,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms=DEFAULT_MAX_WAIT_MS,
+        threshold=DEFAULT_THRESHOLD,
+        metrics=None,
+        shadow=None,
+        drift=None,
+    ):
+        self.pipeline = pipeline
+        self.shadow = shadow
+        self.drift = drift
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.threshold = threshold
+        self.metrics = metrics or ServiceMetrics()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, record):
+        """Queues one record and returns a Future with its prediction dict."""
+        future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            records = [record for record, _ in batch]
+            futures = [future for _, future in batch]
+            self.metrics.record_batch(len(batch))
+            try:
+                features_df = build_feature_frame(pd.DataFrame.from_records(records))
+                prediction_df = predict_frame(self.pipeline, features_df, self.threshold)
+            except Exception as e:
+                # Records of different clients share the batch: score them one
+                # by one so only the failing record's request gets the error
+                if len(batch) == 1:
+                    futures[0].set_exception(e)
+                else:
+                    self._score_individually(batch)
+                continue
+
+            for future, row in zip(futures, prediction_df.to_dict(orient="records")):
+                future.set_result(row)
+            self._monitor(features_df, prediction_df)
+
+    def _score_individually(self, batch):
+        scored = []
+        for record, future in batch:
+            try:
+                features_df = build_feature_frame(pd.DataFrame.from_records([record]))
+                prediction_df = predict_frame(self.pipeline, features_df, self.threshold)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(prediction_df.to_dict(orient="records")[0])
+                scored.append((features_df, prediction_df))
+        if scored:
+            features_dfs, prediction_dfs = zip(*scored)
+            self._monitor(
+                pd.concat(features_dfs, ignore_index=True),
+                pd.concat(prediction_dfs, ignore_index=True),
+            )
+
+    def _monitor(self, features_df, prediction_df):
+        """Feeds the scored rows to the shadow scorer and the drift monitor.
+
+        Runs after the responses are set; an error here is reported but must not
+        stop the batcher thread or keep the other monitor from its update.
+        """
+        if self.shadow is not None:
+            try:
+                self.shadow.submit(features_df, prediction_df["Probability_Dropout"])
+            except Exception as e:
+                print(f"Shadow scoring gagal: {e}", file=sys.stderr)
+        if self.drift is not None:
+            try:
+                self.drift.update(features_df)
+            except Exception as e:
+                print(f"Pembaruan drift gagal: {e}", file=sys.stderr)
+
+
+def make_handler(batcher, startup_timings=None):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                metrics = batcher.metrics.snapshot()
+                if batcher.shadow is not None:
+                    metrics["shadow_batches_skipped"] = batcher.shadow.skipped
+                self._send_json(200, metrics)
+            elif self.path == "/drift" and batcher.drift is not None:
+                n_rows = batcher.drift.n_rows
+                report_df = batcher.drift.report().reset_index()
+                self._send_json(
+                    200,
+                    {
+                        "n_rows": n_rows,
+                        # NaN (KS of categories, unknown share of numbers) is not valid JSON
+                        "features": report_df.astype(object)
+                        .where(report_df.notna(), None)
+                        .to_dict(orient="records"),
+                    },
+                )
+            elif self.path == "/health":
+                self._send_json(
+                    200, {"status": "ok", "startup_seconds": startup_timings}
+                )
+            else:
+                self._send_json(404, {"error": "Endpoint tidak ditemukan."})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send_json(404, {"error": "Endpoint tidak ditemukan."})
+                return
+
+            start = time.perf_counter()
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+            except ValueError as e:
+                self._send_json(400, {"error": f"JSON tidak valid: {e}"})
+                return
+
+            records = payload if isinstance(payload, list) else [payload]
+            try:
+                records = [
+                    coerce_record(record if isinstance(record, dict) else {})
+                    for record in records
+                ]
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+
+            futures = [batcher.submit(record) for record in records]
+            try:
+                results = [future.result() for future in futures]
+            except Exception as e:
+                self._send_json(500, {"error": f"Error selama proses prediksi: {e}"})
+                return
+
+            batcher.metrics.record_latency((time.perf_counter() - start) * 1000)
+            self._send_json(200, results if isinstance(payload, list) else results[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    return PredictionHandler
+
+
+class PredictionServer(ThreadingHTTPServer):
+    # The socketserver default backlog of 5 resets connections under load
+    request_queue_size = 128
+
+
+def create_server(
+    pipeline, host="127.0.0.1", port=8000, startup_timings=None, **batcher_kwargs
+):
+    batcher = MicroBatcher(pipeline, **batcher_kwargs)
+    return PredictionServer((host, port), make_handler(batcher, startup_timings))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Layanan HTTP prediksi dropout dengan micro-batching."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--model",
+        default=MODEL_PATH,
+        help="Path pipeline model (champion), atau nama model di registry.",
+    )
+    parser.add_argument(
+        "--challenger",
+        action="append",
+        default=[],
+        help="Model challenger (path atau nama di registry) yang diprediksi di latar belakang; dapat diulang.",
+    )
+    parser.add_argument(
+        "--shadow-db",
+        default=DEFAULT_SHADOW_DB,
+        help="File SQLite tempat distribusi probabilitas dan tingkat kesepakatan challenger disimpan.",
+    )
+    parser.add_argument(
+        "--drift-state",
+        default=None,
+        help="File JSON histogram drift fitur; diperbarui tiap batch, disimpan saat server berhenti, dan tersedia di GET /drift.",
+    )
+    parser.add_argument(
+        "--drift-reference",
+        default=DEFAULT_REFERENCE_PATH,
+        help="Profil referensi drift (dibuat dari data/data.csv bila belum ada).",
+    )
+    parser.add_argument(
+        "--compiled",
+        default=None,
+        help="Direktori hasil 'python compiled.py export'; dipakai sebagai ganti --model.",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=DEFAULT_MAX_BATCH_SIZE,
+        help="Jumlah maksimum record per batch.",
+    )
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help="Waktu tunggu maksimum (ms) untuk mengisi satu batch.",
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Lewati prediksi pemanasan sebelum server menerima permintaan.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        args.model = resolve_model_path(args.model)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 1
+    pipeline, startup_timings = load_model(
+        args.model, args.compiled, warmup=not args.no_warmup
+    )
+    print(f"Model siap: {format_timings(startup_timings)}")
+
+    shadow = None
+    if args.challenger:
+        shadow = ShadowScorer(
+            os.path.basename(args.compiled or args.model),
+            load_challengers(args.challenger),
+            args.shadow_db,
+            threshold=args.threshold,
+        )
+        print(f"Mode shadow: challenger {args.challenger} dicatat di '{args.shadow_db}'.")
+
+    drift = None
+    if args.drift_state:
+        drift = load_monitor(args.drift_state, args.drift_reference)
+        print(f"Pemantauan drift: {drift.n_rows:,} baris sebelumnya dari '{args.drift_state}'.")
+
+    server = create_server(
+        pipeline,
+        args.host,
+        args.port,
+        startup_timings=startup_timings,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        threshold=args.threshold,
+        shadow=shadow,
+        drift=drift,
+    )
+    print(f"Layanan prediksi berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if shadow is not None:
+            # Stores the challenger results of the batches already queued
+            shadow.close()
+        if drift is not None:
+            drift.save(args.drift_state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""Shadow (champion/challenger) scoring of live batches.
+
+The champion pipeline answers every request as usual; ``ShadowScorer`` receives
+the same feature batch together with the champion's probabilities and scores it
+with the challenger pipelines in a background thread, so user-facing latency is
+unchanged. Per batch and model it stores the dropout-probability histogram and,
+for challengers, the label agreement rate and mean absolute probability
+difference against the champion in a local SQLite file:
+
+    python serve.py --challenger xgboost:<versi> --shadow-db logs/shadow.sqlite
+    python shadow.py summarize logs/shadow.sqlite
+
+The backlog of pending batches is bounded; when challengers cannot keep up,
+new batches are skipped (and counted) instead of slowing the champion down.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from features import all_features_ordered
+from scoring import DEFAULT_THRESHOLD
+
+DEFAULT_SHADOW_DB = os.path.join("logs", "shadow.sqlite")
+DEFAULT_MAX_PENDING = 16
+HISTOGRAM_BINS = 10
+
+
+def probability_histogram(probabilities):
+    counts, _ = np.histogram(probabilities, bins=HISTOGRAM_BINS, range=(0.0, 1.0))
+    return counts.tolist()
+
+
+def load_challengers(specs):
+    """Loads challenger pipelines from file paths or registry specs, by spec."""
+    from registry import resolve_model_path
+    from scoring import load_pipeline
+
+    return {spec: load_pipeline(resolve_model_path(spec)) for spec in specs}
+
+
+class ShadowScorer:
+    """Scores batches with challenger pipelines in a background worker.
+
+    ``challengers`` maps a model name to a fitted pipeline.
+    """
+
+    def __init__(
+        self,
+        champion_name,
+        challengers,
+        store_path=DEFAULT_SHADOW_DB,
+        threshold=DEFAULT_THRESHOLD,
+        max_pending=DEFAULT_MAX_PENDING,
+    ):
+        self.champion_name = champion_name
+        self.challengers = dict(challengers)
+        self.store_path = store_path
+        self.threshold = threshold
+        self.skipped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, features_df, champion_prob, block=False):
+        """Queues one scored batch; returns False if it was skipped.
+
+        ``champion_prob`` is the champion's dropout probability per row. With
+        ``block=True`` (offline batch scoring) a full backlog waits instead.
+        """
+        item = (features_df, np.asarray(champion_prob, dtype=np.float64))
+        try:
+            self._queue.put(item, block=block)
+        except queue.Full:
+            self.skipped += 1
+            return False
+        return True
+
+    def close(self):
+        """Waits until every queued batch has been scored and stored."""
+        self._queue.join()
+
+    def _connect(self):
+        store_dir = os.path.dirname(self.store_path)
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+        db = sqlite3.connect(self.store_path, timeout=30)
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shadow_batches (
+                batch_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                model TEXT NOT NULL,
+                role TEXT NOT NULL,
+                n_rows INTEGER NOT NULL,
+                mean_probability REAL NOT NULL,
+                histogram TEXT NOT NULL,
+                agreement_rate REAL,
+                mean_abs_diff REAL,
+                PRIMARY KEY (batch_id, model)
+            )
+            """
+        )
+        return db
+
+    def _run(self):
+        db = self._connect()
+        while True:
+            features_df, champion_prob = self._queue.get()
+            try:
+                self._score_batch(db, features_df, champion_prob)
+            except Exception as e:
+                # A failing challenger must never affect the champion's service
+                print(f"Shadow scoring gagal: {e}", file=sys.stderr)
+            finally:
+                self._queue.task_done()
+
+    def _score_batch(self, db, features_df, champion_prob):
+        batch_id = uuid.uuid4().hex
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        champion_labels = champion_prob > self.threshold
+        rows = [
+            (
+                batch_id,
+                timestamp,
+                self.champion_name,
+                "champion",
+                len(champion_prob),
+                float(champion_prob.mean()),
+                json.dumps(probability_histogram(champion_prob)),
+                None,
+                None,
+            )
+        ]
+        model_input = features_df[all_features_ordered]
+        for name, pipeline in self.challengers.items():
+            prob = pipeline.predict_proba(model_input)[:, 1]
+            rows.append(
+                (
+                    batch_id,
+                    timestamp,
+                    name,
+                    "challenger",
+                    len(prob),
+                    float(prob.mean()),
+                    json.dumps(probability_histogram(prob)),
+                    float(np.mean((prob > self.threshold) == champion_labels)),
+                    float(np.mean(np.abs(prob - champion_prob))),
+                )
+            )
+        with db:
+            db.executemany(
+                "INSERT INTO shadow_batches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+
+def summarize_store(store_path):
+    """Per model: batches, rows, and row-weighted probability/agreement metrics."""
+    import pandas as pd
+
+    with sqlite3.connect(store_path) as db:
+        batches_df = pd.read_sql_query("SELECT * FROM shadow_batches", db)
+    if batches_df.empty:
+        return batches_df
+
+    weights = batches_df["n_rows"]
+    for column in ("mean_probability", "agreement_rate", "mean_abs_diff"):
+        batches_df[column] = batches_df[column] * weights
+    grouped = batches_df.groupby(["role", "model"])
+    summary = grouped.agg(
+        batches=("batch_id", "count"),
+        rows=("n_rows", "sum"),
+        mean_probability=("mean_probability", "sum"),
+        agreement_rate=("agreement_rate", "sum"),
+        mean_abs_diff=("mean_abs_diff", "sum"),
+    )
+    for column in ("mean_probability", "agreement_rate", "mean_abs_diff"):
+        summary[column] = summary[column] / summary["rows"]
+    is_champion = summary.index.get_level_values("role") == "champion"
+    summary.loc[is_champion, ["agreement_rate", "mean_abs_diff"]] = np.nan
+
+    histograms = grouped["histogram"].agg(
+        lambda values: np.sum([json.loads(value) for value in values], axis=0)
+    )
+    summary["histogram_pct"] = [
+        " ".join(f"{share:.0%}" for share in counts / counts.sum())
+        for counts in histograms
+    ]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Ringkasan perbandingan model champion dan challenger."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summarize_parser = subparsers.add_parser(
+        "summarize", help="Distribusi probabilitas dan tingkat kesepakatan per model."
+    )
+    summarize_parser.add_argument("store_path", nargs="?", default=DEFAULT_SHADOW_DB)
+    args = parser.parse_args(argv)
+
+    summary = summarize_store(args.store_path)
+    print(summary.to_string(float_format="{:.4f}".format))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
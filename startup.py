@@ -0,0 +1,113 @@
+"""Fast model startup: background loading, warm-up and per-phase timings.
+
+On a cold start most of the time goes into importing xgboost and sklearn (which
+unpickling the pipeline triggers), not into reading the model file. ``load_model``
+makes the three phases explicit and times them:
+
+- ``import``: the modules the model needs,
+- ``load``: the artefact. Only the arrays of a ``compiled.py`` export are
+  memory-mapped in a useful way; the joblib pipeline (used by the Streamlit
+  app) is unpickled, since its booster is stored as raw bytes and its NumPy
+  arrays are small,
+- ``warmup``: one prediction on an all-zero row, so lazy initialisation inside
+  XGBoost does not land on the first real request.
+
+``ModelLoader`` runs ``load_model`` in a background thread so a UI can render
+while the model loads and only the first prediction waits for it.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from features import all_features_ordered
+from scoring import MODEL_PATH
+
+STARTUP_PHASES = ("import", "load", "warmup")
+
+
+def _import_model_modules(compiled):
+    import numpy  # noqa: F401
+    import xgboost  # noqa: F401
+
+    if not compiled:
+        import pandas  # noqa: F401
+        import sklearn.compose  # noqa: F401
+        import sklearn.impute  # noqa: F401
+        import sklearn.pipeline  # noqa: F401
+        import sklearn.preprocessing  # noqa: F401
+
+
+def warm_up(pipeline):
+    """Scores one all-zero row to trigger the model's lazy initialisation."""
+    import numpy as np
+    import pandas as pd
+
+    warmup_df = pd.DataFrame(
+        np.zeros((1, len(all_features_ordered))), columns=all_features_ordered
+    )
+    pipeline.predict_proba(warmup_df)
+
+
+def load_model(model_path=MODEL_PATH, compiled_dir=None, warmup=True):
+    """Imports, loads and warms up the model; returns ``(pipeline, timings)``.
+
+    ``timings`` maps each of ``STARTUP_PHASES`` to seconds. With ``compiled_dir``
+    the ``compiled.py`` export is loaded, with its arrays memory-mapped, instead
+    of the pickled pipeline.
+    """
+    timings = {}
+    start = time.perf_counter()
+    _import_model_modules(compiled_dir is not None)
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if compiled_dir is not None:
+        from compiled import CompiledPipeline
+
+        pipeline = CompiledPipeline.load(compiled_dir, mmap_mode="r")
+    else:
+        from scoring import load_pipeline
+
+        pipeline = load_pipeline(model_path)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if warmup:
+        warm_up(pipeline)
+    timings["warmup"] = time.perf_counter() - start
+    return pipeline, timings
+
+
+def format_timings(timings):
+    total = sum(timings.values())
+    phases = ", ".join(f"{phase} {timings[phase]:.2f} s" for phase in STARTUP_PHASES)
+    return f"{phases} (total {total:.2f} s)"
+
+
+class ModelLoader:
+    """Runs ``load_model`` in a daemon thread; ``result()`` waits for it.
+
+    ``load_func`` replaces ``load_model``, e.g. ``registry.ModelCache.get``.
+    """
+
+    def __init__(self, load_func=None, **load_kwargs):
+        self._load_func = load_func or load_model
+        self._future = Future()
+        self._thread = threading.Thread(
+            target=self._run, kwargs=load_kwargs, daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, **load_kwargs):
+        try:
+            self._future.set_result(self._load_func(**load_kwargs))
+        except BaseException as e:
+            self._future.set_exception(e)
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Returns ``(pipeline, timings)``, re-raising any loading error."""
+        return self._future.result(timeout)
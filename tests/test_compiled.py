@@ -0,0 +1,82 @@
+"""Parity of the compiled inference path with the fitted sklearn pipeline.
+
+    python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from compiled import CompiledPipeline, check_parity
+from features import categorical_features_model, input_features_ordered
+from scoring import MODEL_PATH, load_pipeline, prepare_features
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ROOT_DIR, "data", "data.csv")
+TOLERANCE = 1e-6
+MISSING_SHARE = 0.05
+UNKNOWN_SHARE = 0.02
+# Larger than any code in the source system's category tables
+UNKNOWN_CODE = 9999
+
+
+def load_messy_features(seed=0):
+    """data.csv with missing values and unknown category codes injected."""
+    rng = np.random.default_rng(seed)
+    input_df = pd.read_csv(DATA_PATH, sep=";")[input_features_ordered].astype(
+        np.float64
+    )
+    values = input_df.to_numpy()
+    values[rng.random(values.shape) < MISSING_SHARE] = np.nan
+    input_df.loc[:, :] = values
+    for col in categorical_features_model:
+        unknown = rng.random(len(input_df)) < UNKNOWN_SHARE
+        input_df.loc[unknown, col] = UNKNOWN_CODE
+    return prepare_features(input_df)
+
+
+class CompiledParityTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline = load_pipeline(os.path.join(ROOT_DIR, MODEL_PATH))
+        cls.compiled = CompiledPipeline.from_pipeline(cls.pipeline)
+        cls.clean_df = prepare_features(pd.read_csv(DATA_PATH, sep=";"))
+        cls.messy_df = load_messy_features()
+
+    def test_injected_values_reach_the_pipeline(self):
+        self.assertTrue(self.messy_df[input_features_ordered].isna().any().all())
+        self.assertTrue(
+            (self.messy_df[categorical_features_model] == UNKNOWN_CODE).any().all()
+        )
+
+    def test_parity_on_training_data(self):
+        self.assertLessEqual(
+            check_parity(self.pipeline, self.compiled, self.clean_df), TOLERANCE
+        )
+
+    def test_parity_with_missing_values_and_unknown_codes(self):
+        self.assertLessEqual(
+            check_parity(self.pipeline, self.compiled, self.messy_df), TOLERANCE
+        )
+
+    def test_single_rows(self):
+        for i in range(0, len(self.messy_df), 500):
+            row_df = self.messy_df.iloc[[i]]
+            self.assertLessEqual(
+                check_parity(self.pipeline, self.compiled, row_df), TOLERANCE
+            )
+
+    def test_saved_export_memory_mapped(self):
+        with tempfile.TemporaryDirectory() as compiled_dir:
+            self.compiled.save(compiled_dir)
+            loaded = CompiledPipeline.load(compiled_dir, mmap_mode="r")
+            self.assertLessEqual(
+                check_parity(self.pipeline, loaded, self.messy_df), TOLERANCE
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
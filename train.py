@@ -0,0 +1,286 @@
+"""Scripted training pipeline extracted from notebook.ipynb.
+
+Runs the RandomForest, XGBoost and LightGBM Optuna studies in parallel processes,
+evaluates the first ``SEQUENTIAL_FOLDS`` CV folds of each trial one at a time, so
+unpromising trials are pruned before the remaining folds are started, and the
+remaining folds concurrently. Study state lives in an Optuna journal file, so an interrupted
+run resumes where it stopped. The best model is refitted on the training split
+and saved as ``models/dropout_prediction_<model>_pipeline.pkl``, like the notebook,
+plus a versioned copy in the model registry (``registry.py``); both get a
+sidecar ``.json`` with the training date, CV/test ROC AUC and parameters.
+
+Contoh penggunaan:
+
+    python train.py --trials 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import optuna
+import pandas as pd
+from joblib import Parallel, delayed
+from lightgbm import LGBMClassifier
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+
+from features import build_feature_frame, compact_dtypes
+from preprocessing import ENCODINGS, build_preprocessor, xgboost_encoding_params
+from registry import DEFAULT_VERSION, ModelRegistry, dump_pipeline, write_metadata
+from scoring import MODEL_DIR
+
+# --- Constants (as in notebook.ipynb) ---
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+CV_FOLDS = 5
+# Folds fitted one at a time before the pruner may stop a trial; the rest run
+# in parallel. More sequential folds prune earlier but leave fewer to overlap.
+SEQUENTIAL_FOLDS = 2
+FILE_PATH = "data/data.csv"
+TARGET_COLUMN_ORIGINAL = "Status"
+TARGET_COLUMN_BINARY = "Is_Dropout"
+MODEL_NAMES = ("RandomForest", "XGBoost", "LightGBM")
+DEFAULT_STORAGE = os.path.join(MODEL_DIR, "optuna_journal.log")
+
+
+def load_training_data(file_path=FILE_PATH):
+    """Returns ``X_train, X_test, y_train, y_test`` with the notebook's split."""
+    df_raw = compact_dtypes(pd.read_csv(file_path, sep=";"))
+    X = build_feature_frame(df_raw)
+    y = (df_raw[TARGET_COLUMN_ORIGINAL] == "Dropout").astype(int).rename(
+        TARGET_COLUMN_BINARY
+    )
+    return train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+
+
+def build_base_model(model_name, y_train, encoding="dense"):
+    """Base estimators of the notebook's ``models_to_tune``."""
+    class_counts = Counter(y_train)
+    scale_pos_weight = class_counts[0] / class_counts[1]
+    if model_name == "RandomForest":
+        return RandomForestClassifier(
+            random_state=RANDOM_STATE, n_jobs=-1, class_weight="balanced_subsample"
+        )
+    if model_name == "XGBoost":
+        return XGBClassifier(
+            random_state=RANDOM_STATE,
+            eval_metric="logloss",
+            scale_pos_weight=scale_pos_weight,
+            **xgboost_encoding_params(encoding),
+        )
+    if model_name == "LightGBM":
+        return LGBMClassifier(
+            random_state=RANDOM_STATE,
+            n_jobs=-1,
+            scale_pos_weight=scale_pos_weight,
+            verbose=-1,
+        )
+    raise ValueError(f"Model '{model_name}' tidak dikenal, pilih dari {MODEL_NAMES}.")
+
+
+def suggest_params(model_name, trial):
+    """Search space of the notebook's ``create_objective_pipeline``."""
+    params = {}
+    if model_name == "RandomForest":
+        params["n_estimators"] = trial.suggest_int("n_estimators", 50, 400, step=50)
+        params["max_depth"] = trial.suggest_int("max_depth", 5, 20, log=True)
+        params["min_samples_split"] = trial.suggest_int("min_samples_split", 2, 15)
+        params["min_samples_leaf"] = trial.suggest_int("min_samples_leaf", 1, 15)
+    elif model_name == "XGBoost":
+        params["n_estimators"] = trial.suggest_int("n_estimators", 50, 400, step=50)
+        params["max_depth"] = trial.suggest_int("max_depth", 3, 9)
+        params["learning_rate"] = trial.suggest_float(
+            "learning_rate", 0.01, 0.2, log=True
+        )
+        params["subsample"] = trial.suggest_float("subsample", 0.6, 1.0)
+        params["colsample_bytree"] = trial.suggest_float("colsample_bytree", 0.6, 1.0)
+        params["gamma"] = trial.suggest_float("gamma", 0, 0.5)
+    elif model_name == "LightGBM":
+        params["n_estimators"] = trial.suggest_int("n_estimators", 50, 400, step=50)
+        params["max_depth"] = trial.suggest_int("max_depth", 3, 9)
+        params["learning_rate"] = trial.suggest_float(
+            "learning_rate", 0.01, 0.2, log=True
+        )
+        params["num_leaves"] = trial.suggest_int("num_leaves", 20, 100, log=True)
+        params["subsample"] = trial.suggest_float("subsample", 0.6, 1.0)
+        params["colsample_bytree"] = trial.suggest_float("colsample_bytree", 0.6, 1.0)
+    return params
+
+
+def build_pipeline(base_model, params, encoding="dense"):
+    model = clone(base_model).set_params(**params)
+    return Pipeline(
+        steps=[("preprocessor", build_preprocessor(encoding)), ("classifier", model)]
+    )
+
+
+def _fit_and_score_fold(pipeline, X, y, train_idx, valid_idx):
+    pipeline.fit(X.iloc[train_idx], y.iloc[train_idx])
+    y_prob = pipeline.predict_proba(X.iloc[valid_idx])[:, 1]
+    return roc_auc_score(y.iloc[valid_idx], y_prob)
+
+
+def _iter_fold_scores(pipeline, X, y, folds, cv_jobs):
+    """Yields the fold scores in order: the first ``SEQUENTIAL_FOLDS`` one at a
+    time, then the rest from ``cv_jobs`` parallel workers.
+
+    The parallel folds are only dispatched once the caller asks for the first of
+    them, so a trial pruned during the sequential folds never starts them.
+    """
+    for train_idx, valid_idx in folds[:SEQUENTIAL_FOLDS]:
+        yield _fit_and_score_fold(clone(pipeline), X, y, train_idx, valid_idx)
+    yield from Parallel(n_jobs=cv_jobs, return_as="generator")(
+        delayed(_fit_and_score_fold)(clone(pipeline), X, y, train_idx, valid_idx)
+        for train_idx, valid_idx in folds[SEQUENTIAL_FOLDS:]
+    )
+
+
+def run_study(model_name, n_trials, storage_path, encoding, cv_jobs):
+    """Runs (or resumes) one model's study; returns its best value and params."""
+    X_train, _, y_train, _ = load_training_data()
+    base_model = build_base_model(model_name, y_train, encoding)
+    kf = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE)
+    folds = list(kf.split(X_train, y_train))
+
+    def objective(trial):
+        params = suggest_params(model_name, trial)
+        # Later folds run concurrently; one thread per fit avoids oversubscription
+        if "n_jobs" in base_model.get_params():
+            params["n_jobs"] = 1
+        pipeline = build_pipeline(base_model, params, encoding)
+
+        fold_scores = []
+        fold_results = _iter_fold_scores(pipeline, X_train, y_train, folds, cv_jobs)
+        for step, fold_score in enumerate(fold_results):
+            fold_scores.append(fold_score)
+            trial.report(float(np.mean(fold_scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return float(np.mean(fold_scores))
+
+    storage = optuna.storages.JournalStorage(
+        optuna.storages.journal.JournalFileBackend(storage_path)
+    )
+    study = optuna.create_study(
+        direction="maximize",
+        study_name=f"{model_name}_{encoding}_study",
+        storage=storage,
+        load_if_exists=True,
+        sampler=optuna.samplers.TPESampler(seed=RANDOM_STATE),
+        pruner=optuna.pruners.MedianPruner(
+            n_startup_trials=5, n_warmup_steps=SEQUENTIAL_FOLDS - 1
+        ),
+    )
+    finished = [
+        trial
+        for trial in study.trials
+        if trial.state
+        in (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    ]
+    remaining = max(0, n_trials - len(finished))
+    if remaining:
+        study.optimize(objective, n_trials=remaining)
+
+    n_pruned = len(study.get_trials(states=(optuna.trial.TrialState.PRUNED,)))
+    return model_name, study.best_trial.value, study.best_trial.params, n_pruned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tuning Optuna paralel dan pelatihan pipeline prediksi dropout."
+    )
+    parser.add_argument("--trials", type=int, default=20, help="Jumlah trial per model.")
+    parser.add_argument("--models", nargs="+", default=list(MODEL_NAMES))
+    parser.add_argument("--encoding", choices=ENCODINGS, default="dense")
+    parser.add_argument(
+        "--storage",
+        default=DEFAULT_STORAGE,
+        help="File journal Optuna; trial yang sudah selesai tidak diulang.",
+    )
+    parser.add_argument(
+        "--model-dir", default=MODEL_DIR, help="Direktori tujuan pipeline final."
+    )
+    parser.add_argument(
+        "--study-jobs",
+        type=int,
+        default=len(MODEL_NAMES),
+        help="Jumlah studi (model) yang dijalankan paralel.",
+    )
+    parser.add_argument(
+        "--cv-jobs",
+        type=int,
+        default=CV_FOLDS - SEQUENTIAL_FOLDS,
+        help=f"Jumlah fold CV yang dievaluasi bersamaan per trial, setelah {SEQUENTIAL_FOLDS} fold pertama yang dijalankan berurutan agar pruning dapat menghentikan trial lebih awal.",
+    )
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.model_dir, exist_ok=True)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.study_jobs) as executor:
+        futures = [
+            executor.submit(
+                run_study, name, args.trials, args.storage, args.encoding, args.cv_jobs
+            )
+            for name in args.models
+        ]
+        results = [future.result() for future in futures]
+
+    best_scores_all = {}
+    best_params_all = {}
+    for model_name, best_value, best_params, n_pruned in results:
+        best_scores_all[model_name] = best_value
+        best_params_all[model_name] = best_params
+        print(
+            f"{model_name}: ROC AUC CV terbaik {best_value:.4f} ({n_pruned} trial dipangkas), params {best_params}"
+        )
+
+    best_model_overall_name = max(best_scores_all, key=best_scores_all.get)
+    print(f"\nModel Terbaik Keseluruhan (roc_auc): {best_model_overall_name}")
+
+    X_train, X_test, y_train, y_test = load_training_data()
+    base_model = build_base_model(best_model_overall_name, y_train, args.encoding)
+    final_pipeline = build_pipeline(
+        base_model, best_params_all[best_model_overall_name], args.encoding
+    )
+    final_pipeline.fit(X_train, y_train)
+    test_auc = roc_auc_score(y_test, final_pipeline.predict_proba(X_test)[:, 1])
+    print(f"ROC AUC pada data test: {test_auc:.4f}")
+
+    model_filename = os.path.join(
+        args.model_dir,
+        f"dropout_prediction_{best_model_overall_name.lower().replace(' ', '_')}_pipeline.pkl",
+    )
+    dump_pipeline(final_pipeline, model_filename)
+    metadata = {
+        "name": best_model_overall_name.lower(),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "cv_roc_auc": best_scores_all[best_model_overall_name],
+        "test_roc_auc": test_auc,
+        "params": best_params_all[best_model_overall_name],
+        "encoding": args.encoding,
+    }
+    write_metadata(model_filename, {**metadata, "version": DEFAULT_VERSION})
+    entry = ModelRegistry(args.model_dir).register(
+        final_pipeline, best_model_overall_name, metadata
+    )
+    print(f"Pipeline final disimpan di '{model_filename}' dan '{entry.path}'.")
+    print(f"Total waktu: {time.perf_counter() - start:.1f} detik.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""What-if scenarios for one student.
+
+A scenario grid is the Cartesian product of candidate values for a few input
+columns (e.g. ``Tuition_fees_up_to_date`` x ``Scholarship_holder`` x
+``Curricular_units_2nd_sem_approved``), applied to one student's raw features.
+The grid is built with NumPy index arrays, the engineered features are
+recomputed for all variants at once, and the whole grid plus the unchanged
+student is scored with a single ``predict_proba`` call, so hundreds of scenarios
+cost about as much as one prediction.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from features import compact_dtypes, input_features_ordered
+from scoring import DEFAULT_THRESHOLD, prepare_features
+
+# Upper bound on the grid size, so a careless selection cannot exhaust memory
+MAX_SCENARIOS = 100_000
+
+SCENARIO_COLUMNS = [
+    "Probability_Dropout",
+    "Probability_Change",
+    "Predicted_Status",
+]
+
+
+def scenario_grid(student_df, axes):
+    """Raw-feature frame with one row per combination of the ``axes`` values.
+
+    ``student_df`` holds one student (its first row is used) and ``axes`` maps an
+    input column to its candidate values. As in ``itertools.product``, the last
+    axis varies fastest; every other column keeps the student's value.
+    """
+    unknown = [col for col in axes if col not in input_features_ordered]
+    if unknown:
+        raise ValueError(f"Kolom what-if bukan fitur input model: {unknown}")
+    sizes = [len(values) for values in axes.values()]
+    if 0 in sizes:
+        raise ValueError("Setiap fitur what-if membutuhkan minimal satu nilai.")
+    n_scenarios = math.prod(sizes)
+    if n_scenarios > MAX_SCENARIOS:
+        raise ValueError(
+            f"Terlalu banyak skenario ({n_scenarios:,}); maksimum {MAX_SCENARIOS:,}."
+        )
+
+    # Repeating the row by position keeps the student's column dtypes
+    grid = student_df[input_features_ordered].iloc[np.zeros(n_scenarios, dtype=int)]
+    grid = grid.reset_index(drop=True)
+    positions = np.indices(sizes).reshape(len(sizes), -1)
+    for (col, values), position in zip(axes.items(), positions):
+        grid[col] = np.asarray(values)[position]
+    return grid
+
+
+def simulate(pipeline, student_df, axes, threshold=DEFAULT_THRESHOLD):
+    """Scores every scenario of ``scenario_grid(student_df, axes)``.
+
+    Returns ``(scenario_df, baseline_probability)``: the ``axes`` columns plus
+    ``SCENARIO_COLUMNS`` per scenario, where ``Probability_Change`` is relative
+    to the student's own dropout probability.
+    """
+    grid = scenario_grid(student_df, axes)
+    # The unchanged student is appended so the baseline shares the model call
+    baseline = student_df[input_features_ordered].iloc[[0]]
+    variants = compact_dtypes(pd.concat([grid, baseline], ignore_index=True))
+    probability = pipeline.predict_proba(prepare_features(variants))[:, 1]
+    baseline_probability = float(probability[-1])
+    probability = probability[:-1]
+
+    scenario_df = grid[list(axes)].copy()
+    scenario_df["Probability_Dropout"] = probability
+    scenario_df["Probability_Change"] = probability - baseline_probability
+    scenario_df["Predicted_Status"] = np.where(
+        probability > threshold, "Dropout", "Non-Dropout"
+    )
+    return scenario_df[list(axes) + SCENARIO_COLUMNS], baseline_probability